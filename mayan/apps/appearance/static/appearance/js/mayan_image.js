@@ -9,6 +9,11 @@ class MayanImage {
     static intialize (options) {
         this.options = options || {};
         this.options.templateInvalidDocument = this.options.templateInvalidDocument || '<span>Error loading document image</span>';
+        // Seconds the server may hold the request waiting for an image
+        // before answering with a 202 response.
+        this.options.wait = this.options.wait || 0;
+        // Number of times the task status is polled before giving up.
+        this.options.maximumAttempts = this.options.maximumAttempts || 30;
 
         $().fancybox({
             afterShow: function (instance, current) {
@@ -64,30 +69,97 @@ class MayanImage {
     }
 
     load () {
-        var self = this;
-        var container = this.element.parent().parent().parent();
         var dataURL = this.element.attr('data-url');
 
         if (dataURL === '') {
-            container.html(MayanImage.options.templateInvalidDocument);
+            this.showError();
         } else {
-            this.element.attr('src', dataURL);
-            setTimeout(function () {
-                self.element.on('error', function () {
-                    // Check the .complete property to see if it is a real
-                    // error or it was a cached image
-                    if (this.complete === false) {
-                        // It is a cached image, set the src attribute to
-                        // trigger its display.
-                        this.src = dataURL;
+            this.request(dataURL, dataURL);
+        }
+    };
+
+    request (url, dataURL, attempt) {
+        // Ask for an asynchronous response to not hold a server worker
+        // while the image is generated. The server answers with a 202
+        // response and the URL of the task status to poll when the image
+        // is not ready.
+        var self = this;
+        var prefer = 'respond-async';
+
+        attempt = attempt || 0;
+
+        if (MayanImage.options.wait) {
+            prefer += ', wait=' + MayanImage.options.wait;
+        }
+
+        fetch(url, {
+            credentials: 'same-origin', headers: {'Prefer': prefer}
+        }).then(function (response) {
+            if (response.status === 202) {
+                if (attempt >= MayanImage.options.maximumAttempts) {
+                    self.showError();
+                    return;
+                }
+
+                var retryAfter = parseInt(
+                    response.headers.get('Retry-After'), 10
+                ) || 1;
+
+                setTimeout(function () {
+                    self.request(
+                        response.headers.get('Location'), dataURL, attempt + 1
+                    );
+                }, retryAfter * 1000);
+            } else if (!response.ok) {
+                self.showError();
+            } else if (url === dataURL) {
+                return response.blob().then(function (blob) {
+                    var objectURL = URL.createObjectURL(blob);
+
+                    // Release the blob once the image is displayed.
+                    self.element.one('load', function () {
+                        URL.revokeObjectURL(objectURL);
+                    });
+                    self.setSource(objectURL);
+                });
+            } else {
+                // Task status response, the image is now cached.
+                return response.json().then(function (data) {
+                    if (data.status === 'SUCCESS') {
+                        self.setSource(dataURL);
                     } else {
-                        container.html(
-                            MayanImage.options.templateInvalidDocument
-                        );
+                        self.showError();
                     }
                 });
-            }, 1);
-        }
+            }
+        }).catch(function () {
+            self.showError();
+        });
+    };
+
+    setSource (source) {
+        var self = this;
+
+        this.element.attr('src', source);
+        setTimeout(function () {
+            self.element.on('error', function () {
+                // Check the .complete property to see if it is a real
+                // error or it was a cached image
+                if (this.complete === false) {
+                    // It is a cached image, set the src attribute to
+                    // trigger its display.
+                    this.src = source;
+                } else {
+                    self.showError();
+                }
+            });
+        }, 1);
+    };
+
+    showError () {
+        this.element.parent().parent().parent().html(
+            MayanImage.options.templateInvalidDocument
+        );
     };
 }
 
@@ -1,8 +1,16 @@
-from django.http import QueryDict
+import os
+import re
+import uuid
+
+from django.http import QueryDict, StreamingHttpResponse
 from django.urls import reverse
 from django.utils.encoding import force_bytes
 from django.utils.six import PY3
 
+from .literals import HTTP_RANGE_BLOCK_SIZE, HTTP_RANGE_MAXIMUM_COUNT
+
+REGEX_RANGE_SPECIFIER = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
 
 class URL(object):
     def __init__(
@@ -44,3 +52,144 @@ class URL(object):
             return result
         else:
             return force_bytes(result)
+
+
+def get_range_content(file_object, ranges, size, content_type, boundary=None):
+    """
+    Generator that returns the content of the requested ranges of a
+    seekable file object. Multiple ranges are returned as the parts of a
+    multipart/byteranges body separated by the boundary.
+    """
+    try:
+        for start, end in ranges:
+            if boundary:
+                yield get_range_part_header(
+                    boundary=boundary, content_type=content_type,
+                    end=end, size=size, start=start
+                )
+
+            file_object.seek(start, os.SEEK_SET)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = file_object.read(min(remaining, HTTP_RANGE_BLOCK_SIZE))
+                if not data:
+                    break
+
+                remaining -= len(data)
+                yield force_bytes(data)
+
+            if boundary:
+                yield b'\r\n'
+
+        if boundary:
+            yield force_bytes('--{}--\r\n'.format(boundary))
+    finally:
+        file_object.close()
+
+
+def get_range_content_length(ranges, size, content_type, boundary=None):
+    length = sum([end - start + 1 for start, end in ranges])
+
+    if boundary:
+        for start, end in ranges:
+            length += len(
+                get_range_part_header(
+                    boundary=boundary, content_type=content_type,
+                    end=end, size=size, start=start
+                )
+            ) + 2
+
+        length += len('--{}--\r\n'.format(boundary))
+
+    return length
+
+
+def get_range_part_header(boundary, content_type, start, end, size):
+    return force_bytes(
+        '--{}\r\nContent-Type: {}\r\nContent-Range: bytes {}-{}/{}\r\n\r\n'.format(
+            boundary, content_type, start, end, size
+        )
+    )
+
+
+def get_range_response(
+    file_object, ranges, size, content_type,
+    response_class=StreamingHttpResponse, **kwargs
+):
+    """
+    Return a 206 partial content response with the ranges of the file
+    object. A single range is returned as is, multiple ranges as a
+    multipart/byteranges body.
+    """
+    if len(ranges) == 1:
+        boundary = None
+        response_content_type = content_type
+    else:
+        boundary = uuid.uuid4().hex
+        response_content_type = 'multipart/byteranges; boundary={}'.format(
+            boundary
+        )
+
+    response = response_class(
+        content_type=response_content_type, status=206,
+        streaming_content=get_range_content(
+            boundary=boundary, content_type=content_type,
+            file_object=file_object, ranges=ranges, size=size
+        ), **kwargs
+    )
+    response['Content-Length'] = get_range_content_length(
+        boundary=boundary, content_type=content_type, ranges=ranges,
+        size=size
+    )
+
+    if not boundary:
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(
+            ranges[0][0], ranges[0][1], size
+        )
+
+    return response
+
+
+def parse_range_header(value, size):
+    """
+    Parse the value of a Range header for a resource of the given size.
+    Return the list of inclusive (start, end) byte positions, an empty list
+    if none of the ranges can be satisfied, or None if the header is
+    invalid or requests too many ranges and must be ignored.
+    """
+    unit, separator, specifiers = value.partition('=')
+    if not separator or unit.strip().lower() != 'bytes':
+        return None
+
+    specifiers = specifiers.split(',')
+    if len(specifiers) > HTTP_RANGE_MAXIMUM_COUNT:
+        return None
+
+    ranges = []
+    for specifier in specifiers:
+        match = REGEX_RANGE_SPECIFIER.match(specifier)
+        if not match:
+            return None
+
+        start, end = match.groups()
+        if not start:
+            if not end:
+                return None
+
+            # Suffix range, the last bytes of the file.
+            suffix_length = int(end)
+            if suffix_length:
+                ranges.append((max(size - suffix_length, 0), size - 1))
+        else:
+            start = int(start)
+            if end:
+                end = int(end)
+                if end < start:
+                    return None
+            else:
+                end = size - 1
+
+            if start < size:
+                ranges.append((start, min(end, size - 1)))
+
+    return ranges
@@ -5,6 +5,9 @@ DEFAULT_FIREFOX_GECKODRIVER_PATH = '/usr/bin/geckodriver'
 DELETE_STALE_UPLOADS_INTERVAL = 60 * 10  # 10 minutes
 DJANGO_SQLITE_BACKEND = 'django.db.backends.sqlite3'
 
+HTTP_RANGE_BLOCK_SIZE = 64 * 1024  # 64K
+HTTP_RANGE_MAXIMUM_COUNT = 16
+
 MSG_MIME_TYPES = (
     'application/vnd.ms-outlook', 'application/vnd.ms-office'
 )
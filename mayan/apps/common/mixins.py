@@ -1,7 +1,10 @@
+import io
+import os
+
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
-from django.http import Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.translation import ungettext, ugettext_lazy as _
@@ -10,10 +13,13 @@ from django.views.generic.detail import SingleObjectMixin
 from mayan.apps.acls.classes import ModelPermission
 from mayan.apps.acls.models import AccessControlList
 from mayan.apps.permissions import Permission
+from mayan.apps.storage.settings import setting_offload_header
+from mayan.apps.storage.utils import get_offload_response
 
 from .compat import FileResponse
 from .exceptions import ActionError
 from .forms import DynamicForm
+from .http import get_range_response, parse_range_header
 from .literals import (
     PK_LIST_SEPARATOR, TEXT_CHOICE_ITEMS, TEXT_CHOICE_LIST,
     TEXT_LIST_AS_ITEMS_PARAMETER, TEXT_LIST_AS_ITEMS_VARIABLE_NAME
@@ -69,22 +75,116 @@ class DownloadMixin(object):
     def get_as_attachment(self):
         return self.as_attachment
 
+    def get_download_content_type(self):
+        """
+        Return the content type of the file when known in advance. Used for
+        partial content responses which don't inspect the file.
+        """
+        return None
+
+    def get_download_etag(self):
+        """
+        Return a quoted entity tag that identifies the content of the file.
+        Required to honor the If-Range header of range requests.
+        """
+        return None
+
     def get_download_file_object(self):
         raise NotImplementedError(
             'Class must provide a .get_download_file_object() method that '
             'return a file like object.'
         )
 
+    def get_download_file_path(self):
+        """
+        Return the filesystem path of the file to allow the front web server
+        to send it. Return None to stream the file object instead.
+        """
+        return None
+
+    def get_download_file_size(self, file_object):
+        """
+        Return the size of the file object if it supports seeking to
+        arbitrary positions, None otherwise.
+        """
+        try:
+            if file_object.seekable():
+                return file_object.size
+        except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
+            # Not a seekable file like object.
+            pass
+
     def get_download_filename(self):
         return None
 
-    def render_to_response(self, **response_kwargs):
-        return FileResponse(
+    def get_download_offload_response(self):
+        if setting_offload_header.value:
+            path = self.get_download_file_path()
+            if path:
+                if self.get_as_attachment():
+                    filename = self.get_download_filename() or os.path.basename(path)
+                else:
+                    filename = None
+
+                return get_offload_response(filename=filename, path=path)
+
+    def get_download_range_response(self, file_object, size):
+        range_header = self.request.META.get('HTTP_RANGE')
+        if not range_header:
+            return None
+
+        # A different entity tag or a date means the client copy is stale
+        # or can't be validated, send the whole file.
+        if_range = self.request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range != self.get_download_etag():
+            return None
+
+        ranges = parse_range_header(size=size, value=range_header)
+        if ranges is None:
+            return None
+
+        if not ranges:
+            file_object.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+
+        return get_range_response(
             as_attachment=self.get_as_attachment(),
-            filename=self.get_download_filename(),
-            streaming_content=self.get_download_file_object()
+            content_type=self.get_download_content_type() or 'application/octet-stream',
+            file_object=file_object, filename=self.get_download_filename(),
+            ranges=ranges, response_class=FileResponse, size=size
         )
 
+    def render_to_response(self, **response_kwargs):
+        response = self.get_download_offload_response()
+        if response:
+            return response
+
+        file_object = self.get_download_file_object()
+        size = self.get_download_file_size(file_object=file_object)
+
+        if size is not None:
+            response = self.get_download_range_response(
+                file_object=file_object, size=size
+            )
+
+        if size is None or not response:
+            response = FileResponse(
+                as_attachment=self.get_as_attachment(),
+                filename=self.get_download_filename(),
+                streaming_content=file_object
+            )
+
+        if size is not None:
+            response['Accept-Ranges'] = 'bytes'
+
+        etag = self.get_download_etag()
+        if etag:
+            response['ETag'] = etag
+
+        return response
+
 
 class DynamicFormViewMixin(object):
     form_class = DynamicForm
@@ -1,8 +1,33 @@
-from ..http import URL
+from ..http import URL, parse_range_header
 
 from .base import BaseTestCase
 
 
+class RangeHeaderTestCase(BaseTestCase):
+    def test_range_invalid(self):
+        self.assertEqual(parse_range_header(size=100, value='bytes=9-1'), None)
+        self.assertEqual(parse_range_header(size=100, value='items=0-1'), None)
+
+    def test_range_multiple(self):
+        self.assertEqual(
+            parse_range_header(size=100, value='bytes=0-9, 50-'),
+            [(0, 9), (50, 99)]
+        )
+
+    def test_range_single(self):
+        self.assertEqual(
+            parse_range_header(size=100, value='bytes=10-200'), [(10, 99)]
+        )
+
+    def test_range_suffix(self):
+        self.assertEqual(
+            parse_range_header(size=100, value='bytes=-10'), [(90, 99)]
+        )
+
+    def test_range_unsatisfiable(self):
+        self.assertEqual(parse_range_header(size=100, value='bytes=100-'), [])
+
+
 class URLTestCase(BaseTestCase):
     def test_query_to_string(self):
         url = URL(query={'a': 1})
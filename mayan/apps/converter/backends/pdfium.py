@@ -0,0 +1,201 @@
+import hashlib
+import io
+import logging
+import threading
+
+from django.utils.translation import ugettext_lazy as _
+
+from ..exceptions import PageCountError
+from ..literals import DEFAULT_PAGE_NUMBER, DEFAULT_PDFIUM_DPI
+from ..settings import setting_graphics_backend_arguments
+
+from .python import Python
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+logger = logging.getLogger(name=__name__)
+
+pdfium_dpi = setting_graphics_backend_arguments.value.get(
+    'pdfium_dpi', DEFAULT_PDFIUM_DPI
+)
+
+if not pypdfium2:
+    logger.warning(
+        'The pypdfium2 library is not installed, the PDFium backend will '
+        'use the poppler utilities instead.'
+    )
+
+
+class PDFiumDocumentCache(object):
+    """
+    Keeps the last PDF document opened by the process parsed and in memory
+    to avoid loading it again for consecutive requests of pages of the
+    same document. PDFium is not thread safe, the lock must be held while
+    using the document.
+    """
+    def __init__(self):
+        self.document = None
+        self.key = None
+        self.lock = threading.RLock()
+
+    def close(self):
+        if self.document is not None:
+            self.document.close()
+
+        self.document = None
+        self.key = None
+
+    def get_document(self, file_object):
+        """
+        Return the parsed document of the file. The file is identified by
+        a hash of its entire content, the content is read each time but
+        it is only parsed again when it changes.
+        """
+        try:
+            file_object.seek(0)
+        except (AttributeError, io.UnsupportedOperation):
+            # Not seekable, read the stream from its current position.
+            seekable = False
+        else:
+            seekable = True
+
+        data = file_object.read()
+        if seekable:
+            file_object.seek(0)
+
+        key = self.get_key(data=data)
+
+        if key != self.key:
+            self.close()
+            self.document = pypdfium2.PdfDocument(data)
+            self.key = key
+
+        return self.document
+
+    def get_key(self, data):
+        return hashlib.sha256(data).hexdigest()
+
+
+document_cache = PDFiumDocumentCache()
+
+
+class PDFium(Python):
+    """
+    Renders PDF pages and reads the page count in process using the PDFium
+    library instead of executing the poppler utilities. Other file types
+    and documents that PDFium fails to open are handled by the Python
+    backend.
+    """
+    def _render_page(self, document, page_number):
+        page = document[page_number - 1]
+        try:
+            return page.render(scale=pdfium_dpi / 72.0).to_pil()
+        finally:
+            page.close()
+
+    def convert(self, *args, **kwargs):
+        if self.mime_type == 'application/pdf' and pypdfium2:
+            # Skip Python.convert, set the page number attribute only.
+            super(Python, self).convert(*args, **kwargs)
+
+            try:
+                with document_cache.lock:
+                    return self._render_page(
+                        document=document_cache.get_document(
+                            file_object=self.file_object
+                        ), page_number=self.page_number + 1
+                    )
+            except pypdfium2.PdfiumError as exception:
+                logger.debug(
+                    'PDFium unable to render page; %s. Using the Python '
+                    'backend.', exception
+                )
+
+        return super(PDFium, self).convert(*args, **kwargs)
+
+    def detect_orientations(
+        self, page_number_first=DEFAULT_PAGE_NUMBER, page_number_last=None
+    ):
+        if self.mime_type == 'application/pdf' and pypdfium2:
+            result = {}
+            try:
+                with document_cache.lock:
+                    document = document_cache.get_document(
+                        file_object=self.file_object
+                    )
+                    if page_number_last is None:
+                        page_number_last = len(document)
+
+                    for page_number in range(
+                        page_number_first, page_number_last + 1
+                    ):
+                        page = document[page_number - 1]
+                        try:
+                            result[page_number] = page.get_rotation()
+                        finally:
+                            page.close()
+            except pypdfium2.PdfiumError as exception:
+                logger.debug(
+                    'PDFium unable to detect orientation; %s', exception
+                )
+            else:
+                return result
+
+        return super(PDFium, self).detect_orientations(
+            page_number_first=page_number_first,
+            page_number_last=page_number_last
+        )
+
+    def get_page_count(self):
+        if self.mime_type == 'application/pdf' and pypdfium2:
+            try:
+                with document_cache.lock:
+                    page_count = len(
+                        document_cache.get_document(
+                            file_object=self.file_object
+                        )
+                    )
+            except pypdfium2.PdfiumError as exception:
+                logger.debug(
+                    'PDFium unable to determine the page count; %s',
+                    exception
+                )
+            else:
+                if not page_count:
+                    raise PageCountError(_('PDF file has no pages.'))
+
+                logger.debug('Document contains %d pages', page_count)
+                return page_count
+
+        return super(PDFium, self).get_page_count()
+
+    def get_pages(
+        self, page_number_first=DEFAULT_PAGE_NUMBER, page_number_last=None,
+        output_format=None
+    ):
+        if self.mime_type != 'application/pdf' or not pypdfium2:
+            for result in super(PDFium, self).get_pages(
+                page_number_first=page_number_first,
+                page_number_last=page_number_last,
+                output_format=output_format
+            ):
+                yield result
+            return
+
+        if page_number_last is None:
+            page_number_last = self.get_page_count()
+
+        for page_number in range(page_number_first, page_number_last + 1):
+            # Release the lock between pages to not block other requests
+            # while the caller handles the page image.
+            with document_cache.lock:
+                self.image = self._render_page(
+                    document=document_cache.get_document(
+                        file_object=self.file_object
+                    ), page_number=page_number
+                )
+
+            yield page_number, self.get_page(output_format=output_format)
@@ -1,5 +1,7 @@
 import io
 import logging
+import os
+import re
 import shutil
 import struct
 
@@ -10,18 +12,24 @@ import sh
 from django.utils.encoding import force_text
 from django.utils.translation import ugettext_lazy as _
 
-from mayan.apps.storage.utils import NamedTemporaryFile
+from mayan.apps.storage.utils import NamedTemporaryFile, fs_cleanup, mkdtemp
 
 from ..classes import ConverterBase
 from ..exceptions import PageCountError
+from ..pdf import get_pdf_page_count
 from ..settings import setting_graphics_backend_arguments
+from ..tiff import get_tiff_frame_offsets
 
 from ..literals import (
-    DEFAULT_PDFTOPPM_DPI, DEFAULT_PDFTOPPM_FORMAT, DEFAULT_PDFTOPPM_PATH,
-    DEFAULT_PDFINFO_PATH, DEFAULT_PILLOW_MAXIMUM_IMAGE_PIXELS
+    DEFAULT_PAGE_NUMBER, DEFAULT_PDFTOPPM_DPI, DEFAULT_PDFTOPPM_FORMAT, DEFAULT_PDFTOPPM_PATH,
+    DEFAULT_PDFINFO_PATH, DEFAULT_PILLOW_MAXIMUM_IMAGE_PIXELS,
+    DEFAULT_TESSERACT_OSD_PATH
 )
 
 logger = logging.getLogger(name=__name__)
+
+REGEX_TESSERACT_OSD_ROTATE = re.compile(r'Rotate:\s*(\d+)')
+
 pdftoppm_path = setting_graphics_backend_arguments.value.get(
     'pdftoppm_path', DEFAULT_PDFTOPPM_PATH
 )
@@ -45,6 +53,24 @@ else:
 
     pdftoppm = pdftoppm.bake(pdftoppm_format, '-r', pdftoppm_dpi)
 
+tesseract_osd_path = setting_graphics_backend_arguments.value.get(
+    'tesseract_osd_path', DEFAULT_TESSERACT_OSD_PATH
+)
+
+if tesseract_osd_path:
+    try:
+        tesseract_osd = sh.Command(tesseract_osd_path)
+    except sh.CommandNotFound:
+        logger.warning(
+            'Tesseract not found at "%s", the orientation of scanned '
+            'images will not be detected.', tesseract_osd_path
+        )
+        tesseract_osd = None
+    else:
+        tesseract_osd = tesseract_osd.bake('stdin', 'stdout', '--psm', '0')
+else:
+    tesseract_osd = None
+
 pdfinfo_path = setting_graphics_backend_arguments.value.get(
     'pdfinfo_path', DEFAULT_PDFINFO_PATH
 )
@@ -84,37 +110,76 @@ class Python(ConverterBase):
             finally:
                 new_file_object.close()
 
+    def _detect_orientation_osd(self, image_buffer):
+        """
+        Use the orientation and script detection of Tesseract to determine
+        the rotation of a scanned page. Tesseract reports the clockwise
+        rotation that corrects the page.
+        """
+        try:
+            output = force_text(tesseract_osd(_in=image_buffer.read()))
+        except sh.ErrorReturnCode as exception:
+            logger.debug('Tesseract unable to detect orientation; %s', exception)
+        else:
+            match = REGEX_TESSERACT_OSD_ROTATE.search(output)
+            if match:
+                return (360 - int(match.group(1))) % 360
+
+    def _detect_orientations_pdf(self, page_number_first, page_number_last):
+        result = {}
+
+        self.file_object.seek(0)
+        try:
+            pdf = PyPDF2.PdfFileReader(self.file_object)
+            if pdf.isEncrypted:
+                # File is encrypted, try to decrypt using a blank password.
+                pdf.decrypt(password=b'')
+
+            if page_number_last is None:
+                page_number_last = pdf.getNumPages()
+
+            for page_number in range(page_number_first, page_number_last + 1):
+                degrees = pdf.getPage(page_number - 1).get('/Rotate', 0)
+                if isinstance(degrees, PyPDF2.generic.IndirectObject):
+                    degrees = degrees.getObject()
+
+                result[page_number] = int(degrees) % 360
+        except Exception as exception:
+            logger.error('Unable to detect PDF orientation; %s', exception)
+        finally:
+            self.file_object.seek(0)
+
+        return result
+
     def detect_orientation(self, page_number):
-        # Default rotation: 0 degrees
-        result = 0
+        return self.detect_orientations(
+            page_number_first=page_number, page_number_last=page_number
+        ).get(page_number, 0)
 
+    def detect_orientations(
+        self, page_number_first=DEFAULT_PAGE_NUMBER, page_number_last=None
+    ):
         # Use different ways depending on the file type
         if self.mime_type == 'application/pdf':
-            pdf = PyPDF2.PdfFileReader(self.file_object)
-            try:
-                result = pdf.getPage(page_number - 1).get('/Rotate', 0)
-                if isinstance(result, PyPDF2.generic.IndirectObject):
-                    result = result.getObject()
-            except Exception as exception:
-                self.file_object.seek(0)
-                pdf = PyPDF2.PdfFileReader(self.file_object)
-                if force_text(exception) == 'File has not been decrypted':
-                    # File is encrypted, try to decrypt using a blank
-                    # password.
-                    try:
-                        pdf.decrypt(password=b'')
-                    except Exception as exception:
-                        logger.error(
-                            'Unable to detect PDF orientation; %s', exception
-                        )
-                else:
-                    logger.error(
-                        'Unable to detect PDF orientation; %s', exception
-                    )
-            finally:
-                self.file_object.seek(0)
+            return self._detect_orientations_pdf(
+                page_number_first=page_number_first,
+                page_number_last=page_number_last
+            )
+        elif tesseract_osd and self.mime_type.startswith('image/'):
+            result = {}
+            for page_number, image_buffer in self.get_pages(
+                output_format='PNG', page_number_first=page_number_first,
+                page_number_last=page_number_last
+            ):
+                degrees = self._detect_orientation_osd(
+                    image_buffer=image_buffer
+                )
+                if degrees is not None:
+                    result[page_number] = degrees
 
-        return result
+            return result
+        else:
+            return {}
 
     def get_page_count(self):
         super(Python, self).get_page_count()
@@ -127,6 +192,13 @@ class Python(ConverterBase):
             else:
                 file_object = self.file_object
 
+            # Read the page count from the cross reference table first to
+            # avoid parsing the entire file.
+            page_count = get_pdf_page_count(file_object=file_object)
+            if page_count:
+                logger.debug('Document contains %d pages', page_count)
+                return page_count
+
             try:
                 # Try PyPDF to determine the page number
                 pdf_reader = PyPDF2.PdfFileReader(
@@ -176,6 +248,14 @@ class Python(ConverterBase):
             finally:
                 file_object.seek(0)
         else:
+            frame_offsets = get_tiff_frame_offsets(file_object=self.file_object)
+            if frame_offsets:
+                # Keep the index for the page seeks and to allow the
+                # caller to store it.
+                self.frame_offsets = frame_offsets
+                logger.debug('Document contains %d pages', len(frame_offsets))
+                return len(frame_offsets)
+
             try:
                 image = Image.open(self.file_object)
             except IOError as exception:
@@ -206,6 +286,65 @@ class Python(ConverterBase):
 
             return page_count
 
+    def get_pages(
+        self, page_number_first=DEFAULT_PAGE_NUMBER, page_number_last=None,
+        output_format=None
+    ):
+        """
+        Rasterize a range of PDF pages with a single pdftoppm execution
+        instead of one execution per page.
+        """
+        if self.mime_type != 'application/pdf' or not pdftoppm:
+            for result in super(Python, self).get_pages(
+                page_number_first=page_number_first,
+                page_number_last=page_number_last,
+                output_format=output_format
+            ):
+                yield result
+            return
+
+        if page_number_last is None:
+            page_number_last = self.get_page_count()
+
+        output_directory = mkdtemp()
+        try:
+            with NamedTemporaryFile() as temporary_file_object:
+                self.file_object.seek(0)
+                shutil.copyfileobj(
+                    fsrc=self.file_object, fdst=temporary_file_object
+                )
+                self.file_object.seek(0)
+                temporary_file_object.seek(0)
+
+                pdftoppm(
+                    temporary_file_object.name,
+                    os.path.join(output_directory, 'page'),
+                    f=page_number_first, l=page_number_last
+                )
+
+            # pdftoppm names the output files "page-<page number>.<ext>"
+            # and zero pads the page number according to the total page
+            # count of the document.
+            page_files = {}
+            for filename in os.listdir(output_directory):
+                page_number = int(
+                    os.path.splitext(filename)[0].rsplit('-', 1)[-1]
+                )
+                page_files[page_number] = os.path.join(
+                    output_directory, filename
+                )
+
+            for page_number in sorted(page_files):
+                with open(page_files[page_number], mode='rb') as file_object:
+                    self.image = Image.open(file_object)
+                    self.image.load()
+
+                fs_cleanup(filename=page_files[page_number])
+
+                yield page_number, self.get_page(output_format=output_format)
+        finally:
+            fs_cleanup(filename=output_directory)
+
     def get_pdfinfo_page_count(self, file_object):
         process = pdfinfo('-', _in=file_object)
         page_count = int(
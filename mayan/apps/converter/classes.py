@@ -1,5 +1,4 @@
 import copy
-from io import BytesIO
 import logging
 import os
 import shutil
@@ -26,22 +25,50 @@ from mayan.apps.storage.utils import (
 )
 
 from .exceptions import InvalidOfficeFormat, OfficeConversionError
+from .libreoffice import LibreOfficeWorkerPool, uno
 from .literals import (
     CONVERTER_OFFICE_FILE_MIMETYPES, DEFAULT_LIBREOFFICE_PATH,
-    DEFAULT_PAGE_NUMBER, DEFAULT_PILLOW_FORMAT
+    DEFAULT_LIBREOFFICE_POOL_MAXIMUM_JOBS, DEFAULT_LIBREOFFICE_POOL_SIZE,
+    DEFAULT_LIBREOFFICE_POOL_TIMEOUT, DEFAULT_PAGE_NUMBER,
+    TRANSFORMATION_PLAN_REDUCING_GAP
 )
 from .settings import setting_graphics_backend_arguments
+from .tiff import get_tiff_frame_offsets, seek_tiff_frame
+from .utils import get_image_buffer
 
 libreoffice_path = setting_graphics_backend_arguments.value.get(
     'libreoffice_path', DEFAULT_LIBREOFFICE_PATH
 )
+libreoffice_pool_size = setting_graphics_backend_arguments.value.get(
+    'libreoffice_pool_size', DEFAULT_LIBREOFFICE_POOL_SIZE
+)
 
 logger = logging.getLogger(name=__name__)
 
+if libreoffice_pool_size and uno:
+    libreoffice_pool = LibreOfficeWorkerPool(
+        libreoffice_path=libreoffice_path,
+        maximum_jobs=setting_graphics_backend_arguments.value.get(
+            'libreoffice_pool_maximum_jobs',
+            DEFAULT_LIBREOFFICE_POOL_MAXIMUM_JOBS
+        ), size=libreoffice_pool_size,
+        timeout=setting_graphics_backend_arguments.value.get(
+            'libreoffice_pool_timeout', DEFAULT_LIBREOFFICE_POOL_TIMEOUT
+        )
+    )
+else:
+    if libreoffice_pool_size:
+        logger.warning(
+            'The LibreOffice Python UNO bindings are not installed, '
+            'the LibreOffice worker pool is disabled.'
+        )
+    libreoffice_pool = None
+
 
 class ConverterBase(object):
-    def __init__(self, file_object, mime_type=None):
+    def __init__(self, file_object, mime_type=None, frame_offsets=None):
         self.file_object = file_object
+        self.frame_offsets = frame_offsets
         self.image = None
         self.mime_type = mime_type or get_mimetype(
             file_object=file_object, mimetype_only=False
@@ -62,27 +89,51 @@ class ConverterBase(object):
         # Must be overridden by subclass
         pass
 
-    def get_page(self, output_format=None):
-        output_format = output_format or setting_graphics_backend_arguments.value.get(
-            'pillow_format', DEFAULT_PILLOW_FORMAT
-        )
+    def detect_orientations(
+        self, page_number_first=DEFAULT_PAGE_NUMBER, page_number_last=None
+    ):
+        """
+        Return a dictionary with the rotation in degrees of each page in
+        the range. Pages whose rotation can't be determined are not
+        included. Backends should override this method to inspect all the
+        pages in a single pass.
+        """
+        if page_number_last is None:
+            page_number_last = self.get_page_count()
 
-        if not self.image:
-            self.seek_page(page_number=0)
+        result = {}
+        for page_number in range(page_number_first, page_number_last + 1):
+            degrees = self.detect_orientation(page_number=page_number)
+            if degrees is not None:
+                result[page_number] = degrees
 
-        image_buffer = BytesIO()
-        new_mode = self.image.mode
+        return result
 
-        if output_format.upper() == 'JPEG':
-            # JPEG doesn't support transparency channel, convert the image to
-            # RGB. Removes modes: P and RGBA
-            new_mode = 'RGB'
+    def get_page(self, output_format=None, quality=None):
+        if not self.image:
+            self.seek_page(page_number=0)
 
-        self.image.convert(new_mode).save(image_buffer, format=output_format)
+        return get_image_buffer(
+            image=self.image, output_format=output_format, quality=quality
+        )
 
-        image_buffer.seek(0)
+    def get_pages(
+        self, page_number_first=DEFAULT_PAGE_NUMBER, page_number_last=None,
+        output_format=None
+    ):
+        """
+        Generator that returns a tuple of page number and image buffer for
+        each page in the range. Page numbers start at 1. If no last page is
+        specified, all the pages until the end of the document are returned.
+        Backends can override this method to render several pages in a
+        single pass.
+        """
+        if page_number_last is None:
+            page_number_last = self.get_page_count()
 
-        return image_buffer
+        for page_number in range(page_number_first, page_number_last + 1):
+            self.seek_page(page_number=page_number - 1)
+            yield page_number, self.get_page(output_format=output_format)
 
     def get_page_count(self):
         try:
@@ -113,13 +164,34 @@ class ConverterBase(object):
             )
             raise
         else:
-            self.image.seek(page_number)
-            self.image.load()
+            if self.image.format == 'TIFF':
+                # Index the frames once per converter instead of walking
+                # the IFD chain on every seek.
+                if self.frame_offsets is None:
+                    self.frame_offsets = get_tiff_frame_offsets(
+                        file_object=self.file_object
+                    )
+
+                seek_tiff_frame(
+                    image=self.image, frame=page_number,
+                    frame_offsets=self.frame_offsets
+                )
+            else:
+                self.image.seek(page_number)
+
+            # JPEG images have a single frame and are decoded on first use,
+            # after TransformationPlan has had the chance to request a
+            # reduced scale decode with .draft().
+            if self.image.format != 'JPEG':
+                self.image.load()
 
     def soffice(self):
         """
         Executes LibreOffice as a sub process
         """
+        if libreoffice_pool:
+            return self.soffice_pool()
+
         if not self.command_libreoffice:
             raise OfficeConversionError(
                 _('LibreOffice not installed or not found.')
@@ -201,6 +273,36 @@ class ConverterBase(object):
         temporary_converted_file_object.seek(0)
         return temporary_converted_file_object
 
+    def soffice_pool(self):
+        """
+        Converts the file using one of the persistent LibreOffice workers
+        """
+        output_directory = mkdtemp()
+        try:
+            with NamedTemporaryFile() as temporary_file_object:
+                self.file_object.seek(0)
+                shutil.copyfileobj(
+                    fsrc=self.file_object, fdst=temporary_file_object
+                )
+                self.file_object.seek(0)
+                temporary_file_object.seek(0)
+
+                converted_file_path = os.path.join(
+                    output_directory, 'converted.pdf'
+                )
+                libreoffice_pool.convert(
+                    destination_filename=converted_file_path,
+                    mime_type=self.mime_type,
+                    source_filename=temporary_file_object.name
+                )
+
+            # Return the output file directly instead of copying it. The
+            # file remains accessible after its directory entry is deleted
+            # until the caller closes it.
+            return open(converted_file_path, mode='rb')
+        finally:
+            fs_cleanup(filename=output_directory)
+
     def to_pdf(self):
         # Handle .msg files
         if self.mime_type in MSG_MIME_TYPES:
@@ -235,8 +337,83 @@ class ConverterBase(object):
         if not self.image:
             self.seek_page(page_number=0)
 
-        for transformation in transformations:
-            self.image = transformation.execute_on(image=self.image)
+        self.image = TransformationPlan(
+            transformations=transformations
+        ).execute_on(image=self.image)
+
+
+class TransformationPlan(object):
+    """
+    Execution plan of a list of transformations. The trailing run of
+    scaling transformations (resize, zoom) and lossless geometric
+    transformations (flip, mirror, rotations by multiples of 90 degrees)
+    is fused into a single resample of the image followed by the
+    transpositions, which then operate on the smaller image. JPEG images
+    not yet decoded are downscaled by the decoder itself. The
+    transformation list is not modified, the cache key produced from it
+    by BaseTransformation.combine() remains the same.
+    """
+    def __init__(self, transformations):
+        self.transformations = list(transformations)
+
+        index = len(self.transformations)
+        while index and self._is_plannable(self.transformations[index - 1]):
+            index -= 1
+
+        self.transformations_direct = self.transformations[:index]
+        self.transformations_planned = self.transformations[index:]
+
+    def _is_plannable(self, transformation):
+        return transformation.get_transpositions() is not None or transformation.get_scaled_size(size=(1, 1)) is not None
+
+    def execute_on(self, image):
+        for transformation in self.transformations_direct:
+            image = transformation.execute_on(image=image)
+
+        if not any(
+            transformation.get_transpositions() is None for transformation in self.transformations_planned
+        ):
+            # No scaling, nothing to gain from planning.
+            for transformation in self.transformations_planned:
+                image = transformation.execute_on(image=image)
+
+            return image
+
+        size = image.size
+        swapped = False
+        transpositions = []
+
+        for transformation in self.transformations_planned:
+            transformation_transpositions = transformation.get_transpositions()
+
+            if transformation_transpositions is None:
+                size = transformation.get_scaled_size(size=size)
+            else:
+                for method in transformation_transpositions:
+                    if method in (Image.ROTATE_90, Image.ROTATE_270):
+                        size = (size[1], size[0])
+                        swapped = not swapped
+
+                transpositions.extend(transformation_transpositions)
+
+        # Scale in the orientation of the source image.
+        if swapped:
+            size = (size[1], size[0])
+
+        if size != image.size:
+            logger.debug('Planned resize from %s to %s', image.size, size)
+            # Only has effect on JPEG images not yet decoded, lets the
+            # decoder downscale by a power of two at least to the size.
+            image.draft(image.mode, size)
+            image = image.resize(
+                size, Image.ANTIALIAS,
+                reducing_gap=TRANSFORMATION_PLAN_REDUCING_GAP
+            )
+
+        for method in transpositions:
+            image = image.transpose(method)
+
+        return image
 
 
 @python_2_unicode_compatible
@@ -0,0 +1,269 @@
+import atexit
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+
+from django.utils.translation import ugettext_lazy as _
+
+from mayan.apps.storage.utils import fs_cleanup, mkdtemp
+
+from .exceptions import OfficeConversionError
+from .literals import (
+    LIBREOFFICE_CONNECTION_RETRY_DELAY, LIBREOFFICE_CONNECTION_TIMEOUT,
+    LIBREOFFICE_EXPORT_FILTERS, LIBREOFFICE_EXPORT_FILTER_DEFAULT
+)
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+logger = logging.getLogger(name=__name__)
+
+
+class LibreOfficeWorker(object):
+    """
+    A long lived headless LibreOffice process listening on a named pipe.
+    Conversions are dispatched using the UNO bridge to avoid paying the
+    LibreOffice start up cost for every document.
+    """
+    def __init__(self, libreoffice_path, maximum_jobs, timeout):
+        self.desktop = None
+        self.job_count = 0
+        self.libreoffice_path = libreoffice_path
+        self.maximum_jobs = maximum_jobs
+        self.process = None
+        self.profile_directory = None
+        self.timeout = timeout
+
+    def __str__(self):
+        return 'LibreOffice worker {}'.format(
+            self.process and self.process.pid
+        )
+
+    def _connect(self, pipe_name):
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context
+        )
+        start_time = time.time()
+
+        while True:
+            try:
+                context = resolver.resolve(
+                    'uno:pipe,name={};urp;StarOffice.ComponentContext'.format(
+                        pipe_name
+                    )
+                )
+            except Exception as exception:
+                if self.process.poll() is not None or time.time() - start_time > LIBREOFFICE_CONNECTION_TIMEOUT:
+                    raise OfficeConversionError(
+                        _('Unable to connect to LibreOffice; %s') % exception
+                    )
+                time.sleep(LIBREOFFICE_CONNECTION_RETRY_DELAY)
+            else:
+                return context.ServiceManager.createInstanceWithContext(
+                    'com.sun.star.frame.Desktop', context
+                )
+
+    def _convert(self, source_filename, destination_filename, mime_type, result):
+        try:
+            load_properties = [PropertyValue(Name='Hidden', Value=True)]
+
+            if mime_type == 'text/plain':
+                load_properties.extend(
+                    (
+                        PropertyValue(
+                            Name='FilterName', Value='Text (encoded)'
+                        ),
+                        PropertyValue(
+                            Name='FilterOptions', Value='UTF8,LF,,,'
+                        )
+                    )
+                )
+
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(source_filename), '_blank', 0,
+                tuple(load_properties)
+            )
+
+            if not document:
+                raise OfficeConversionError(
+                    _('LibreOffice was unable to load the document.')
+                )
+
+            try:
+                export_filter = LIBREOFFICE_EXPORT_FILTER_DEFAULT
+                for service_name, filter_name in LIBREOFFICE_EXPORT_FILTERS:
+                    if document.supportsService(service_name):
+                        export_filter = filter_name
+                        break
+
+                document.storeToURL(
+                    uno.systemPathToFileUrl(destination_filename),
+                    (PropertyValue(Name='FilterName', Value=export_filter),)
+                )
+            finally:
+                document.close(True)
+        except Exception as exception:
+            result['exception'] = exception
+
+    def convert(self, source_filename, destination_filename, mime_type=None):
+        if not self.is_alive():
+            self.start()
+
+        result = {}
+        thread = threading.Thread(
+            kwargs={
+                'destination_filename': destination_filename,
+                'mime_type': mime_type, 'result': result,
+                'source_filename': source_filename
+            }, target=self._convert
+        )
+        thread.daemon = True
+        thread.start()
+        thread.join(timeout=self.timeout)
+
+        if thread.is_alive():
+            # Killing the process makes the blocked UNO call raise and
+            # ends the thread.
+            logger.error(
+                '%s timed out after %d seconds, restarting.', self,
+                self.timeout
+            )
+            self.kill()
+            raise OfficeConversionError(
+                _('LibreOffice conversion timed out.')
+            )
+
+        self.job_count += 1
+
+        if 'exception' in result:
+            logger.error(
+                '%s conversion error; %s', self, result['exception']
+            )
+            self.kill()
+            raise OfficeConversionError(result['exception'])
+
+        if self.maximum_jobs and self.job_count >= self.maximum_jobs:
+            logger.debug('%s reached the maximum job count.', self)
+            self.stop()
+
+    def _cleanup(self):
+        self.desktop = None
+        self.process = None
+
+        if self.profile_directory:
+            fs_cleanup(filename=self.profile_directory)
+            self.profile_directory = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        pipe_name = 'mayan_libreoffice_{}'.format(uuid.uuid4().hex)
+        self.profile_directory = mkdtemp()
+        self.job_count = 0
+
+        self.process = subprocess.Popen(
+            args=(
+                self.libreoffice_path, '--headless', '--invisible',
+                '--nodefault', '--nolockcheck', '--nologo', '--norestore',
+                '--accept=pipe,name={};urp;'.format(pipe_name),
+                '-env:UserInstallation=file://{}'.format(
+                    os.path.join(
+                        self.profile_directory, 'LibreOffice_Conversion'
+                    )
+                ),
+            ), env=dict(os.environ, HOME=self.profile_directory),
+            stderr=subprocess.DEVNULL, stdout=subprocess.DEVNULL
+        )
+
+        try:
+            self.desktop = self._connect(pipe_name=pipe_name)
+        except Exception:
+            self.kill()
+            raise
+
+        logger.debug('%s started.', self)
+
+    def kill(self):
+        """
+        Terminate the process without waiting for LibreOffice to finish
+        the current job.
+        """
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+
+        self._cleanup()
+
+    def stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception as exception:
+                logger.debug('Error terminating LibreOffice; %s', exception)
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=LIBREOFFICE_CONNECTION_RETRY_DELAY)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+        self._cleanup()
+
+
+class LibreOfficeWorkerPool(object):
+    """
+    Fixed size pool of LibreOffice workers. Workers are started lazily on
+    first use, which also means each process of a prefork task worker
+    gets its own pool.
+    """
+    def __init__(self, libreoffice_path, size, maximum_jobs=0, timeout=None):
+        self.libreoffice_path = libreoffice_path
+        self.lock = threading.Lock()
+        self.maximum_jobs = maximum_jobs
+        self.size = size
+        self.timeout = timeout
+        self.idle_workers = queue.Queue()
+        self.workers = []
+
+        atexit.register(self.stop)
+
+    def _acquire_worker(self):
+        try:
+            return self.idle_workers.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                if len(self.workers) < self.size:
+                    worker = LibreOfficeWorker(
+                        libreoffice_path=self.libreoffice_path,
+                        maximum_jobs=self.maximum_jobs,
+                        timeout=self.timeout
+                    )
+                    self.workers.append(worker)
+                    return worker
+
+            return self.idle_workers.get()
+
+    def convert(self, source_filename, destination_filename, mime_type=None):
+        worker = self._acquire_worker()
+        try:
+            worker.convert(
+                destination_filename=destination_filename,
+                mime_type=mime_type, source_filename=source_filename
+            )
+        finally:
+            self.idle_workers.put(worker)
+
+    def stop(self):
+        with self.lock:
+            for worker in self.workers:
+                worker.stop()
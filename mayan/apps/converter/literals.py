@@ -56,11 +56,43 @@ else:
     DEFAULT_PDFINFO_PATH = '/usr/bin/pdfinfo'
     DEFAULT_PDFTOPPM_PATH = '/usr/bin/pdftoppm'
 
+DEFAULT_LIBREOFFICE_POOL_MAXIMUM_JOBS = 100
+DEFAULT_LIBREOFFICE_POOL_SIZE = 0
+DEFAULT_LIBREOFFICE_POOL_TIMEOUT = 300
+
+LIBREOFFICE_CONNECTION_RETRY_DELAY = 0.5
+LIBREOFFICE_CONNECTION_TIMEOUT = 60
+LIBREOFFICE_EXPORT_FILTER_DEFAULT = 'writer_pdf_Export'
+LIBREOFFICE_EXPORT_FILTERS = (
+    ('com.sun.star.sheet.SpreadsheetDocument', 'calc_pdf_Export'),
+    ('com.sun.star.presentation.PresentationDocument', 'impress_pdf_Export'),
+    ('com.sun.star.drawing.DrawingDocument', 'draw_pdf_Export'),
+)
+
 DEFAULT_ZOOM_LEVEL = 100
 DEFAULT_ROTATION = 0
 DEFAULT_PAGE_NUMBER = 1
 DEFAULT_PILLOW_FORMAT = 'JPEG'
 DEFAULT_PILLOW_MAXIMUM_IMAGE_PIXELS = 89478485  # Upstream default as of v6.2.1 (2019-01-16)
 
+# Disabled by default, set the path of the Tesseract binary to enable.
+DEFAULT_TESSERACT_OSD_PATH = None
+
+PDF_OBJECT_MAXIMUM_SIZE = 16 * 2 ** 20  # 16 Megabytes
+PDF_READ_BLOCK_SIZE = 4096
+PDF_XREF_MAXIMUM_SECTIONS = 64
+
+TIFF_MAXIMUM_FRAMES = 100000
+
+TRANSFORMATION_PLAN_REDUCING_GAP = 2.0
+
+# Image output formats in order of preference and their MIME types.
+IMAGE_OUTPUT_FORMATS = ('AVIF', 'WEBP', 'JPEG', 'PNG')
+IMAGE_OUTPUT_FORMAT_MIMETYPES = {
+    'AVIF': 'image/avif', 'JPEG': 'image/jpeg', 'PNG': 'image/png',
+    'WEBP': 'image/webp'
+}
+
+DEFAULT_PDFIUM_DPI = 300
 DEFAULT_PDFTOPPM_DPI = 300
 DEFAULT_PDFTOPPM_FORMAT = 'jpeg'  # Possible values jpeg, png, tiff
@@ -109,11 +109,11 @@ class LayerTransformationManager(models.Manager):
                         else:
                             kwargs = {}
 
-                        result.append(
-                            transformation_class(
-                                **kwargs
-                            )
+                        transformation_instance = transformation_class(
+                            **kwargs
                         )
+                        transformation_instance.object_layer_id = transformation.object_layer_id
+                        result.append(transformation_instance)
                     except Exception as exception:
                         logger.error(
                             'Error while parsing transformation "%s", '
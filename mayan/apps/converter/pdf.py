@@ -0,0 +1,316 @@
+import logging
+import os
+import re
+import zlib
+
+from .literals import (
+    PDF_OBJECT_MAXIMUM_SIZE, PDF_READ_BLOCK_SIZE, PDF_XREF_MAXIMUM_SECTIONS
+)
+
+logger = logging.getLogger(name=__name__)
+
+REGEX_DICTIONARY_INTEGER = r'/{}\s+(\d+)\b(?!\s+\d+\s+R)'
+REGEX_DICTIONARY_REFERENCE = r'/{}\s+(\d+)\s+(\d+)\s+R'
+REGEX_OBJECT_HEADER = re.compile(br'\s*(\d+)\s+(\d+)\s+obj')
+REGEX_STARTXREF = re.compile(br'startxref\s+(\d+)')
+REGEX_XREF_ENTRY = re.compile(br'(\d{10})\s(\d{5})\s([fn])')
+REGEX_XREF_SUBSECTION = re.compile(br'\s*(\d+)\s+(\d+)\s*[\r\n]+')
+
+
+class PDFPageCountReader(object):
+    """
+    Determine the page count of a PDF file by following the cross reference
+    table from the end of the file to the document catalog and reading the
+    /Count entry of the root of the page tree. Only the objects in that
+    path are read, instead of parsing the whole file. Files that use
+    features not supported by this reader (encrypted object streams,
+    filters other than Flate, damaged cross reference tables) raise a
+    ValueError and must be handled by a full parser.
+    """
+    def __init__(self, file_object):
+        self.file_object = file_object
+        self.entries = {}
+
+        self.file_object.seek(0, os.SEEK_END)
+        self.size = self.file_object.tell()
+
+    def _get_dictionary_integer(self, data, key):
+        match = re.search(
+            force_pattern(REGEX_DICTIONARY_INTEGER.format(key)), data
+        )
+        if match:
+            return int(match.group(1))
+
+    def _get_dictionary_reference(self, data, key):
+        match = re.search(
+            force_pattern(REGEX_DICTIONARY_REFERENCE.format(key)), data
+        )
+        if match:
+            return int(match.group(1))
+
+    def _read(self, offset, size):
+        self.file_object.seek(offset)
+        return self.file_object.read(size)
+
+    def _read_until(self, offset, marker):
+        """
+        Read from the offset until the marker is found, in blocks, up to a
+        maximum size.
+        """
+        data = b''
+        while len(data) < PDF_OBJECT_MAXIMUM_SIZE:
+            block = self._read(
+                offset=offset + len(data), size=PDF_READ_BLOCK_SIZE
+            )
+            if not block:
+                break
+
+            # Only search the new data and the end of the previous block
+            # where the marker could be split.
+            search_start = max(len(data) - len(marker), 0)
+            data += block
+            position = data.find(marker, search_start)
+            if position != -1:
+                return data[:position]
+
+        raise ValueError('Marker {} not found.'.format(marker))
+
+    def _read_stream_object(self, offset):
+        data = self._read_until(offset=offset, marker=b'endstream')
+        dictionary, separator, stream = data.partition(b'stream')
+        if not separator:
+            raise ValueError('Object at offset {} is not a stream.'.format(offset))
+
+        # The stream keyword is followed by CRLF or LF.
+        if stream.startswith(b'\r\n'):
+            stream = stream[2:]
+        elif stream.startswith(b'\n'):
+            stream = stream[1:]
+
+        if b'/Filter' in dictionary:
+            if b'/FlateDecode' not in dictionary:
+                raise ValueError('Unsupported stream filter.')
+
+            stream = zlib.decompressobj().decompress(stream)
+
+            predictor = self._get_dictionary_integer(
+                data=dictionary, key='Predictor'
+            )
+            if predictor and predictor >= 10:
+                stream = decode_png_predictor(
+                    data=stream, columns=self._get_dictionary_integer(
+                        data=dictionary, key='Columns'
+                    ) or 1
+                )
+
+        return dictionary, stream
+
+    def _read_xref_stream(self, offset):
+        dictionary, stream = self._read_stream_object(offset=offset)
+        if b'/XRef' not in dictionary:
+            raise ValueError('Object at offset {} is not a xref stream.'.format(offset))
+
+        widths = [
+            int(width) for width in re.search(
+                br'/W\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s*\]', dictionary
+            ).groups()
+        ]
+        index_match = re.search(br'/Index\s*\[([\d\s]+)\]', dictionary)
+        if index_match:
+            index = [int(value) for value in index_match.group(1).split()]
+        else:
+            index = [
+                0, self._get_dictionary_integer(data=dictionary, key='Size')
+            ]
+
+        entry_size = sum(widths)
+        position = 0
+        for start, count in zip(index[::2], index[1::2]):
+            for object_number in range(start, start + count):
+                entry = stream[position:position + entry_size]
+                position += entry_size
+
+                fields = []
+                field_position = 0
+                for width in widths:
+                    fields.append(
+                        int.from_bytes(
+                            entry[field_position:field_position + width],
+                            byteorder='big'
+                        )
+                    )
+                    field_position += width
+
+                # Default type is 1 when the first field is omitted.
+                entry_type = fields[0] if widths[0] else 1
+
+                if object_number not in self.entries:
+                    if entry_type == 1:
+                        self.entries[object_number] = (1, fields[1])
+                    elif entry_type == 2:
+                        self.entries[object_number] = (2, fields[1], fields[2])
+
+        return dictionary
+
+    def _read_xref_table(self, offset):
+        # Skip the "xref" keyword.
+        position = offset + 4
+
+        while True:
+            header = self._read(offset=position, size=64)
+            match = REGEX_XREF_SUBSECTION.match(header)
+            if not match:
+                break
+
+            start, count = int(match.group(1)), int(match.group(2))
+            position += match.end()
+
+            entries = REGEX_XREF_ENTRY.findall(
+                self._read(offset=position, size=count * 20)
+            )
+            if len(entries) != count:
+                raise ValueError('Damaged cross reference table.')
+
+            for object_number, entry in enumerate(entries, start):
+                if object_number not in self.entries and entry[2] == b'n':
+                    self.entries[object_number] = (1, int(entry[0]))
+
+            position += count * 20
+
+        return self._read_until(offset=position, marker=b'startxref')
+
+    def get_object(self, object_number):
+        entry = self.entries.get(object_number)
+        if not entry:
+            raise ValueError('Object {} not found.'.format(object_number))
+
+        if entry[0] == 1:
+            data = self._read_until(offset=entry[1], marker=b'endobj')
+            match = REGEX_OBJECT_HEADER.match(data)
+            if not match or int(match.group(1)) != object_number:
+                raise ValueError('Invalid offset of object {}.'.format(object_number))
+
+            return data[match.end():]
+        else:
+            # Object stored in an object stream.
+            dictionary, stream = self._read_stream_object(
+                offset=self.entries[entry[1]][1]
+            )
+            first = self._get_dictionary_integer(data=dictionary, key='First')
+            count = self._get_dictionary_integer(data=dictionary, key='N')
+            header = [int(value) for value in stream[:first].split()]
+            offsets = header[1::2][:count]
+
+            position = entry[2]
+            end = offsets[position + 1] if position + 1 < count else len(stream) - first
+            return stream[first + offsets[position]:first + end]
+
+    def get_page_count(self):
+        tail = self._read(
+            offset=max(self.size - PDF_READ_BLOCK_SIZE, 0),
+            size=PDF_READ_BLOCK_SIZE
+        )
+        matches = REGEX_STARTXREF.findall(tail)
+        if not matches:
+            raise ValueError('startxref not found.')
+
+        offsets = [int(matches[-1])]
+        visited = set()
+        root = None
+
+        while offsets:
+            offset = offsets.pop(0)
+            if offset in visited or len(visited) >= PDF_XREF_MAXIMUM_SECTIONS:
+                continue
+            visited.add(offset)
+
+            if self._read(offset=offset, size=4) == b'xref':
+                trailer = self._read_xref_table(offset=offset)
+                # Hybrid files list the compressed objects in a xref stream.
+                xref_stream_offset = self._get_dictionary_integer(
+                    data=trailer, key='XRefStm'
+                )
+                if xref_stream_offset:
+                    offsets.insert(0, xref_stream_offset)
+            else:
+                trailer = self._read_xref_stream(offset=offset)
+
+            root = root or self._get_dictionary_reference(
+                data=trailer, key='Root'
+            )
+
+            previous_offset = self._get_dictionary_integer(
+                data=trailer, key='Prev'
+            )
+            if previous_offset:
+                offsets.append(previous_offset)
+
+        if not root:
+            raise ValueError('Document catalog not found.')
+
+        catalog = self.get_object(object_number=root)
+        pages = self._get_dictionary_reference(data=catalog, key='Pages')
+        if not pages:
+            raise ValueError('Page tree not found.')
+
+        page_tree = self.get_object(object_number=pages)
+        page_count = self._get_dictionary_integer(data=page_tree, key='Count')
+        if page_count is None:
+            count_reference = self._get_dictionary_reference(
+                data=page_tree, key='Count'
+            )
+            if count_reference is None:
+                raise ValueError('Page count not found.')
+
+            page_count = int(self.get_object(object_number=count_reference).split()[0])
+
+        return page_count
+
+
+def decode_png_predictor(data, columns):
+    """
+    Reverse the PNG row filters used by cross reference streams.
+    """
+    result = []
+    previous_row = bytearray(columns)
+    row_size = columns + 1
+
+    for position in range(0, len(data) - row_size + 1, row_size):
+        filter_type = data[position]
+        row = bytearray(data[position + 1:position + row_size])
+
+        if filter_type == 1:
+            for index in range(1, columns):
+                row[index] = (row[index] + row[index - 1]) & 0xff
+        elif filter_type == 2:
+            for index in range(columns):
+                row[index] = (row[index] + previous_row[index]) & 0xff
+        elif filter_type != 0:
+            raise ValueError('Unsupported PNG predictor {}.'.format(filter_type))
+
+        result.append(bytes(row))
+        previous_row = row
+
+    return b''.join(result)
+
+
+def force_pattern(pattern):
+    return pattern.encode('latin-1')
+
+
+def get_pdf_page_count(file_object):
+    """
+    Return the page count of a PDF file using the cross reference table or
+    None if it can't be determined this way.
+    """
+    try:
+        page_count = PDFPageCountReader(
+            file_object=file_object
+        ).get_page_count()
+    except Exception as exception:
+        logger.debug('Unable to read the PDF page count quickly; %s', exception)
+    else:
+        if page_count:
+            return page_count
+    finally:
+        file_object.seek(0)
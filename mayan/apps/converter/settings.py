@@ -3,9 +3,11 @@ from django.utils.translation import ugettext_lazy as _
 from mayan.apps.smart_settings.classes import Namespace
 
 from .literals import (
-    DEFAULT_LIBREOFFICE_PATH, DEFAULT_PDFTOPPM_DPI, DEFAULT_PDFTOPPM_FORMAT,
+    DEFAULT_LIBREOFFICE_PATH, DEFAULT_LIBREOFFICE_POOL_MAXIMUM_JOBS,
+    DEFAULT_LIBREOFFICE_POOL_SIZE, DEFAULT_LIBREOFFICE_POOL_TIMEOUT,
+    DEFAULT_PDFIUM_DPI, DEFAULT_PDFTOPPM_DPI, DEFAULT_PDFTOPPM_FORMAT,
     DEFAULT_PDFTOPPM_PATH, DEFAULT_PDFINFO_PATH, DEFAULT_PILLOW_FORMAT,
-    DEFAULT_PILLOW_MAXIMUM_IMAGE_PIXELS
+    DEFAULT_PILLOW_MAXIMUM_IMAGE_PIXELS, DEFAULT_TESSERACT_OSD_PATH
 )
 from .setting_migrations import ConvertSettingMigration
 
@@ -16,19 +18,38 @@ namespace = Namespace(
 
 setting_graphics_backend = namespace.add_setting(
     default='mayan.apps.converter.backends.python.Python',
-    help_text=_('Graphics conversion backend to use.'),
+    help_text=_(
+        'Graphics conversion backend to use. Use '
+        '"mayan.apps.converter.backends.pdfium.PDFium" to render PDF files '
+        'in process with the PDFium library (requires the pypdfium2 '
+        'package) instead of executing the poppler utilities.'
+    ),
     global_name='CONVERTER_GRAPHICS_BACKEND',
 )
 setting_graphics_backend_arguments = namespace.add_setting(
     default={
         'libreoffice_path': DEFAULT_LIBREOFFICE_PATH,
+        'libreoffice_pool_maximum_jobs': DEFAULT_LIBREOFFICE_POOL_MAXIMUM_JOBS,
+        'libreoffice_pool_size': DEFAULT_LIBREOFFICE_POOL_SIZE,
+        'libreoffice_pool_timeout': DEFAULT_LIBREOFFICE_POOL_TIMEOUT,
+        'pdfium_dpi': DEFAULT_PDFIUM_DPI,
         'pdftoppm_dpi': DEFAULT_PDFTOPPM_DPI,
         'pdftoppm_format': DEFAULT_PDFTOPPM_FORMAT,
         'pdftoppm_path': DEFAULT_PDFTOPPM_PATH,
         'pdfinfo_path': DEFAULT_PDFINFO_PATH,
         'pillow_format': DEFAULT_PILLOW_FORMAT,
         'pillow_maximum_image_pixels': DEFAULT_PILLOW_MAXIMUM_IMAGE_PIXELS,
+        'tesseract_osd_path': DEFAULT_TESSERACT_OSD_PATH,
     }, help_text=_(
-        'Configuration options for the graphics conversion backend.'
+        'Configuration options for the graphics conversion backend. '
+        'Set "libreoffice_pool_size" to a value greater than 0 to convert '
+        'office documents using a pool of persistent LibreOffice processes '
+        '(requires the LibreOffice Python UNO bindings). Workers are '
+        'restarted after "libreoffice_pool_maximum_jobs" conversions and '
+        'conversions taking longer than "libreoffice_pool_timeout" seconds '
+        'are aborted. "pdfium_dpi" is the resolution used by the PDFium '
+        'backend to render PDF pages. Set "tesseract_osd_path" to the path '
+        'of the Tesseract binary to detect the orientation of scanned '
+        'images.'
     ), global_name='CONVERTER_GRAPHICS_BACKEND_ARGUMENTS'
 )
@@ -1,9 +1,14 @@
+TEST_LIBREOFFICE_POOL_SIZE = 2
+TEST_PDF_DOCUMENT_PAGE_COUNT = 47
+TEST_PDF_ROTATE_ALTERNATE_ORIENTATIONS = {1: 90, 2: 90}
+TEST_TESSERACT_OSD_OUTPUT = 'Page number: 0\nOrientation in degrees: 270\nRotate: 90\nOrientation confidence: 20.31\n'
 TEST_TRANSFORMATION_NAME = 'rotate'
 TEST_TRANSFORMATION_ARGUMENT = 'degrees: 180'
 TEST_TRANSFORMATION_ARGUMENT_EDITED = 'degrees: 270'
 TEST_TRANSFORMATION_CLASS_LABEL = 'Test transformation class'
 TEST_TRANSFORMATION_CLASS_NAME = 'test_transformation_class'
 TEST_TRANSFORMATION_COMBINED_CACHE_HASH = '384bf78014d2aed7255d9e548a0694c70af0b22545653214bcceb1ac6286b5f7'
+TEST_TRANSFORMATION_PLAN_IMAGE_SIZE = (1240, 1754)
 TEST_TRANSFORMATION_RESIZE_CACHE_HASH = b'4aa319f5a6950985a19380a1f279a66769d04138bd1583844270fe8c269260fc'
 TEST_TRANSFORMATION_RESIZE_CACHE_HASH_2 = b'cc8d220d40e810b995181c0c69b44b7a61c3bb039c0be96a5465fcaf698ca99a'
 TEST_TRANSFORMATION_RESIZE_HEIGHT = 528
@@ -0,0 +1,118 @@
+import io
+import unittest
+
+import mock
+
+from django.test import TestCase
+
+from mayan.apps.documents.tests.literals import (
+    TEST_DOCUMENT_PATH, TEST_PDF_ROTATE_ALTERNATE_PATH,
+    TEST_SMALL_DOCUMENT_PATH
+)
+
+from ..backends import python
+from ..backends.pdfium import PDFium, document_cache, pypdfium2
+from ..backends.python import Python
+
+from .literals import (
+    TEST_PDF_DOCUMENT_PAGE_COUNT, TEST_PDF_ROTATE_ALTERNATE_ORIENTATIONS,
+    TEST_TESSERACT_OSD_OUTPUT
+)
+
+
+@unittest.skipUnless(pypdfium2, 'The pypdfium2 library is not installed.')
+class PDFiumBackendTestCase(TestCase):
+    def setUp(self):
+        super(PDFiumBackendTestCase, self).setUp()
+        self.file_object = open(TEST_DOCUMENT_PATH, mode='rb')
+        self.converter = PDFium(file_object=self.file_object)
+
+    def tearDown(self):
+        document_cache.close()
+        self.file_object.close()
+        super(PDFiumBackendTestCase, self).tearDown()
+
+    def test_page_count(self):
+        self.assertEqual(
+            self.converter.get_page_count(), TEST_PDF_DOCUMENT_PAGE_COUNT
+        )
+
+    def test_document_handle_reuse(self):
+        self.converter.seek_page(page_number=0)
+        document = document_cache.document
+
+        self.converter.seek_page(page_number=1)
+        self.assertEqual(document_cache.document, document)
+
+    def test_document_not_seekable(self):
+        class NonSeekableBytesIO(io.BytesIO):
+            def seek(self, *args, **kwargs):
+                raise io.UnsupportedOperation('seek')
+
+            def seekable(self):
+                return False
+
+        document = document_cache.get_document(
+            file_object=NonSeekableBytesIO(self.file_object.read())
+        )
+        self.assertEqual(len(document), TEST_PDF_DOCUMENT_PAGE_COUNT)
+
+        self.assertEqual(
+            document_cache.get_document(file_object=self.file_object),
+            document
+        )
+
+    def test_document_key_content(self):
+        data = self.file_object.read()
+        middle = len(data) // 2
+        changed_data = (
+            data[:middle] + bytes((data[middle] ^ 0xFF,)) + data[middle + 1:]
+        )
+
+        self.assertNotEqual(
+            document_cache.get_key(data=data),
+            document_cache.get_key(data=changed_data)
+        )
+
+    def test_detect_orientations(self):
+        with open(TEST_PDF_ROTATE_ALTERNATE_PATH, mode='rb') as file_object:
+            converter = PDFium(file_object=file_object)
+            self.assertEqual(
+                converter.detect_orientations(),
+                TEST_PDF_ROTATE_ALTERNATE_ORIENTATIONS
+            )
+
+    def test_get_pages(self):
+        page_numbers = [
+            page_number for page_number, image in self.converter.get_pages(
+                page_number_first=1, page_number_last=2
+            )
+        ]
+
+        self.assertEqual(page_numbers, [1, 2])
+
+
+class PythonBackendTestCase(TestCase):
+    def test_detect_orientations(self):
+        with open(TEST_PDF_ROTATE_ALTERNATE_PATH, mode='rb') as file_object:
+            converter = Python(file_object=file_object)
+            self.assertEqual(
+                converter.detect_orientations(),
+                TEST_PDF_ROTATE_ALTERNATE_ORIENTATIONS
+            )
+
+    def test_detect_orientations_image_tesseract_osd(self):
+        mock_tesseract_osd = mock.Mock(return_value=TEST_TESSERACT_OSD_OUTPUT)
+
+        with mock.patch.object(python, 'tesseract_osd', mock_tesseract_osd):
+            with open(TEST_SMALL_DOCUMENT_PATH, mode='rb') as file_object:
+                converter = Python(file_object=file_object)
+                self.assertEqual(converter.detect_orientations(), {1: 270})
+
+        self.assertEqual(mock_tesseract_osd.call_count, 1)
+
+    def test_detect_orientations_image_without_tesseract_osd(self):
+        with mock.patch.object(python, 'tesseract_osd', None):
+            with open(TEST_SMALL_DOCUMENT_PATH, mode='rb') as file_object:
+                converter = Python(file_object=file_object)
+                self.assertEqual(converter.detect_orientations(), {})
@@ -0,0 +1,52 @@
+import mock
+
+from django.test import TestCase
+
+from ..libreoffice import LibreOfficeWorker, LibreOfficeWorkerPool
+
+from .literals import TEST_LIBREOFFICE_POOL_SIZE
+
+
+class LibreOfficeWorkerPoolTestCase(TestCase):
+    def setUp(self):
+        super(LibreOfficeWorkerPoolTestCase, self).setUp()
+        self.pool = LibreOfficeWorkerPool(
+            libreoffice_path='libreoffice', size=TEST_LIBREOFFICE_POOL_SIZE
+        )
+
+    def tearDown(self):
+        self.pool.stop()
+        super(LibreOfficeWorkerPoolTestCase, self).tearDown()
+
+    @mock.patch.object(LibreOfficeWorker, 'convert')
+    def test_pool_worker_reuse(self, mock_convert):
+        for count in range(TEST_LIBREOFFICE_POOL_SIZE + 2):
+            self.pool.convert(
+                destination_filename='destination.pdf',
+                source_filename='source'
+            )
+
+        self.assertEqual(mock_convert.call_count, TEST_LIBREOFFICE_POOL_SIZE + 2)
+        self.assertEqual(len(self.pool.workers), 1)
+
+    @mock.patch.object(LibreOfficeWorker, 'convert')
+    def test_pool_worker_release_on_error(self, mock_convert):
+        mock_convert.side_effect = Exception
+
+        with self.assertRaises(Exception):
+            self.pool.convert(
+                destination_filename='destination.pdf',
+                source_filename='source'
+            )
+
+        self.assertEqual(self.pool.idle_workers.qsize(), 1)
+
+    def test_pool_size_limit(self):
+        workers = [
+            self.pool._acquire_worker() for count in range(
+                TEST_LIBREOFFICE_POOL_SIZE
+            )
+        ]
+
+        self.assertEqual(len(self.pool.workers), TEST_LIBREOFFICE_POOL_SIZE)
+        self.assertEqual(len(set(workers)), TEST_LIBREOFFICE_POOL_SIZE)
@@ -0,0 +1,23 @@
+from django.test import TestCase
+
+from mayan.apps.documents.tests.literals import (
+    TEST_DOCUMENT_PATH, TEST_SMALL_DOCUMENT_PATH
+)
+
+from ..pdf import get_pdf_page_count
+
+from .literals import TEST_PDF_DOCUMENT_PAGE_COUNT
+
+
+class PDFPageCountTestCase(TestCase):
+    def test_page_count(self):
+        with open(TEST_DOCUMENT_PATH, mode='rb') as file_object:
+            self.assertEqual(
+                get_pdf_page_count(file_object=file_object),
+                TEST_PDF_DOCUMENT_PAGE_COUNT
+            )
+            self.assertEqual(file_object.tell(), 0)
+
+    def test_non_pdf_file(self):
+        with open(TEST_SMALL_DOCUMENT_PATH, mode='rb') as file_object:
+            self.assertEqual(get_pdf_page_count(file_object=file_object), None)
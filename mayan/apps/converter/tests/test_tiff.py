@@ -0,0 +1,53 @@
+import io
+
+from PIL import Image
+
+from django.test import TestCase
+
+from mayan.apps.documents.tests.literals import (
+    TEST_DOCUMENT_PATH, TEST_MULTI_PAGE_TIFF_PATH
+)
+
+from ..backends.python import Python
+from ..tiff import get_tiff_frame_offsets, seek_tiff_frame
+
+
+class TIFFFrameOffsetsTestCase(TestCase):
+    def test_frame_offsets(self):
+        with open(TEST_MULTI_PAGE_TIFF_PATH, mode='rb') as file_object:
+            frame_offsets = get_tiff_frame_offsets(file_object=file_object)
+            self.assertEqual(file_object.tell(), 0)
+
+            image = Image.open(file_object)
+            image.seek(image.n_frames - 1)
+
+            self.assertEqual(frame_offsets, image._frame_pos)
+
+    def test_non_tiff_file(self):
+        with open(TEST_DOCUMENT_PATH, mode='rb') as file_object:
+            self.assertEqual(
+                get_tiff_frame_offsets(file_object=file_object), None
+            )
+
+    def test_seek_frame(self):
+        frames = [
+            Image.new(mode='L', size=(8, 8), color=value) for value in range(4)
+        ]
+        file_object = io.BytesIO()
+        frames[0].save(
+            file_object, format='TIFF', save_all=True,
+            append_images=frames[1:]
+        )
+
+        frame_offsets = get_tiff_frame_offsets(file_object=file_object)
+        image = Image.open(file_object)
+        seek_tiff_frame(image=image, frame=3, frame_offsets=frame_offsets)
+
+        self.assertEqual(image.getpixel((0, 0)), 3)
+
+    def test_converter_page_count(self):
+        with open(TEST_MULTI_PAGE_TIFF_PATH, mode='rb') as file_object:
+            converter = Python(file_object=file_object)
+
+            self.assertEqual(converter.get_page_count(), 2)
+            self.assertEqual(len(converter.frame_offsets), 2)
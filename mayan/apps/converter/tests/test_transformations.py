@@ -1,7 +1,14 @@
+from io import BytesIO
+
+import mock
+from PIL import Image
+
 from django.test import TestCase
 
 from mayan.apps.documents.tests.base import GenericDocumentTestCase
 
+from ..classes import TransformationPlan
+from ..utils import get_converter_class
 from ..transformations import (
     BaseTransformation, TransformationCrop, TransformationLineArt,
     TransformationResize, TransformationRotate, TransformationRotate90,
@@ -10,6 +17,7 @@ from ..transformations import (
 
 from .literals import (
     TEST_TRANSFORMATION_COMBINED_CACHE_HASH,
+    TEST_TRANSFORMATION_PLAN_IMAGE_SIZE,
     TEST_TRANSFORMATION_RESIZE_CACHE_HASH,
     TEST_TRANSFORMATION_RESIZE_CACHE_HASH_2,
     TEST_TRANSFORMATION_RESIZE_HEIGHT,
@@ -111,6 +119,100 @@ class TransformationBaseTestCase(TestCase):
         )
 
 
+class TransformationPlanTestCase(TestCase):
+    def _test_transformation_plan(self, transformations):
+        image = Image.new(mode='RGB', size=TEST_TRANSFORMATION_PLAN_IMAGE_SIZE)
+        for transformation in transformations:
+            image = transformation.execute_on(image=image)
+
+        planned_image = TransformationPlan(
+            transformations=transformations
+        ).execute_on(
+            image=Image.new(mode='RGB', size=TEST_TRANSFORMATION_PLAN_IMAGE_SIZE)
+        )
+
+        self.assertEqual(planned_image.size, image.size)
+
+    def test_rotate_resize_zoom_plan(self):
+        self._test_transformation_plan(
+            transformations=(
+                TransformationRotate90(),
+                TransformationResize(width=TEST_TRANSFORMATION_RESIZE_WIDTH),
+                TransformationZoom(percent=TEST_TRANSFORMATION_ZOOM_PERCENT)
+            )
+        )
+
+    def test_crop_resize_plan(self):
+        self._test_transformation_plan(
+            transformations=(
+                TransformationCrop(left=10, top=10),
+                TransformationResize(
+                    width=TEST_TRANSFORMATION_RESIZE_WIDTH,
+                    height=TEST_TRANSFORMATION_RESIZE_HEIGHT
+                )
+            )
+        )
+
+    def test_arbitrary_rotation_plan(self):
+        self._test_transformation_plan(
+            transformations=(
+                TransformationRotate(degrees=TEST_TRANSFORMATION_ROTATE_DEGRESS),
+                TransformationResize(width=TEST_TRANSFORMATION_RESIZE_WIDTH)
+            )
+        )
+
+    def test_jpeg_reduced_scale_decode(self):
+        file_object = BytesIO()
+        Image.new(
+            mode='RGB', size=TEST_TRANSFORMATION_PLAN_IMAGE_SIZE
+        ).save(file_object, format='JPEG')
+
+        converter = get_converter_class()(file_object=file_object)
+        converter.seek_page(page_number=0)
+
+        with mock.patch.object(
+            Image.Image, 'resize', autospec=True, side_effect=Image.Image.resize
+        ) as mock_resize:
+            converter.transform_many(
+                transformations=(
+                    TransformationResize(width=TEST_TRANSFORMATION_RESIZE_WIDTH),
+                )
+            )
+
+        # The decoder downscales by a power of two, the decoded image is
+        # smaller than the source but not smaller than the requested size.
+        decoded_size = mock_resize.call_args[0][0].size
+        self.assertLess(decoded_size[0], TEST_TRANSFORMATION_PLAN_IMAGE_SIZE[0])
+        self.assertGreaterEqual(
+            decoded_size[0], TEST_TRANSFORMATION_RESIZE_WIDTH
+        )
+
+        # Same size as the thumbnail of the whole image.
+        image = Image.new(mode='RGB', size=TEST_TRANSFORMATION_PLAN_IMAGE_SIZE)
+        image.thumbnail(
+            (
+                TEST_TRANSFORMATION_RESIZE_WIDTH,
+                int(
+                    TEST_TRANSFORMATION_RESIZE_WIDTH * TEST_TRANSFORMATION_PLAN_IMAGE_SIZE[1] / TEST_TRANSFORMATION_PLAN_IMAGE_SIZE[0]
+                )
+            )
+        )
+        self.assertEqual(converter.image.size, image.size)
+
+    def test_plan_does_not_change_cache_key(self):
+        transformations = [
+            TransformationRotate90(),
+            TransformationResize(width=TEST_TRANSFORMATION_RESIZE_WIDTH)
+        ]
+        cache_key = BaseTransformation.combine(transformations)
+
+        TransformationPlan(transformations=transformations).execute_on(
+            image=Image.new(mode='RGB', size=TEST_TRANSFORMATION_PLAN_IMAGE_SIZE)
+        )
+
+        self.assertEqual(BaseTransformation.combine(transformations), cache_key)
+
+
 class TransformationTestCase(LayerTestMixin, GenericDocumentTestCase):
     def test_crop_transformation_optional_arguments(self):
         self._silence_logger(name='mayan.apps.converter.managers')
@@ -164,6 +266,44 @@ class TransformationTestCase(LayerTestMixin, GenericDocumentTestCase):
 
         self.assertTrue(document_page.generate_image())
 
+    def test_intermediate_image_cache(self):
+        document_page = self.test_document.pages.first()
+
+        self.test_layer.add_transformation_to(
+            obj=document_page, transformation_class=TransformationCrop,
+            arguments={'top': '10'}
+        )
+
+        self.assertTrue(
+            document_page.generate_image(
+                width=TEST_TRANSFORMATION_RESIZE_WIDTH
+            )
+        )
+
+        transformation_list = document_page.get_combined_transformation_list()
+        self.assertEqual(
+            document_page.get_intermediate_image_boundaries(
+                transformations=transformation_list
+            ), [1]
+        )
+        intermediate_file = document_page.cache_partition.get_file(
+            filename=document_page.get_intermediate_image_cache_filename(
+                transformations=transformation_list[:1]
+            )
+        )
+        self.assertTrue(intermediate_file)
+
+        # Intermediate images are stored lossless.
+        with intermediate_file.open() as file_object:
+            self.assertEqual(Image.open(file_object).format, 'PNG')
+
+        # A different width resumes from the intermediate image.
+        self.assertTrue(
+            document_page.generate_image(
+                width=TEST_TRANSFORMATION_RESIZE_WIDTH_2
+            )
+        )
+
     def test_lineart_transformations(self):
         document_page = self.test_document.pages.first()
 
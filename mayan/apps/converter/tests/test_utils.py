@@ -0,0 +1,32 @@
+from django.test import TestCase
+
+from ..utils import negotiate_image_format
+
+
+class NegotiateImageFormatTestCase(TestCase):
+    def test_explicit_format(self):
+        self.assertEqual(
+            negotiate_image_format(
+                accept='image/png,image/*;q=0.8', formats=('JPEG', 'PNG')
+            ), 'PNG'
+        )
+
+    def test_quality_value_order(self):
+        self.assertEqual(
+            negotiate_image_format(
+                accept='image/png;q=0.5,image/jpeg;q=0.9',
+                formats=('PNG', 'JPEG')
+            ), 'JPEG'
+        )
+
+    def test_wildcard_returns_default_format(self):
+        self.assertEqual(
+            negotiate_image_format(accept='*/*', formats=('PNG',)), 'JPEG'
+        )
+
+    def test_unavailable_format_is_ignored(self):
+        self.assertEqual(
+            negotiate_image_format(
+                accept='image/unknown', formats=('UNKNOWN', 'PNG')
+            ), 'JPEG'
+        )
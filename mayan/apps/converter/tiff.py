@@ -0,0 +1,84 @@
+import logging
+import struct
+
+from .literals import TIFF_MAXIMUM_FRAMES
+
+logger = logging.getLogger(name=__name__)
+
+TIFF_BYTE_ORDERS = {b'II': '<', b'MM': '>'}
+# Offset format, entry count format and entry size by magic number, 42 for
+# classic TIFF and 43 for BigTIFF.
+TIFF_FORMATS = {42: ('I', 'H', 12), 43: ('Q', 'Q', 20)}
+
+
+def get_tiff_frame_offsets(file_object):
+    """
+    Return the offset of the image file directory (IFD) of each frame of a
+    TIFF file or None if the file is not a TIFF file. Only the entry count
+    and the pointer to the next directory of each IFD are read, the tags
+    are not parsed.
+    """
+    try:
+        file_object.seek(0)
+        header = file_object.read(16)
+
+        byte_order = TIFF_BYTE_ORDERS.get(header[:2])
+        if not byte_order:
+            return None
+
+        magic_number = struct.unpack(byte_order + 'H', header[2:4])[0]
+        if magic_number not in TIFF_FORMATS:
+            return None
+
+        offset_format, count_format, entry_size = TIFF_FORMATS[magic_number]
+        offset_size = struct.calcsize(byte_order + offset_format)
+        count_size = struct.calcsize(byte_order + count_format)
+
+        if offset_format == 'Q':
+            # BigTIFF, the first IFD offset follows the offset byte size
+            # and a reserved field.
+            offset = struct.unpack(byte_order + 'Q', header[8:16])[0]
+        else:
+            offset = struct.unpack(byte_order + 'I', header[4:8])[0]
+
+        frame_offsets = []
+        visited = set()
+        while offset and len(frame_offsets) < TIFF_MAXIMUM_FRAMES:
+            if offset in visited:
+                # Looping IFD chain, stop like Pillow does.
+                break
+
+            frame_offsets.append(offset)
+            visited.add(offset)
+
+            file_object.seek(offset)
+            entry_count = struct.unpack(
+                byte_order + count_format, file_object.read(count_size)
+            )[0]
+            file_object.seek(offset + count_size + entry_count * entry_size)
+            offset = struct.unpack(
+                byte_order + offset_format, file_object.read(offset_size)
+            )[0]
+
+        return frame_offsets
+    except struct.error as exception:
+        logger.debug('Unable to read the TIFF frame offsets; %s', exception)
+        return None
+    finally:
+        file_object.seek(0)
+
+
+def seek_tiff_frame(image, frame, frame_offsets):
+    """
+    Seek a frame of an open Pillow TIFF image using a frame offset index
+    to avoid walking and parsing every previous IFD. Falls back to the
+    regular seek if the index does not match the image.
+    """
+    frame_positions = getattr(image, '_frame_pos', None)
+    if frame_offsets and frame_positions and frame_positions[0] == frame_offsets[0]:
+        # Pillow resumes from its list of known frame positions, seed it
+        # with the index.
+        image._frame_pos = list(frame_offsets)
+        image._n_frames = len(frame_offsets)
+
+    image.seek(frame)
@@ -1,5 +1,6 @@
 import hashlib
 import logging
+import math
 
 from PIL import Image, ImageColor, ImageDraw, ImageFilter
 
@@ -25,6 +26,9 @@ class BaseTransformation(with_metaclass(meta=BaseTransformationType)):
     """
     arguments = ()
     name = 'base_transformation'
+    # Set for the transformations loaded from a stored layer, marks the
+    # layer boundaries in a transformation list.
+    object_layer_id = None
     _layer_transformations = {}
     _registry = {}
 
@@ -92,6 +96,23 @@ class BaseTransformation(with_metaclass(meta=BaseTransformationType)):
         self.image = image
         self.aspect = 1.0 * image.size[0] / image.size[1]
 
+    def get_scaled_size(self, size):
+        """
+        Return the size of an image of the specified size after scaling,
+        or None if this transformation does not just scale the image.
+        Used by the transformation planner to fuse scaling steps.
+        """
+        return None
+
+    def get_transpositions(self):
+        """
+        Return the Pillow transpose methods equivalent to this
+        transformation, or None if it cannot be expressed as a lossless
+        transposition. Used by the transformation planner to defer the
+        transpositions until after the image is scaled down.
+        """
+        return None
+
 
 class TransformationCrop(BaseTransformation):
     arguments = ('left', 'top', 'right', 'bottom',)
@@ -380,6 +401,9 @@ class TransformationFlip(BaseTransformation):
 
         return self.image.transpose(Image.FLIP_TOP_BOTTOM)
 
+    def get_transpositions(self):
+        return (Image.FLIP_TOP_BOTTOM,)
+
 
 class TransformationGaussianBlur(BaseTransformation):
     arguments = ('radius',)
@@ -412,6 +436,9 @@ class TransformationMirror(BaseTransformation):
 
         return self.image.transpose(Image.FLIP_LEFT_RIGHT)
 
+    def get_transpositions(self):
+        return (Image.FLIP_LEFT_RIGHT,)
+
 
 class TransformationResize(BaseTransformation):
     arguments = ('width', 'height')
@@ -424,6 +451,10 @@ class TransformationResize(BaseTransformation):
         width = int(self.width)
         height = int(self.height or 1.0 * width / self.aspect)
 
+        # Compute the final size from the original image, the fast
+        # reduction below changes the aspect ratio slightly.
+        size = self.get_scaled_size(size=self.image.size)
+
         factor = 1
         while self.image.size[0] / factor > 2 * width and self.image.size[1] * 2 / factor > 2 * height:
             factor *= 2
@@ -435,10 +466,38 @@ class TransformationResize(BaseTransformation):
             )
 
         # Resize the image with best quality algorithm ANTI-ALIAS
-        self.image.thumbnail((width, height), Image.ANTIALIAS)
+        if self.image.size != size:
+            self.image = self.image.resize(size, Image.ANTIALIAS)
 
         return self.image
 
+    def get_scaled_size(self, size):
+        width = int(self.width)
+        height = int(self.height or 1.0 * width * size[1] / size[0])
+
+        # Same bounding box fitting as Image.thumbnail, which never
+        # enlarges the image and rounds the scaled side up or down to the
+        # value that best preserves the aspect ratio.
+        if width >= size[0] and height >= size[1]:
+            return size
+
+        def round_aspect(number, key):
+            return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+        aspect = size[0] / size[1]
+        if width / height >= aspect:
+            width = round_aspect(
+                number=height * aspect,
+                key=lambda value: abs(aspect - value / height)
+            )
+        else:
+            height = round_aspect(
+                number=width / aspect,
+                key=lambda value: abs(aspect - width / value)
+            )
+
+        return (width, height)
+
 
 class TransformationRotate(BaseTransformation):
     arguments = ('degrees', 'fillcolor')
@@ -464,6 +523,17 @@ class TransformationRotate(BaseTransformation):
             fillcolor=fillcolor
         )
 
+    def get_transpositions(self):
+        try:
+            degrees = float(self.degrees) % 360
+        except (TypeError, ValueError):
+            return None
+
+        return {
+            0: (), 90: (Image.ROTATE_270,), 180: (Image.ROTATE_180,),
+            270: (Image.ROTATE_90,)
+        }.get(degrees)
+
 
 class TransformationRotate90(TransformationRotate):
     arguments = ()
@@ -533,6 +603,13 @@ class TransformationZoom(BaseTransformation):
             ), Image.ANTIALIAS
         )
 
+    def get_scaled_size(self, size):
+        if self.percent == 100:
+            return size
+
+        decimal_value = float(self.percent) / 100
+        return (int(size[0] * decimal_value), int(size[1] * decimal_value))
+
 
 BaseTransformation.register(
     layer=layer_saved_transformations, transformation=TransformationCrop
@@ -1,11 +1,105 @@
+from io import BytesIO
 import logging
 
+from PIL import Image
+
 from django.utils.module_loading import import_string
 
-from .settings import setting_graphics_backend
+from .literals import (
+    DEFAULT_PILLOW_FORMAT, IMAGE_OUTPUT_FORMAT_MIMETYPES, IMAGE_OUTPUT_FORMATS
+)
+from .settings import (
+    setting_graphics_backend, setting_graphics_backend_arguments
+)
 
 logger = logging.getLogger(name=__name__)
 
 
 def get_converter_class():
     return import_string(dotted_path=setting_graphics_backend.value)
+
+
+def get_default_image_format():
+    return setting_graphics_backend_arguments.value.get(
+        'pillow_format', DEFAULT_PILLOW_FORMAT
+    ).upper()
+
+
+def get_image_buffer(image, output_format=None, quality=None):
+    """
+    Encode a Pillow image and return it as a memory buffer.
+    """
+    output_format = output_format or get_default_image_format()
+
+    image_buffer = BytesIO()
+    new_mode = image.mode
+
+    if output_format.upper() == 'JPEG':
+        # JPEG doesn't support transparency channel, convert the image to
+        # RGB. Removes modes: P and RGBA
+        new_mode = 'RGB'
+
+    save_kwargs = {}
+    if quality:
+        save_kwargs['quality'] = quality
+
+    image.convert(new_mode).save(
+        image_buffer, format=output_format, **save_kwargs
+    )
+
+    image_buffer.seek(0)
+
+    return image_buffer
+
+
+def get_image_formats(formats=None):
+    """
+    Return the image output formats that can be encoded by the installed
+    Pillow in order of preference. AVIF is only available when a plugin
+    registering the format is installed.
+    """
+    Image.init()
+
+    return [
+        output_format.upper() for output_format in formats or IMAGE_OUTPUT_FORMATS if output_format.upper() in Image.SAVE and output_format.upper() in IMAGE_OUTPUT_FORMAT_MIMETYPES
+    ]
+
+
+def get_image_mimetype(output_format):
+    return IMAGE_OUTPUT_FORMAT_MIMETYPES.get(output_format.upper(), 'image')
+
+
+def negotiate_image_format(accept=None, formats=None):
+    """
+    Select the image output format from the media ranges of an HTTP
+    Accept header. Only formats listed explicitly by the client are
+    considered, wildcards don't imply support for modern formats and
+    return the default format.
+    """
+    media_ranges = {}
+    for media_range in (accept or '').split(','):
+        parts = media_range.split(';')
+        quality = 1.0
+
+        for parameter in parts[1:]:
+            name, separator, value = parameter.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+
+        media_ranges[parts[0].strip().lower()] = quality
+
+    result = None
+    result_quality = 0
+    for output_format in get_image_formats(formats=formats):
+        quality = media_ranges.get(
+            IMAGE_OUTPUT_FORMAT_MIMETYPES[output_format], 0
+        )
+        # Ties are resolved using the server order of preference.
+        if quality > result_quality:
+            result = output_format
+            result_quality = quality
+
+    return result or get_default_image_format()
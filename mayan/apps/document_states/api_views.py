@@ -202,7 +202,9 @@ class APIWorkflowImageView(generics.RetrieveAPIView):
             kwargs['disable_sync_subtasks'] = False
 
         cache_filename = task.get(**kwargs)
-        cache_file = self.get_object().cache_partition.get_file(filename=cache_filename)
+        cache_file = self.get_object().cache_partition.get_file(
+            filename=cache_filename, record_statistics=False
+        )
         with cache_file.open() as file_object:
             response = HttpResponse(file_object.read(), content_type='image')
             if '_hash' in request.GET:
@@ -77,16 +77,13 @@ class Workflow(models.Model):
     @cached_property
     def cache(self):
         Cache = apps.get_model(app_label='file_caching', model_name='Cache')
-        return Cache.objects.get(
+        return Cache.objects.get_by_defined_storage_name(
             defined_storage_name=STORAGE_NAME_WORKFLOW_CACHE
         )
 
     @cached_property
     def cache_partition(self):
-        partition, created = self.cache.partitions.get_or_create(
-            name='{}'.format(self.pk)
-        )
-        return partition
+        return self.cache.get_partition(name='{}'.format(self.pk))
 
     def delete(self, *args, **kwargs):
         self.cache_partition.delete()
@@ -1,18 +1,32 @@
 import logging
 
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.urls import reverse
 from django.views.decorators.cache import cache_control, patch_cache_control
 
 from rest_framework import status
 from rest_framework.response import Response
 
 from mayan.apps.acls.models import AccessControlList
+from mayan.apps.converter.utils import (
+    get_default_image_format, get_image_mimetype, negotiate_image_format
+)
 from mayan.apps.rest_api import generics
+from mayan.apps.rest_api.negotiation import IgnoreClientContentNegotiation
 from mayan.apps.common.generics import DownloadMixin
+from mayan.apps.storage.utils import (
+    get_offload_response, get_storage_file_path
+)
 
-from .literals import DOCUMENT_IMAGE_TASK_TIMEOUT
+from .literals import (
+    DOCUMENT_IMAGE_TASK_TIMEOUT, DOCUMENT_PAGE_IMAGE_RETRY_AFTER
+)
 from .models import (
     DeletedDocument, Document, DocumentType, RecentDocument
 )
@@ -34,8 +48,12 @@ from .serializers import (
     WritableDocumentSerializer, WritableDocumentTypeSerializer,
     WritableDocumentVersionSerializer
 )
-from .settings import settings_document_page_image_cache_time
-from .tasks import task_generate_document_page_image
+from .settings import (
+    setting_page_image_formats, settings_document_page_image_cache_time
+)
+from .tasks import (
+    task_generate_document_page_image, task_generate_document_page_tiles
+)
 
 logger = logging.getLogger(name=__name__)
 
@@ -112,9 +130,20 @@ class APIDocumentDownloadView(DownloadMixin, generics.RetrieveAPIView):
     }
     queryset = Document.objects.all()
 
+    def get_download_content_type(self):
+        return self.get_object().file_mimetype
+
+    def get_download_etag(self):
+        checksum = self.get_object().checksum
+        if checksum:
+            return quote_etag(checksum)
+
     def get_download_file_object(self):
         return self.get_object().open()
 
+    def get_download_file_path(self):
+        return self.get_object().get_file_path()
+
     def get_download_filename(self):
         return self.get_object().label
 
@@ -160,6 +189,7 @@ class APIDocumentPageImageView(generics.RetrieveAPIView):
     """
     get: Returns an image representation of the selected document.
     """
+    content_negotiation_class = IgnoreClientContentNegotiation
     lookup_url_kwarg = 'page_pk'
 
     def get_document(self):
@@ -181,6 +211,71 @@ class APIDocumentPageImageView(generics.RetrieveAPIView):
             self.get_document().versions.all(), pk=self.kwargs['version_pk']
         )
 
+    def get_image_response(self, document_page, cache_file, output_format):
+        """
+        Return the cached image, or a 304 response if it matches the
+        entity tag sent by the client.
+        """
+        etag = quote_etag(
+            '{}-{}-{}'.format(
+                document_page.pk, cache_file.filename,
+                int(cache_file.datetime.timestamp())
+            )
+        )
+
+        content_type = get_image_mimetype(output_format=output_format)
+
+        response = get_conditional_response(request=self.request, etag=etag)
+        if response is None:
+            # Let the front web server send the file if possible.
+            response = get_offload_response(
+                content_type=content_type, path=get_storage_file_path(
+                    name=cache_file.full_filename,
+                    storage=cache_file.partition.cache.storage
+                )
+            ) or FileResponse(cache_file.open(), content_type=content_type)
+
+        response['ETag'] = etag
+        patch_vary_headers(response=response, newheaders=('Accept',))
+        if '_hash' in self.request.GET:
+            patch_cache_control(
+                response=response,
+                max_age=settings_document_page_image_cache_time.value
+            )
+        return response
+
+    def get_output_format(self):
+        return negotiate_image_format(
+            accept=self.request.META.get('HTTP_ACCEPT'),
+            formats=setting_page_image_formats.value
+        )
+
+    def get_preferences(self):
+        """
+        Parse the Prefer header (RFC 7240). Returns whether the client
+        prefers an asynchronous response and how many seconds it is willing
+        to wait for the image before getting one.
+        """
+        respond_async = False
+        wait = 0
+
+        for preference in self.request.META.get('HTTP_PREFER', '').split(','):
+            name, separator, value = preference.strip().partition('=')
+            name = name.strip().lower()
+
+            if name == 'respond-async':
+                respond_async = True
+            elif name == 'wait':
+                try:
+                    wait = min(
+                        int(value.strip().strip('"')),
+                        DOCUMENT_IMAGE_TASK_TIMEOUT
+                    )
+                except ValueError:
+                    pass
+
+        return respond_async, wait
+
     def get_queryset(self):
         return self.get_document_version().pages_all.all()
 
@@ -190,6 +285,63 @@ class APIDocumentPageImageView(generics.RetrieveAPIView):
     def get_serializer_class(self):
         return None
 
+    def get_task_accepted_response(self, document_page, task):
+        """
+        Response for a client that prefers to not wait for the image task,
+        pointing to the task status view to poll.
+        """
+        response = Response(
+            data={'status': task.status}, status=status.HTTP_202_ACCEPTED
+        )
+        response['Location'] = reverse(
+            viewname='rest_api:documentpage-image-task', kwargs={
+                'pk': document_page.document_version.document.pk,
+                'version_pk': document_page.document_version.pk,
+                'page_pk': document_page.pk, 'task_id': task.id
+            }
+        )
+        response['Preference-Applied'] = 'respond-async'
+        response['Retry-After'] = DOCUMENT_PAGE_IMAGE_RETRY_AFTER
+        return response
+
+    def get_task_response(self, document_page, output_format, task):
+        """
+        Wait for the image generation task and return the image. Clients
+        that prefer an asynchronous response get a 202 response instead if
+        the task doesn't finish within the time they are willing to wait.
+        """
+        respond_async, wait = self.get_preferences()
+
+        kwargs = {'timeout': DOCUMENT_IMAGE_TASK_TIMEOUT}
+        if settings.DEBUG:
+            # In debug more, task are run synchronously, causing this method
+            # to be called inside another task. Disable the check of nested
+            # tasks when using debug mode.
+            kwargs['disable_sync_subtasks'] = False
+
+        if respond_async:
+            if wait:
+                try:
+                    task.get(**dict(kwargs, timeout=wait))
+                except CeleryTimeoutError:
+                    # Long poll expired, answer with the task status.
+                    pass
+
+            if not task.ready():
+                return self.get_task_accepted_response(
+                    document_page=document_page, task=task
+                )
+
+        cache_filename = task.get(**kwargs)
+        cache_file = document_page.cache_partition.get_file(
+            filename=cache_filename, record_statistics=False
+        )
+
+        return self.get_image_response(
+            cache_file=cache_file, document_page=document_page,
+            output_format=output_format
+        )
+
     @cache_control(private=True)
     def retrieve(self, request, *args, **kwargs):
         width = request.GET.get('width')
@@ -208,32 +360,248 @@ class APIDocumentPageImageView(generics.RetrieveAPIView):
         if maximum_layer_order:
             maximum_layer_order = int(maximum_layer_order)
 
-        task = task_generate_document_page_image.apply_async(
-            kwargs=dict(
-                document_page_id=self.get_object().pk, width=width,
-                height=height, zoom=zoom, rotation=rotation,
-                maximum_layer_order=maximum_layer_order,
-                user_id=request.user.pk
+        output_format = self.get_output_format()
+        document_page = self.get_object()
+
+        # Serve cached images directly, only dispatch the task on a miss.
+        cache_file = document_page.get_image_cache_file(
+            cache_filename=document_page.get_combined_image_cache_filename(
+                user=request.user, width=width, height=height, zoom=zoom,
+                rotation=rotation, maximum_layer_order=maximum_layer_order,
+                output_format=output_format
             )
         )
 
-        kwargs = {'timeout': DOCUMENT_IMAGE_TASK_TIMEOUT}
-        if settings.DEBUG:
-            # In debug more, task are run synchronously, causing this method
-            # to be called inside another task. Disable the check of nested
-            # tasks when using debug mode.
-            kwargs['disable_sync_subtasks'] = False
+        if not cache_file:
+            task = task_generate_document_page_image.apply_async(
+                kwargs=dict(
+                    document_page_id=document_page.pk, width=width,
+                    height=height, zoom=zoom, rotation=rotation,
+                    maximum_layer_order=maximum_layer_order,
+                    output_format=output_format, user_id=request.user.pk
+                )
+            )
 
-        cache_filename = task.get(**kwargs)
-        cache_file = self.get_object().cache_partition.get_file(filename=cache_filename)
-        with cache_file.open() as file_object:
-            response = HttpResponse(file_object.read(), content_type='image')
-            if '_hash' in request.GET:
-                patch_cache_control(
-                    response=response,
-                    max_age=settings_document_page_image_cache_time.value
+            return self.get_task_response(
+                document_page=document_page, output_format=output_format,
+                task=task
+            )
+
+        return self.get_image_response(
+            cache_file=cache_file, document_page=document_page,
+            output_format=output_format
+        )
+
+
+class APIDocumentPageImageTaskView(APIDocumentPageImageView):
+    """
+    get: Returns the status of a document page image generation task.
+    """
+    @cache_control(no_cache=True)
+    def retrieve(self, request, *args, **kwargs):
+        document_page = self.get_object()
+        task = task_generate_document_page_image.AsyncResult(
+            id=self.kwargs['task_id']
+        )
+
+        respond_async, wait = self.get_preferences()
+        if wait and not task.ready():
+            try:
+                task.get(propagate=False, timeout=wait)
+            except CeleryTimeoutError:
+                # Long poll expired, answer with the task status.
+                pass
+
+        if not task.ready():
+            return self.get_task_accepted_response(
+                document_page=document_page, task=task
+            )
+
+        return Response(data={'status': task.status})
+
+
+class APIDocumentPageRenditionView(APIDocumentPageImageView):
+    """
+    get: Returns a prerendered image of the selected document page.
+    """
+    @cache_control(private=True)
+    def retrieve(self, request, *args, **kwargs):
+        width = int(self.kwargs['width'])
+        document_page = self.get_object()
+        output_format = self.get_output_format()
+
+        # Renditions are normally created in the background after upload,
+        # serve them straight from the cache and only fall back to the
+        # converter task when missing.
+        transformation_list = document_page.get_combined_transformation_list(
+            user=request.user, width=width
+        )
+        cache_file = document_page.cache_partition.get_file(
+            filename=document_page.get_image_cache_filename(
+                output_format=output_format,
+                quality=document_page.get_image_quality(
+                    output_format=output_format, width=width
+                ), transformation_list=transformation_list
+            )
+        )
+
+        if not cache_file:
+            default_format = get_default_image_format()
+
+            if output_format != default_format:
+                # The prerendered renditions use the default format, serve
+                # it while the negotiated format is created for the next
+                # request.
+                cache_file = document_page.cache_partition.get_file(
+                    filename=document_page.get_image_cache_filename(
+                        output_format=default_format,
+                        quality=document_page.get_image_quality(
+                            output_format=default_format, width=width
+                        ), transformation_list=transformation_list
+                    ), record_statistics=False
+                )
+
+                if cache_file:
+                    task_generate_document_page_image.apply_async(
+                        kwargs=dict(
+                            document_page_id=document_page.pk,
+                            output_format=output_format, width=width,
+                            user_id=request.user.pk
+                        )
+                    )
+                    output_format = default_format
+
+        if not cache_file:
+            task = task_generate_document_page_image.apply_async(
+                kwargs=dict(
+                    document_page_id=document_page.pk,
+                    output_format=output_format, width=width,
+                    user_id=request.user.pk
+                )
+            )
+
+            return self.get_task_response(
+                document_page=document_page, output_format=output_format,
+                task=task
+            )
+
+        return self.get_image_response(
+            cache_file=cache_file, document_page=document_page,
+            output_format=output_format
+        )
+
+
+class APIDocumentPageTileDescriptorView(APIDocumentPageImageView):
+    """
+    get: Returns the image tile pyramid description of a document page.
+    """
+    def retrieve(self, request, *args, **kwargs):
+        maximum_layer_order = request.GET.get('maximum_layer_order')
+        if maximum_layer_order:
+            maximum_layer_order = int(maximum_layer_order)
+
+        document_page = self.get_object()
+
+        # Serve the cached descriptor directly, only dispatch the task on
+        # a miss.
+        descriptor = document_page.get_tile_pyramid_descriptor(
+            tile_pyramid_hash=document_page.get_tile_pyramid_hash(
+                transformation_list=document_page.get_tile_transformation_list(
+                    maximum_layer_order=maximum_layer_order, user=request.user
+                )
+            )
+        )
+
+        if not descriptor:
+            task = task_generate_document_page_tiles.apply_async(
+                kwargs=dict(
+                    document_page_id=document_page.pk,
+                    maximum_layer_order=maximum_layer_order,
+                    user_id=request.user.pk
                 )
-            return response
+            )
+
+            kwargs = {'timeout': DOCUMENT_IMAGE_TASK_TIMEOUT}
+            if settings.DEBUG:
+                # In debug more, task are run synchronously, causing this
+                # method to be called inside another task. Disable the check
+                # of nested tasks when using debug mode.
+                kwargs['disable_sync_subtasks'] = False
+
+            tile_pyramid_hash = task.get(**kwargs)
+
+            descriptor = document_page.get_tile_pyramid_descriptor(
+                record_statistics=False, tile_pyramid_hash=tile_pyramid_hash
+            )
+
+        return Response(descriptor)
+
+
+class APIDocumentPageTileView(APIDocumentPageImageView):
+    """
+    get: Returns an image tile of the selected document page.
+    """
+    @cache_control(private=True)
+    def retrieve(self, request, *args, **kwargs):
+        column = int(self.kwargs['column'])
+        level = int(self.kwargs['level'])
+        row = int(self.kwargs['row'])
+
+        maximum_layer_order = request.GET.get('maximum_layer_order')
+        if maximum_layer_order:
+            maximum_layer_order = int(maximum_layer_order)
+
+        document_page = self.get_object()
+
+        # Tiles are served straight from the cache when available, the
+        # tile pyramid hash only depends on the stored transformations.
+        tile_pyramid_hash = document_page.get_tile_pyramid_hash(
+            transformation_list=document_page.get_tile_transformation_list(
+                maximum_layer_order=maximum_layer_order, user=request.user
+            )
+        )
+
+        cache_file = document_page.get_tile_file(
+            column=column, level=level, row=row,
+            tile_pyramid_hash=tile_pyramid_hash
+        )
+
+        if not cache_file:
+            task = task_generate_document_page_tiles.apply_async(
+                kwargs=dict(
+                    document_page_id=document_page.pk, level=level,
+                    maximum_layer_order=maximum_layer_order,
+                    user_id=request.user.pk
+                )
+            )
+
+            kwargs = {'timeout': DOCUMENT_IMAGE_TASK_TIMEOUT}
+            if settings.DEBUG:
+                # In debug more, task are run synchronously, causing this
+                # method to be called inside another task. Disable the check
+                # of nested tasks when using debug mode.
+                kwargs['disable_sync_subtasks'] = False
+
+            tile_pyramid_hash = task.get(**kwargs)
+
+            cache_file = document_page.get_tile_file(
+                column=column, level=level, record_statistics=False, row=row,
+                tile_pyramid_hash=tile_pyramid_hash
+            )
+
+        if not cache_file:
+            raise Http404
+
+        # Tiles are encoded in the default image format.
+        response = self.get_image_response(
+            cache_file=cache_file, document_page=document_page,
+            output_format=get_default_image_format()
+        )
+        patch_cache_control(
+            response=response,
+            max_age=settings_document_page_image_cache_time.value
+        )
+        return response
 
 
 class APIDocumentPageView(generics.RetrieveUpdateAPIView):
@@ -351,10 +719,21 @@ class APIDocumentVersionDownloadView(DownloadMixin, generics.RetrieveAPIView):
         )
         return document
 
+    def get_download_content_type(self):
+        return self.get_object().mimetype
+
+    def get_download_etag(self):
+        checksum = self.get_object().checksum
+        if checksum:
+            return quote_etag(checksum)
+
     def get_download_file_object(self):
         instance = self.get_object()
         return instance.open()
 
+    def get_download_file_path(self):
+        return self.get_object().get_file_path()
+
     def get_download_filename(self):
         preserve_extension = self.request.GET.get(
             'preserve_extension', self.request.POST.get(
@@ -44,6 +44,9 @@ from .events import (
 )
 from .handlers import (
     handler_create_default_document_type, handler_create_document_cache,
+    handler_fix_document_version_orientation,
+    handler_generate_document_version_base_images,
+    handler_generate_document_version_renditions,
     handler_remove_empty_duplicates_lists, handler_scan_duplicates_for
 )
 from .links.document_links import (
@@ -593,6 +596,18 @@ class DocumentsApp(MayanAppConfig):
             dispatch_uid='documents_handler_create_document_cache',
             receiver=handler_create_document_cache,
         )
+        post_version_upload.connect(
+            dispatch_uid='documents_handler_fix_document_version_orientation',
+            receiver=handler_fix_document_version_orientation
+        )
+        post_version_upload.connect(
+            dispatch_uid='documents_handler_generate_document_version_base_images',
+            receiver=handler_generate_document_version_base_images
+        )
+        post_version_upload.connect(
+            dispatch_uid='documents_handler_generate_document_version_renditions',
+            receiver=handler_generate_document_version_renditions
+        )
         post_version_upload.connect(
             dispatch_uid='documents_handler_scan_duplicates_for',
             receiver=handler_scan_duplicates_for
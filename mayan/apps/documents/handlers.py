@@ -3,9 +3,15 @@ from django.apps import apps
 from .literals import (
     DEFAULT_DOCUMENT_TYPE_LABEL, STORAGE_NAME_DOCUMENT_IMAGE
 )
-from .settings import setting_document_cache_maximum_size
+from .settings import (
+    setting_document_cache_maximum_size, setting_fix_orientation
+)
 from .signals import post_initial_document_type
-from .tasks import task_clean_empty_duplicate_lists, task_scan_duplicates_for
+from .tasks import (
+    task_clean_empty_duplicate_lists, task_fix_document_version_orientation,
+    task_generate_document_version_base_images,
+    task_generate_document_version_renditions, task_scan_duplicates_for
+)
 
 
 def handler_create_default_document_type(sender, **kwargs):
@@ -31,6 +37,37 @@ def handler_create_document_cache(sender, **kwargs):
     )
 
 
+def handler_fix_document_version_orientation(sender, instance, **kwargs):
+    if setting_fix_orientation.value:
+        task_fix_document_version_orientation.apply_async(
+            kwargs={'document_version_id': instance.pk}
+        )
+
+
+def handler_generate_document_version_base_images(
+    sender, instance, **kwargs
+):
+    # When not fixing the orientation, the renditions task runs right
+    # away and rasterizes the base images itself.
+    if not setting_fix_orientation.value and instance.document.document_type.get_rendition_widths():
+        return
+
+    task_generate_document_version_base_images.apply_async(
+        kwargs={'document_version_id': instance.pk}
+    )
+
+
+def handler_generate_document_version_renditions(sender, instance, **kwargs):
+    # The orientation task generates the renditions when it finishes.
+    if setting_fix_orientation.value:
+        return
+
+    if instance.document.document_type.get_rendition_widths():
+        task_generate_document_version_renditions.apply_async(
+            kwargs={'document_version_id': instance.pk}
+        )
+
+
 def handler_scan_duplicates_for(sender, instance, **kwargs):
     task_scan_duplicates_for.apply_async(
         kwargs={'document_id': instance.document.pk}
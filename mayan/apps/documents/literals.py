@@ -2,13 +2,18 @@ from django.utils.translation import ugettext_lazy as _
 
 from mayan.apps.common.literals import TIME_DELTA_UNIT_DAYS
 
+BASE_IMAGE_CACHE_FILENAME = 'base_image'
+CACHE_WARMER_INTERVAL = 60 * 60  # 1 hour
 CHECK_DELETE_PERIOD_INTERVAL = 60
 CHECK_TRASH_PERIOD_INTERVAL = 60
 DELETE_STALE_STUBS_INTERVAL = 60 * 10  # 10 minutes
 DEFAULT_DELETE_PERIOD = 30
 DEFAULT_DELETE_TIME_UNIT = TIME_DELTA_UNIT_DAYS
 DEFAULT_DOCUMENT_TYPE_LABEL = _('Default')
+DEFAULT_DOCUMENTS_BASE_IMAGE_BATCH_SIZE = 10
 DEFAULT_DOCUMENTS_CACHE_MAXIMUM_SIZE = 500 * 2 ** 20  # 500 Megabytes
+DEFAULT_DOCUMENTS_CACHE_WARMER_DAYS = None
+DEFAULT_DOCUMENTS_CACHE_WARMER_RATE = 60
 DEFAULT_DOCUMENTS_HASH_BLOCK_SIZE = 65535
 DEFAULT_LANGUAGE = 'eng'
 DEFAULT_LANGUAGE_CODES = (
@@ -27,9 +32,29 @@ DEFAULT_LANGUAGE_CODES = (
     'hne', 'dcc', 'aka', 'kaz', 'syl', 'zul', 'ces', 'kin', 'hat', 'que',
     'swe', 'hmn', 'sna', 'mos', 'xho', 'bel'
 )
+DEFAULT_PAGE_IMAGE_FORMATS = ('AVIF', 'WEBP', 'JPEG', 'PNG')
+DEFAULT_PAGE_IMAGE_QUALITY_PROFILES = (
+    {
+        'maximum_width': 480,
+        'quality': {'AVIF': 45, 'JPEG': 75, 'WEBP': 70}
+    },
+    {
+        'maximum_width': None,
+        'quality': {'AVIF': 60, 'JPEG': 85, 'WEBP': 80}
+    },
+)
+DEFAULT_RENDITION_WIDTHS = ()
 DEFAULT_STUB_EXPIRATION_INTERVAL = 60 * 60 * 24  # 24 hours
+DEFAULT_TILE_SIZE = 256
 DEFAULT_ZIP_FILENAME = 'document_bundle.zip'
 DOCUMENT_IMAGE_TASK_TIMEOUT = 120
+DOCUMENT_PAGE_IMAGE_RETRY_AFTER = 1
+DOCUMENT_PAGE_IMAGE_WAIT_INTERVAL = 0.25
+FRAME_OFFSETS_CACHE_FILENAME = 'frame_offsets'
+IMAGE_CACHE_FILENAME = '{transformations_hash}-{output_format}-{quality}'
+INTERMEDIATE_IMAGE_CACHE_FILENAME = 'intermediate-{transformations_hash}'
+# Lossless to not degrade the image each time a layer is resumed.
+INTERMEDIATE_IMAGE_FORMAT = 'PNG'
 UPDATE_PAGE_COUNT_RETRY_DELAY = 10
 UPLOAD_NEW_VERSION_RETRY_DELAY = 10
 
@@ -40,3 +65,6 @@ PAGE_RANGE_CHOICES = (
 )
 STORAGE_NAME_DOCUMENT_IMAGE = 'documents__documentimagecache'
 STORAGE_NAME_DOCUMENT_VERSION = 'documents__documentversion'
+
+TILE_DESCRIPTOR_CACHE_FILENAME = 'tiles-{tile_pyramid_hash}-descriptor'
+TILE_CACHE_FILENAME = 'tiles-{tile_pyramid_hash}-{level}-{column}-{row}'
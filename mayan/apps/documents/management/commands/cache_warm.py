@@ -0,0 +1,57 @@
+from django.core import management
+from django.utils.translation import ugettext_lazy as _
+
+from ...utils import DocumentCacheWarmer
+
+
+class Command(management.BaseCommand):
+    help = 'Render the page images not in the cache for a set of documents.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cabinet', action='store', dest='cabinet_id', type=int,
+            help=_('Warm the documents of a cabinet and its children.')
+        )
+        parser.add_argument(
+            '--days', action='store', dest='days', type=int,
+            help=_('Warm the documents uploaded in the last number of days.')
+        )
+        parser.add_argument(
+            '--index_node', action='store', dest='index_instance_node_id',
+            type=int, help=_(
+                'Warm the documents of an index instance node and its '
+                'children.'
+            )
+        )
+        parser.add_argument(
+            '--recent', action='store', dest='recent', type=int,
+            help=_('Warm the number of documents most recently accessed.')
+        )
+        parser.add_argument(
+            '--widths', action='store', dest='widths',
+            help=_(
+                'Comma separated list of page image widths to render. '
+                'Defaults to the rendition widths of each document type.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        widths = None
+        if options['widths']:
+            widths = [int(width) for width in options['widths'].split(',')]
+
+        cache_warmer = DocumentCacheWarmer(
+            cabinet_id=options['cabinet_id'], days=options['days'],
+            index_instance_node_id=options['index_instance_node_id'],
+            recent=options['recent'], widths=widths
+        )
+
+        def callback(count, index, total):
+            self.stdout.write(
+                '\rChecked {}/{}, queued {}'.format(index, total, count),
+                ending=''
+            )
+            self.stdout.flush()
+
+        count = cache_warmer.execute(callback=callback)
+        self.stdout.write('\nQueued {} documents.'.format(count))
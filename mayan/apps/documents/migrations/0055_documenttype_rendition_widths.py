@@ -0,0 +1,30 @@
+import django.core.validators
+from django.db import migrations, models
+import re
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0054_trasheddocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documenttype',
+            name='rendition_widths',
+            field=models.CharField(
+                blank=True, help_text='Comma separated list of page image '
+                'widths in pixels to render in the background when a new '
+                'version of a document of this type is uploaded. Leave '
+                'empty to use the default list.', max_length=255,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        re.compile('^\\d+(?:,\\d+)*\\Z'),
+                        code='invalid',
+                        message='Enter only digits separated by commas.'
+                    )
+                ], verbose_name='Rendition widths'
+            ),
+        ),
+    ]
@@ -194,6 +194,11 @@ class Document(HooksMixin, models.Model):
         if latest_version:
             return latest_version.get_api_image_url(*args, **kwargs)
 
+    def get_file_path(self):
+        latest_version = self.latest_version
+        if latest_version:
+            return latest_version.get_file_path()
+
     @property
     def is_in_trash(self):
         return self.in_trash
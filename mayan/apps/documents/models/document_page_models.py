@@ -1,10 +1,17 @@
+import hashlib
+import json
 import logging
+import math
+import time
 
 from furl import furl
+from PIL import Image
 
 from django.db import models
 from django.urls import reverse
-from django.utils.encoding import force_text, python_2_unicode_compatible
+from django.utils.encoding import (
+    force_bytes, force_text, python_2_unicode_compatible
+)
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
@@ -15,13 +22,24 @@ from mayan.apps.converter.transformations import (
     BaseTransformation, TransformationResize, TransformationRotate,
     TransformationZoom
 )
-from mayan.apps.converter.utils import get_converter_class
-
+from mayan.apps.converter.utils import (
+    get_converter_class, get_default_image_format, get_image_buffer
+)
+from mayan.apps.lock_manager.exceptions import LockError
+from mayan.apps.lock_manager.runtime import locking_backend
+
+from ..literals import (
+    BASE_IMAGE_CACHE_FILENAME, DOCUMENT_IMAGE_TASK_TIMEOUT,
+    DOCUMENT_PAGE_IMAGE_WAIT_INTERVAL, IMAGE_CACHE_FILENAME,
+    INTERMEDIATE_IMAGE_CACHE_FILENAME, INTERMEDIATE_IMAGE_FORMAT,
+    TILE_CACHE_FILENAME, TILE_DESCRIPTOR_CACHE_FILENAME
+)
 from ..managers import DocumentPageManager
 from ..settings import (
-    setting_disable_base_image_cache, setting_disable_transformed_image_cache,
-    setting_display_width, setting_display_height, setting_zoom_max_level,
-    setting_zoom_min_level
+    setting_base_image_batch_size, setting_disable_base_image_cache,
+    setting_disable_transformed_image_cache, setting_display_width,
+    setting_display_height, setting_page_image_quality_profiles,
+    setting_tile_size, setting_zoom_max_level, setting_zoom_min_level
 )
 
 from .document_version_models import DocumentVersion
@@ -58,10 +76,24 @@ class DocumentPage(models.Model):
 
     @cached_property
     def cache_partition(self):
-        partition, created = self.document_version.cache.partitions.get_or_create(
-            name=self.uuid
-        )
-        return partition
+        return self.document_version.cache.get_partition(name=self.uuid)
+
+    @cached_property
+    def content_cache_partition(self):
+        """
+        Cache partition of the files generated only from the content of the
+        version file for this page, like the base image. It is shared by
+        the pages with the same number of all the versions with the same
+        checksum.
+        """
+        if self.document_version.checksum:
+            return self.document_version.cache.get_partition(
+                name=self.document_version.get_content_cache_partition_name(
+                    page_number=self.page_number
+                )
+            )
+        else:
+            return self.cache_partition
 
     def delete(self, *args, **kwargs):
         self.cache_partition.delete()
@@ -81,14 +113,21 @@ class DocumentPage(models.Model):
     def document(self):
         return self.document_version.document
 
-    def generate_image(self, user=None, **kwargs):
+    def generate_image(self, user=None, output_format=None, **kwargs):
         transformation_list = self.get_combined_transformation_list(user=user, **kwargs)
-        combined_cache_filename = BaseTransformation.combine(transformation_list)
+        output_format = output_format or get_default_image_format()
+        quality = self.get_image_quality(
+            output_format=output_format, width=kwargs.get('width')
+        )
+        combined_cache_filename = self.get_image_cache_filename(
+            output_format=output_format, quality=quality,
+            transformation_list=transformation_list
+        )
 
         # Check is transformed image is available
         logger.debug('transformations cache filename: %s', combined_cache_filename)
 
-        if not setting_disable_transformed_image_cache.value and self.cache_partition.get_file(filename=combined_cache_filename):
+        if self.is_image_cached(cache_filename=combined_cache_filename):
             logger.debug(
                 'transformations cache file "%s" found', combined_cache_filename
             )
@@ -96,12 +135,187 @@ class DocumentPage(models.Model):
             logger.debug(
                 'transformations cache file "%s" not found', combined_cache_filename
             )
-            image = self.get_image(transformations=transformation_list)
-            with self.cache_partition.create_file(filename=combined_cache_filename) as file_object:
-                file_object.write(image.getvalue())
+
+            # Coalesce concurrent requests of the same image. Only the
+            # process holding the lock renders the image, the others wait
+            # for the cache file it creates.
+            lock_id = 'document_page-generate_image-{}-{}'.format(
+                self.pk, combined_cache_filename
+            )
+            start_time = time.time()
+
+            while True:
+                try:
+                    lock = locking_backend.acquire_lock(
+                        name=lock_id, timeout=DOCUMENT_IMAGE_TASK_TIMEOUT
+                    )
+                except LockError:
+                    if time.time() - start_time > DOCUMENT_IMAGE_TASK_TIMEOUT:
+                        raise
+
+                    time.sleep(DOCUMENT_PAGE_IMAGE_WAIT_INTERVAL)
+
+                    if self.is_image_cached(cache_filename=combined_cache_filename):
+                        logger.debug(
+                            'transformations cache file "%s" created by '
+                            'another process', combined_cache_filename
+                        )
+                        break
+                else:
+                    try:
+                        # The image could have been created between the
+                        # first check and acquiring the lock.
+                        if not self.is_image_cached(cache_filename=combined_cache_filename):
+                            image = self.get_image(
+                                output_format=output_format, quality=quality,
+                                transformations=transformation_list
+                            )
+                            with self.cache_partition.create_file(filename=combined_cache_filename) as file_object:
+                                file_object.write(image.getvalue())
+                    finally:
+                        lock.release()
+                    break
 
         return combined_cache_filename
 
+    def generate_renditions(self, widths, user=None):
+        """
+        Render and cache the page image at each of the widths. The base
+        image is decoded only once for all the widths. The renditions are
+        stored in the default image format under the same cache filenames
+        as the images generated for the same width by the page image view.
+        Returns the number of renditions created.
+        """
+        output_format = get_default_image_format()
+
+        pending_renditions = self.get_pending_renditions(
+            output_format=output_format, user=user, widths=widths
+        )
+
+        if not pending_renditions:
+            return 0
+
+        cache_file = self.content_cache_partition.get_file(
+            filename=BASE_IMAGE_CACHE_FILENAME, record_statistics=False
+        )
+
+        if setting_disable_base_image_cache.value or not cache_file:
+            for cache_filename, quality, transformation_list in pending_renditions:
+                page_image = self.get_image(
+                    output_format=output_format, quality=quality,
+                    transformations=transformation_list
+                )
+                with self.cache_partition.create_file(filename=cache_filename) as file_object:
+                    file_object.write(page_image.getvalue())
+        else:
+            with cache_file.open() as file_object:
+                converter = get_converter_class()(file_object=file_object)
+                converter.seek_page(page_number=0)
+                image = converter.image
+
+                for cache_filename, quality, transformation_list in pending_renditions:
+                    # Transformations modify the image in place.
+                    converter.image = image.copy()
+                    converter.transform_many(transformations=transformation_list)
+
+                    with self.cache_partition.create_file(filename=cache_filename) as cache_file_object:
+                        cache_file_object.write(
+                            converter.get_page(
+                                output_format=output_format, quality=quality
+                            ).getvalue()
+                        )
+
+        logger.debug(
+            'Created %d renditions for document page: %s',
+            len(pending_renditions), self
+        )
+        return len(pending_renditions)
+
+    def generate_tiles(self, level=None, user=None, maximum_layer_order=None):
+        """
+        Create the descriptor of the page image tile pyramid and if a level
+        is specified, slice the image of that level into tiles. The
+        pyramid is built from the base image with the stored
+        transformations applied and each level halves the size of the next
+        one. Returns the tile pyramid hash.
+        """
+        transformation_list = self.get_tile_transformation_list(
+            maximum_layer_order=maximum_layer_order, user=user
+        )
+        tile_pyramid_hash = self.get_tile_pyramid_hash(
+            transformation_list=transformation_list
+        )
+        descriptor = self.get_tile_pyramid_descriptor(
+            record_statistics=False, tile_pyramid_hash=tile_pyramid_hash
+        )
+
+        def is_level_done():
+            return level is None or level >= descriptor['levels'] or self.get_tile_file(column=0, level=level, record_statistics=False, row=0, tile_pyramid_hash=tile_pyramid_hash)
+
+        if descriptor and is_level_done():
+            return tile_pyramid_hash
+
+        with self.get_transformed_image(transformations=transformation_list) as image:
+            if not descriptor:
+                width, height = image.size
+                descriptor = {
+                    'format': get_default_image_format().lower(),
+                    'height': height,
+                    'levels': int(math.ceil(math.log(max(width, height), 2))) + 1,
+                    'overlap': 0,
+                    'tile_size': setting_tile_size.value,
+                    'width': width
+                }
+
+                filename = TILE_DESCRIPTOR_CACHE_FILENAME.format(
+                    tile_pyramid_hash=tile_pyramid_hash
+                )
+                if not self.cache_partition.get_file(
+                    filename=filename, record_statistics=False
+                ):
+                    with self.cache_partition.create_file(filename=filename) as file_object:
+                        file_object.write(force_bytes(json.dumps(descriptor)))
+
+                if is_level_done():
+                    return tile_pyramid_hash
+
+            scale = 2 ** (descriptor['levels'] - 1 - level)
+            level_size = (
+                int(math.ceil(1.0 * descriptor['width'] / scale)),
+                int(math.ceil(1.0 * descriptor['height'] / scale))
+            )
+            if scale > 1:
+                level_image = image.resize(level_size, Image.ANTIALIAS)
+            else:
+                level_image = image
+
+            tile_size = descriptor['tile_size']
+
+            for row in range(int(math.ceil(1.0 * level_size[1] / tile_size))):
+                for column in range(int(math.ceil(1.0 * level_size[0] / tile_size))):
+                    filename = TILE_CACHE_FILENAME.format(
+                        column=column, level=level, row=row,
+                        tile_pyramid_hash=tile_pyramid_hash
+                    )
+                    if self.cache_partition.get_file(
+                        filename=filename, record_statistics=False
+                    ):
+                        continue
+
+                    tile = level_image.crop(
+                        (
+                            column * tile_size, row * tile_size,
+                            min((column + 1) * tile_size, level_size[0]),
+                            min((row + 1) * tile_size, level_size[1])
+                        )
+                    )
+                    with self.cache_partition.create_file(filename=filename) as file_object:
+                        file_object.write(
+                            get_image_buffer(image=tile).getvalue()
+                        )
+
+        return tile_pyramid_hash
+
     def get_absolute_url(self):
         return reverse(
             viewname='documents:document_page_view', kwargs={
@@ -118,6 +332,22 @@ class DocumentPage(models.Model):
         The purpose of this unique URL is to allow client side caching
         if document page images.
         """
+        rendition_width = self.get_rendition_width(**kwargs)
+        if rendition_width:
+            final_url = furl()
+            final_url.path = reverse(
+                viewname='rest_api:documentpage-rendition', kwargs={
+                    'pk': self.document.pk,
+                    'version_pk': self.document_version.pk,
+                    'page_pk': self.pk, 'width': rendition_width
+                }
+            )
+            final_url.args['_hash'] = BaseTransformation.combine(
+                self.get_combined_transformation_list(width=rendition_width)
+            )
+
+            return final_url.tostr()
+
         transformations_hash = BaseTransformation.combine(
             self.get_combined_transformation_list(*args, **kwargs)
         )
@@ -136,6 +366,23 @@ class DocumentPage(models.Model):
 
         return final_url.tostr()
 
+    def get_combined_image_cache_filename(
+        self, user=None, output_format=None, **kwargs
+    ):
+        """
+        Return the cache filename of the image generated by .generate_image()
+        for the same arguments, without generating it.
+        """
+        output_format = output_format or get_default_image_format()
+
+        return self.get_image_cache_filename(
+            output_format=output_format, quality=self.get_image_quality(
+                output_format=output_format, width=kwargs.get('width')
+            ), transformation_list=self.get_combined_transformation_list(
+                user=user, **kwargs
+            )
+        )
+
     def get_combined_transformation_list(self, user=None, *args, **kwargs):
         """
         Return a list of transformation containing the server side
@@ -189,15 +436,215 @@ class DocumentPage(models.Model):
 
         return transformation_list
 
-    def get_image(self, transformations=None):
-        cache_filename = 'base_image'
+    def get_image(self, transformations=None, output_format=None, quality=None):
+        return get_image_buffer(
+            image=self.get_transformed_image(transformations=transformations),
+            output_format=output_format, quality=quality
+        )
+
+    def get_image_cache_file(self, cache_filename, record_statistics=True):
+        """
+        Return the cache file of a transformed image or None if it doesn't
+        exist or the transformed image cache is disabled.
+        """
+        if not setting_disable_transformed_image_cache.value:
+            return self.cache_partition.get_file(
+                filename=cache_filename, record_statistics=record_statistics
+            )
+
+    def get_image_cache_filename(
+        self, transformation_list, output_format, quality=None
+    ):
+        return IMAGE_CACHE_FILENAME.format(
+            output_format=output_format.lower(), quality=quality or 0,
+            transformations_hash=BaseTransformation.combine(
+                transformation_list
+            )
+        )
+
+    def get_image_quality(self, output_format, width=None):
+        """
+        Return the encoding quality of the image format from the first
+        quality profile whose maximum width fits the image width.
+        """
+        width = int(width or setting_display_width.value or 0)
+
+        for profile in setting_page_image_quality_profiles.value:
+            maximum_width = profile.get('maximum_width')
+            if not maximum_width or width <= int(maximum_width):
+                return profile.get('quality', {}).get(output_format.upper())
+
+    def get_intermediate_image_boundaries(self, transformations):
+        """
+        Return the positions in the transformation list where a stored
+        layer ends and more transformations follow. The images at these
+        positions are cached, requests that only differ after a boundary
+        resume from the cached image instead of the base image.
+        """
+        result = []
+        for index in range(1, len(transformations)):
+            object_layer_id = transformations[index - 1].object_layer_id
+            if object_layer_id is not None and object_layer_id != transformations[index].object_layer_id:
+                result.append(index)
+
+        return result
+
+    def get_intermediate_image_cache_filename(self, transformations):
+        return INTERMEDIATE_IMAGE_CACHE_FILENAME.format(
+            transformations_hash=BaseTransformation.combine(transformations)
+        )
+
+    def get_pending_renditions(self, widths, output_format=None, user=None):
+        """
+        Return a list of the cache filename, quality and transformations of
+        the renditions at the widths that are not cached.
+        """
+        output_format = output_format or get_default_image_format()
+
+        result = []
+        for width in widths:
+            transformation_list = self.get_combined_transformation_list(
+                user=user, width=width
+            )
+            quality = self.get_image_quality(
+                output_format=output_format, width=width
+            )
+            cache_filename = self.get_image_cache_filename(
+                output_format=output_format, quality=quality,
+                transformation_list=transformation_list
+            )
+
+            if not self.cache_partition.get_file(
+                filename=cache_filename, record_statistics=False
+            ):
+                result.append((cache_filename, quality, transformation_list))
+
+        return result
+
+    def get_rendition_width(
+        self, width=None, height=None, rotation=None, zoom=None,
+        maximum_layer_order=None, transformations=None, **kwargs
+    ):
+        """
+        Return the smallest prerendered width that is equal or larger than
+        the requested width. Only plain resize requests can be served from
+        a rendition, return None for all other requests.
+        """
+        if kwargs or height or rotation or transformations or maximum_layer_order is not None:
+            return None
+
+        if zoom and int(zoom) != DEFAULT_ZOOM_LEVEL:
+            return None
+
+        width = int(width or setting_display_width.value or 0)
+        if not width:
+            return None
+
+        for rendition_width in self.document.document_type.get_rendition_widths():
+            if rendition_width >= width:
+                return rendition_width
+
+    def get_tile_file(
+        self, level, column, row, tile_pyramid_hash, record_statistics=True
+    ):
+        return self.cache_partition.get_file(
+            filename=TILE_CACHE_FILENAME.format(
+                column=column, level=level, row=row,
+                tile_pyramid_hash=tile_pyramid_hash
+            ), record_statistics=record_statistics
+        )
+
+    def get_tile_pyramid_descriptor(
+        self, tile_pyramid_hash, record_statistics=True
+    ):
+        cache_file = self.cache_partition.get_file(
+            filename=TILE_DESCRIPTOR_CACHE_FILENAME.format(
+                tile_pyramid_hash=tile_pyramid_hash
+            ), record_statistics=record_statistics
+        )
+        if cache_file:
+            with cache_file.open() as file_object:
+                return json.loads(force_text(file_object.read()))
+
+    def get_tile_pyramid_hash(self, transformation_list):
+        result = hashlib.sha256(
+            force_bytes(
+                'tiles-{}-{}'.format(
+                    setting_tile_size.value, get_default_image_format()
+                )
+            )
+        )
+        for transformation in transformation_list:
+            result.update(transformation.cache_hash())
+
+        return result.hexdigest()
+
+    def get_tile_transformation_list(self, user=None, maximum_layer_order=None):
+        """
+        Only the stored transformations apply to the tiles. Interactive
+        transformations like zoom and rotation are performed by the viewer.
+        """
+        return list(
+            LayerTransformation.objects.get_for_object(
+                self, maximum_layer_order=maximum_layer_order,
+                as_classes=True, user=user
+            )
+        )
+
+    def get_transformed_image(self, transformations=None):
+        """
+        Return the decoded image of the page with the transformations
+        applied.
+        """
+        cache_filename = BASE_IMAGE_CACHE_FILENAME
         logger.debug('Page cache filename: %s', cache_filename)
 
-        cache_file = self.cache_partition.get_file(filename=cache_filename)
+        cache_file = self.content_cache_partition.get_file(
+            filename=cache_filename, record_statistics=False
+        )
+
+        if not setting_disable_base_image_cache.value and not cache_file:
+            logger.debug('Page cache file "%s" not found', cache_filename)
+
+            # Rasterize this page and the next ones in a single pass to
+            # avoid one converter execution per page.
+            self.document_version.generate_base_images(
+                page_number_first=self.page_number,
+                page_number_last=self.page_number + setting_base_image_batch_size.value - 1
+            )
+            cache_file = self.content_cache_partition.get_file(
+                filename=cache_filename, record_statistics=False
+            )
 
         if not setting_disable_base_image_cache.value and cache_file:
             logger.debug('Page cache file "%s" found', cache_filename)
 
+            if setting_disable_transformed_image_cache.value:
+                boundaries = ()
+            else:
+                boundaries = self.get_intermediate_image_boundaries(
+                    transformations=transformations
+                )
+
+            # Resume from the image of the longest cached prefix of stored
+            # layers, if any.
+            start = 0
+            for boundary in reversed(boundaries):
+                intermediate_file = self.cache_partition.get_file(
+                    filename=self.get_intermediate_image_cache_filename(
+                        transformations=transformations[:boundary]
+                    ),
+                    record_statistics=False
+                )
+                if intermediate_file:
+                    logger.debug(
+                        'Intermediate cache file "%s" found',
+                        intermediate_file.filename
+                    )
+                    cache_file = intermediate_file
+                    start = boundary
+                    break
+
             with cache_file.open() as file_object:
                 converter = get_converter_class()(
                     file_object=file_object
@@ -205,34 +652,53 @@ class DocumentPage(models.Model):
 
                 converter.seek_page(page_number=0)
 
+                # Cache the image at each remaining layer boundary.
+                for boundary in boundaries:
+                    if boundary > start:
+                        converter.transform_many(
+                            transformations=transformations[start:boundary]
+                        )
+                        start = boundary
+
+                        with self.cache_partition.create_file(filename=self.get_intermediate_image_cache_filename(transformations=transformations[:boundary])) as intermediate_file_object:
+                            intermediate_file_object.write(
+                                converter.get_page(
+                                    output_format=INTERMEDIATE_IMAGE_FORMAT
+                                ).getvalue()
+                            )
+
                 # This code is also repeated below to allow using a context
                 # manager with cache_file.open and close it automatically.
                 # Apply runtime transformations
-                for transformation in transformations:
-                    converter.transform(transformation=transformation)
+                converter.transform_many(
+                    transformations=transformations[start:]
+                )
 
-                return converter.get_page()
+                # Decode before the file is closed.
+                converter.image.load()
+                return converter.image
         else:
             logger.debug('Page cache file "%s" not found', cache_filename)
 
             try:
                 with self.document_version.get_intermediate_file() as file_object:
                     converter = get_converter_class()(
-                        file_object=file_object
+                        file_object=file_object,
+                        frame_offsets=self.document_version.get_frame_offsets()
                     )
                     converter.seek_page(page_number=self.page_number - 1)
 
                     page_image = converter.get_page()
 
                     # Since open "wb+" doesn't create files, create it explicitly
-                    with self.cache_partition.create_file(filename=cache_filename) as file_object:
+                    with self.content_cache_partition.create_file(filename=cache_filename) as file_object:
                         file_object.write(page_image.getvalue())
 
                     # Apply runtime transformations
-                    for transformation in transformations:
-                        converter.transform(transformation=transformation)
+                    converter.transform_many(transformations=transformations)
 
-                    return converter.get_page()
+                    converter.image.load()
+                    return converter.image
             except Exception as exception:
                 # Cleanup in case of error
                 logger.error(
@@ -241,6 +707,11 @@ class DocumentPage(models.Model):
                 )
                 raise
 
+    def is_image_cached(self, cache_filename):
+        return self.get_image_cache_file(
+            cache_filename=cache_filename, record_statistics=False
+        ) is not None
+
     @property
     def is_in_trash(self):
         return self.document.is_in_trash
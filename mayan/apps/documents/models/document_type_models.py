@@ -1,6 +1,7 @@
 import logging
 
 from django.apps import apps
+from django.core.validators import validate_comma_separated_integer_list
 from django.db import models, transaction
 from django.urls import reverse
 from django.utils.encoding import python_2_unicode_compatible
@@ -13,7 +14,7 @@ from ..events import event_document_type_created, event_document_type_edited
 from ..literals import DEFAULT_DELETE_PERIOD, DEFAULT_DELETE_TIME_UNIT
 from ..managers import DocumentTypeManager
 from ..permissions import permission_document_view
-from ..settings import setting_language
+from ..settings import setting_language, setting_rendition_widths
 
 __all__ = ('DocumentType', 'DocumentTypeFilename')
 logger = logging.getLogger(name=__name__)
@@ -50,6 +51,15 @@ class DocumentType(models.Model):
         default=DEFAULT_DELETE_TIME_UNIT, max_length=8, null=True,
         verbose_name=_('Delete time unit')
     )
+    rendition_widths = models.CharField(
+        blank=True, help_text=_(
+            'Comma separated list of page image widths in pixels to render '
+            'in the background when a new version of a document of this '
+            'type is uploaded. Leave empty to use the default list.'
+        ), max_length=255, validators=[
+            validate_comma_separated_integer_list
+        ], verbose_name=_('Rendition widths')
+    )
 
     objects = DocumentTypeManager()
 
@@ -94,6 +104,18 @@ class DocumentType(models.Model):
 
         return queryset.count()
 
+    def get_rendition_widths(self):
+        """
+        Return the sorted page image widths to prerender for the documents
+        of this type.
+        """
+        if self.rendition_widths:
+            widths = self.rendition_widths.split(',')
+        else:
+            widths = setting_rendition_widths.value or ()
+
+        return sorted(set(int(width) for width in widths))
+
     def natural_key(self):
         return (self.label,)
 
@@ -1,4 +1,5 @@
 import hashlib
+import json
 import logging
 import os
 import shutil
@@ -6,8 +7,11 @@ import uuid
 
 from django.apps import apps
 from django.db import models, transaction
+from django.db.models import Max, Q
 from django.urls import reverse
-from django.utils.encoding import force_text, python_2_unicode_compatible
+from django.utils.encoding import (
+    force_bytes, force_text, python_2_unicode_compatible
+)
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
@@ -18,14 +22,18 @@ from mayan.apps.converter.transformations import TransformationRotate
 from mayan.apps.converter.utils import get_converter_class
 from mayan.apps.mimetype.api import get_mimetype
 from mayan.apps.storage.classes import DefinedStorageLazy
+from mayan.apps.storage.utils import get_storage_file_path
 from mayan.apps.templating.classes import Template
 
 from ..events import event_document_version_new, event_document_version_revert
 from ..literals import (
+    BASE_IMAGE_CACHE_FILENAME, FRAME_OFFSETS_CACHE_FILENAME,
     STORAGE_NAME_DOCUMENT_IMAGE, STORAGE_NAME_DOCUMENT_VERSION
 )
 from ..managers import DocumentVersionManager
-from ..settings import setting_fix_orientation, setting_hash_block_size
+from ..settings import (
+    setting_disable_base_image_cache, setting_hash_block_size
+)
 from ..signals import post_document_created, post_version_upload
 
 from .document_models import Document
@@ -169,16 +177,27 @@ class DocumentVersion(models.Model):
     @cached_property
     def cache(self):
         Cache = apps.get_model(app_label='file_caching', model_name='Cache')
-        return Cache.objects.get(
+        return Cache.objects.get_by_defined_storage_name(
             defined_storage_name=STORAGE_NAME_DOCUMENT_IMAGE
         )
 
     @cached_property
     def cache_partition(self):
-        partition, created = self.cache.partitions.get_or_create(
-            name='version-{}'.format(self.uuid)
-        )
-        return partition
+        return self.cache.get_partition(name='version-{}'.format(self.uuid))
+
+    @cached_property
+    def content_cache_partition(self):
+        """
+        Cache partition of the files generated only from the content of the
+        version file, like the intermediate file. It is shared by all the
+        versions with the same checksum.
+        """
+        if self.checksum:
+            return self.cache.get_partition(
+                name=self.get_content_cache_partition_name()
+            )
+        else:
+            return self.cache_partition
 
     def delete(self, *args, **kwargs):
         for page in self.pages.all():
@@ -187,6 +206,17 @@ class DocumentVersion(models.Model):
         self.file.storage.delete(self.file.name)
         self.cache_partition.delete()
 
+        # The versions with the same checksum are the references to the
+        # shared content cache partitions. Delete them with the last one.
+        if self.checksum and not DocumentVersion.objects.filter(checksum=self.checksum).exclude(pk=self.pk).exists():
+            content_cache_partition_name = self.get_content_cache_partition_name()
+            for cache_partition in self.cache.partitions.filter(
+                Q(name=content_cache_partition_name) | Q(
+                    name__startswith='{}-'.format(content_cache_partition_name)
+                )
+            ):
+                cache_partition.delete()
+
         return super(DocumentVersion, self).delete(*args, **kwargs)
 
     def execute_pre_save_hooks(self):
@@ -209,14 +239,115 @@ class DocumentVersion(models.Model):
         return self.file.storage.exists(self.file.name)
 
     def fix_orientation(self):
-        for page in self.pages.all():
-            degrees = page.detect_orientation()
+        """
+        Detect the rotation of all the pages in a single pass of the
+        converter and add a rotation transformation to the pages that are
+        not rightside up.
+        """
+        pages = self.pages.all()
+
+        with self.open() as file_object:
+            converter = get_converter_class()(
+                file_object=file_object, mime_type=self.mimetype,
+                frame_offsets=self.get_frame_offsets()
+            )
+            orientations = converter.detect_orientations(
+                page_number_last=pages.count()
+            )
+
+        for page in pages:
+            degrees = orientations.get(page.page_number)
             if degrees:
                 layer_saved_transformations.add_transformation_to(
                     obj=page, transformation_class=TransformationRotate,
                     arguments='{{"degrees": {}}}'.format(360 - degrees)
                 )
 
+    def generate_base_images(
+        self, page_number_first=None, page_number_last=None
+    ):
+        """
+        Rasterize the base image of the pages in the range that are not yet
+        cached, in a single converter pass over the intermediate file.
+        Returns the number of base images created.
+        """
+        if setting_disable_base_image_cache.value:
+            return 0
+
+        queryset = self.pages.all()
+        if page_number_first:
+            queryset = queryset.filter(page_number__gte=page_number_first)
+        if page_number_last:
+            queryset = queryset.filter(page_number__lte=page_number_last)
+
+        missing_pages = {
+            page.page_number: page for page in queryset if not page.content_cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME, record_statistics=False
+            )
+        }
+
+        if not missing_pages:
+            return 0
+
+        result = 0
+
+        try:
+            with self.get_intermediate_file() as file_object:
+                converter = get_converter_class()(
+                    file_object=file_object,
+                    frame_offsets=self.get_frame_offsets()
+                )
+
+                for page_number, page_image in converter.get_pages(
+                    page_number_first=min(missing_pages),
+                    page_number_last=max(missing_pages)
+                ):
+                    page = missing_pages.get(page_number)
+                    # Skip pages cached by another process in the meantime.
+                    if page and not page.content_cache_partition.get_file(filename=BASE_IMAGE_CACHE_FILENAME, record_statistics=False):
+                        with page.content_cache_partition.create_file(filename=BASE_IMAGE_CACHE_FILENAME) as cache_file_object:
+                            cache_file_object.write(page_image.getvalue())
+                        result += 1
+        except Exception as exception:
+            logger.error(
+                'Error creating base images for document version "%s"; %s',
+                self, exception
+            )
+            raise
+
+        logger.debug(
+            'Created %d base images for document version: %s', result, self
+        )
+        return result
+
+    def generate_renditions(self, widths=None):
+        """
+        Render the page images at the widths provided or at the widths
+        configured for the document type of this version. Returns the
+        number of renditions created.
+        """
+        widths = widths or self.document.document_type.get_rendition_widths()
+        if not widths:
+            return 0
+
+        try:
+            self.generate_base_images()
+        except Exception:
+            # Already logged, each page rasterizes its own base image.
+            pass
+
+        result = 0
+        for page in self.pages.all():
+            try:
+                result += page.generate_renditions(widths=widths)
+            except Exception as exception:
+                logger.error(
+                    'Error creating renditions for document page "%s"; %s',
+                    page, exception
+                )
+
+        return result
+
     def get_absolute_url(self):
         return reverse(
             viewname='documents:document_version_view', kwargs={
@@ -229,9 +360,72 @@ class DocumentVersion(models.Model):
         if first_page:
             return first_page.get_api_image_url(*args, **kwargs)
 
+    def get_duplicate_page_count(self):
+        """
+        Return the page count of another version with the same checksum,
+        which has the same file, to skip the page count detection. Returns
+        None if there is no such version.
+        """
+        if not self.checksum:
+            return None
+
+        DocumentPage = apps.get_model(
+            app_label='documents', model_name='DocumentPage'
+        )
+
+        return DocumentPage.passthrough.filter(
+            document_version__checksum=self.checksum
+        ).exclude(document_version=self).aggregate(
+            page_count=Max('page_number')
+        )['page_count']
+
+    def get_content_cache_partition_name(self, page_number=None):
+        """
+        Return the name of the content cache partition of the version or
+        of one of its pages.
+        """
+        name = 'content-{}'.format(self.checksum)
+        if page_number:
+            name = '{}-{}'.format(name, page_number)
+
+        return name
+
+    def get_file_path(self):
+        """
+        Return the filesystem path of the version file if it is stored
+        unaltered in the local filesystem and no pre open hook changes its
+        content, or None otherwise.
+        """
+        path = get_storage_file_path(
+            name=self.file.name, storage=self.file.storage
+        )
+        if path:
+            file_object = self.open(raw=True)
+            result = DocumentVersion._execute_hooks(
+                hook_list=DocumentVersion._pre_open_hooks,
+                instance=self, file_object=file_object
+            )
+            result['file_object'].close()
+            file_object.close()
+
+            if result['file_object'] is file_object:
+                return path
+
+    def get_frame_offsets(self):
+        """
+        Return the index of frame offsets of a multi-frame image file stored
+        when the pages were counted, or None if the file has no index.
+        """
+        cache_file = self.content_cache_partition.get_file(
+            filename=FRAME_OFFSETS_CACHE_FILENAME, record_statistics=False
+        )
+        if cache_file:
+            with cache_file.open() as file_object:
+                return json.loads(force_text(file_object.read()))
+
     def get_intermediate_file(self):
         cache_filename = 'intermediate_file'
-        cache_file = self.cache_partition.get_file(filename=cache_filename)
+        cache_file = self.content_cache_partition.get_file(filename=cache_filename, record_statistics=False)
         if cache_file:
             logger.debug('Intermidiate file found.')
             return cache_file.open()
@@ -244,12 +438,12 @@ class DocumentVersion(models.Model):
                         file_object=version_file_object
                     )
                     with converter.to_pdf() as pdf_file_object:
-                        with self.cache_partition.create_file(filename=cache_filename) as file_object:
+                        with self.content_cache_partition.create_file(filename=cache_filename) as file_object:
                             shutil.copyfileobj(
                                 fsrc=pdf_file_object, fdst=file_object
                             )
 
-                        return self.cache_partition.get_file(filename=cache_filename).open()
+                        return self.content_cache_partition.get_file(filename=cache_filename, record_statistics=False).open()
             except InvalidOfficeFormat:
                 return self.open()
             except Exception as exception:
@@ -257,7 +451,7 @@ class DocumentVersion(models.Model):
                     'Error creating intermediate file "%s"; %s.',
                     cache_filename, exception
                 )
-                cache_file = self.cache_partition.get_file(filename=cache_filename)
+                cache_file = self.content_cache_partition.get_file(filename=cache_filename, record_statistics=False)
                 if cache_file:
                     cache_file.delete()
                 raise
@@ -284,6 +478,25 @@ class DocumentVersion(models.Model):
         return (self.checksum, self.document.natural_key())
     natural_key.dependencies = ['documents.Document']
 
+    def is_cache_complete(self, widths=None):
+        """
+        Return whether the base images and the renditions at the widths
+        provided or at the widths configured for the document type are
+        cached for all the pages.
+        """
+        widths = widths or self.document.document_type.get_rendition_widths()
+
+        for page in self.pages.all():
+            if not setting_disable_base_image_cache.value and not page.content_cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME, record_statistics=False
+            ):
+                return False
+
+            if widths and page.get_pending_renditions(widths=widths):
+                return False
+
+        return True
+
     @property
     def is_in_trash(self):
         return self.document.is_in_trash
@@ -371,8 +584,6 @@ class DocumentVersion(models.Model):
                     self.update_mimetype(save=False)
                     self.save()
                     self.update_page_count(save=False)
-                    if setting_fix_orientation.value:
-                        self.fix_orientation()
 
                     logger.info(
                         'New document version "%s" created for document: %s',
@@ -410,6 +621,16 @@ class DocumentVersion(models.Model):
         with self.open() as input_file_object:
             shutil.copyfileobj(fsrc=input_file_object, fdst=file_object)
 
+    def set_frame_offsets(self, frame_offsets):
+        cache_file = self.content_cache_partition.get_file(
+            filename=FRAME_OFFSETS_CACHE_FILENAME, record_statistics=False
+        )
+        if cache_file:
+            cache_file.delete()
+
+        with self.content_cache_partition.create_file(filename=FRAME_OFFSETS_CACHE_FILENAME) as file_object:
+            file_object.write(force_bytes(json.dumps(frame_offsets)))
+
     @property
     def size(self):
         if self.exists():
@@ -466,11 +687,18 @@ class DocumentVersion(models.Model):
 
     def update_page_count(self, save=True):
         try:
-            with self.open() as file_object:
-                converter = get_converter_class()(
-                    file_object=file_object, mime_type=self.mimetype
-                )
-                detected_pages = converter.get_page_count()
+            detected_pages = self.get_duplicate_page_count()
+            if detected_pages is None:
+                with self.open() as file_object:
+                    converter = get_converter_class()(
+                        file_object=file_object, mime_type=self.mimetype
+                    )
+                    detected_pages = converter.get_page_count()
+
+                if converter.frame_offsets:
+                    self.set_frame_offsets(
+                        frame_offsets=converter.frame_offsets
+                    )
         except PageCountError:
             # If converter backend doesn't understand the format,
             # use 1 as the total page count
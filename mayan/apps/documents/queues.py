@@ -7,7 +7,7 @@ from mayan.apps.task_manager.classes import CeleryQueue
 from mayan.apps.task_manager.workers import worker_fast, worker_medium
 
 from .literals import (
-    CHECK_DELETE_PERIOD_INTERVAL, CHECK_TRASH_PERIOD_INTERVAL,
+    CACHE_WARMER_INTERVAL, CHECK_DELETE_PERIOD_INTERVAL, CHECK_TRASH_PERIOD_INTERVAL,
     DELETE_STALE_STUBS_INTERVAL
 )
 
@@ -25,10 +25,30 @@ queue_documents = CeleryQueue(
     name='documents', label=_('Documents'), worker=worker_medium
 )
 
+queue_converter.add_task_type(
+    dotted_path='mayan.apps.documents.tasks.task_fix_document_version_orientation',
+    label=_('Fix document version page orientation')
+)
 queue_converter.add_task_type(
     dotted_path='mayan.apps.documents.tasks.task_generate_document_page_image',
     label=_('Generate document page image')
 )
+queue_converter.add_task_type(
+    dotted_path='mayan.apps.documents.tasks.task_generate_document_page_tiles',
+    label=_('Generate document page image tiles')
+)
+queue_converter.add_task_type(
+    dotted_path='mayan.apps.documents.tasks.task_generate_document_version_base_images',
+    label=_('Generate document version page base images')
+)
+queue_converter.add_task_type(
+    dotted_path='mayan.apps.documents.tasks.task_generate_document_version_renditions',
+    label=_('Generate document version page renditions')
+)
+queue_converter.add_task_type(
+    dotted_path='mayan.apps.documents.tasks.task_warm_document_version_cache',
+    label=_('Render the document version page images not in the cache')
+)
 
 queue_documents.add_task_type(
     dotted_path='mayan.apps.documents.tasks.task_delete_document',
@@ -59,6 +79,12 @@ queue_documents_periodic.add_task_type(
     name='task_delete_stubs',
     schedule=timedelta(seconds=DELETE_STALE_STUBS_INTERVAL),
 )
+queue_documents_periodic.add_task_type(
+    dotted_path='mayan.apps.documents.tasks.task_warm_cache',
+    label=_('Warm the document image cache'),
+    name='task_warm_cache',
+    schedule=timedelta(seconds=CACHE_WARMER_INTERVAL),
+)
 
 queue_tools.add_task_type(
     dotted_path='mayan.apps.documents.tasks.task_scan_duplicates_all',
@@ -65,8 +65,8 @@ class DocumentTypeSerializer(serializers.HyperlinkedModelSerializer):
         }
         fields = (
             'delete_time_period', 'delete_time_unit', 'documents_url',
-            'documents_count', 'id', 'label', 'filenames', 'trash_time_period',
-            'trash_time_unit', 'url'
+            'documents_count', 'id', 'label', 'filenames',
+            'rendition_widths', 'trash_time_period', 'trash_time_unit', 'url'
         )
         model = DocumentType
 
@@ -86,8 +86,8 @@ class WritableDocumentTypeSerializer(serializers.ModelSerializer):
         }
         fields = (
             'delete_time_period', 'delete_time_unit', 'documents_url',
-            'documents_count', 'id', 'label', 'trash_time_period',
-            'trash_time_unit', 'url'
+            'documents_count', 'id', 'label', 'rendition_widths',
+            'trash_time_period', 'trash_time_unit', 'url'
         )
         model = DocumentType
 
@@ -6,9 +6,12 @@ from django.utils.translation import ugettext_lazy as _
 from mayan.apps.smart_settings.classes import Namespace
 
 from .literals import (
-    DEFAULT_DOCUMENTS_CACHE_MAXIMUM_SIZE, DEFAULT_DOCUMENTS_HASH_BLOCK_SIZE,
-    DEFAULT_LANGUAGE, DEFAULT_LANGUAGE_CODES,
-    DEFAULT_STUB_EXPIRATION_INTERVAL
+    DEFAULT_DOCUMENTS_BASE_IMAGE_BATCH_SIZE,
+    DEFAULT_DOCUMENTS_CACHE_MAXIMUM_SIZE, DEFAULT_DOCUMENTS_CACHE_WARMER_DAYS,
+    DEFAULT_DOCUMENTS_CACHE_WARMER_RATE, DEFAULT_DOCUMENTS_HASH_BLOCK_SIZE,
+    DEFAULT_LANGUAGE, DEFAULT_LANGUAGE_CODES, DEFAULT_PAGE_IMAGE_FORMATS,
+    DEFAULT_PAGE_IMAGE_QUALITY_PROFILES, DEFAULT_RENDITION_WIDTHS,
+    DEFAULT_STUB_EXPIRATION_INTERVAL, DEFAULT_TILE_SIZE
 )
 from .setting_callbacks import callback_update_cache_size
 from .setting_migrations import DocumentsSettingMigration
@@ -18,6 +21,14 @@ namespace = Namespace(
     name='documents', version='0002'
 )
 
+setting_base_image_batch_size = namespace.add_setting(
+    global_name='DOCUMENTS_BASE_IMAGE_BATCH_SIZE',
+    default=DEFAULT_DOCUMENTS_BASE_IMAGE_BATCH_SIZE, help_text=_(
+        'Number of pages, starting with the requested page, for which the '
+        'base image is rasterized in a single pass when a page image is not '
+        'in the cache. A value of 1 rasterizes only the requested page.'
+    )
+)
 setting_document_cache_maximum_size = namespace.add_setting(
     global_name='DOCUMENTS_CACHE_MAXIMUM_SIZE',
     default=DEFAULT_DOCUMENTS_CACHE_MAXIMUM_SIZE,
@@ -27,6 +38,22 @@ setting_document_cache_maximum_size = namespace.add_setting(
         'bytes.'
     ), post_edit_function=callback_update_cache_size
 )
+setting_cache_warmer_days = namespace.add_setting(
+    global_name='DOCUMENTS_CACHE_WARMER_DAYS',
+    default=DEFAULT_DOCUMENTS_CACHE_WARMER_DAYS, help_text=_(
+        'Number of days of uploaded documents for which the periodic cache '
+        'warmer renders the page images not in the cache. Disabled when '
+        'empty.'
+    )
+)
+setting_cache_warmer_rate = namespace.add_setting(
+    global_name='DOCUMENTS_CACHE_WARMER_RATE',
+    default=DEFAULT_DOCUMENTS_CACHE_WARMER_RATE, help_text=_(
+        'Maximum number of documents per minute for which each worker '
+        'renders the page images queued by the cache warmer. Unlimited '
+        'when empty.'
+    )
+)
 setting_documentimagecache_storage = namespace.add_setting(
     global_name='DOCUMENTS_CACHE_STORAGE_BACKEND',
     default='django.core.files.storage.FileSystemStorage', help_text=_(
@@ -100,6 +127,26 @@ settings_document_page_image_cache_time = namespace.add_setting(
         'images. The default of 31559626 seconds corresponde to 1 year.'
     )
 )
+setting_page_image_formats = namespace.add_setting(
+    global_name='DOCUMENTS_PAGE_IMAGE_FORMATS',
+    default=DEFAULT_PAGE_IMAGE_FORMATS, help_text=_(
+        'Image formats, in order of preference, that the page image API can '
+        'return when requested by the client in the HTTP Accept header. '
+        'Formats not supported by the installed image library are ignored. '
+        'Clients not requesting any of these formats receive the format '
+        'defined by the "pillow_format" graphics backend argument.'
+    )
+)
+setting_page_image_quality_profiles = namespace.add_setting(
+    global_name='DOCUMENTS_PAGE_IMAGE_QUALITY_PROFILES',
+    default=DEFAULT_PAGE_IMAGE_QUALITY_PROFILES, help_text=_(
+        'List of page image encoding quality profiles. Each profile applies '
+        'to the images up to the width in pixels of its "maximum_width" key '
+        'and defines the encoding quality of each image format in its '
+        '"quality" key. A profile without a maximum width applies to all '
+        'the larger images. Lossless formats ignore the quality.'
+    )
+)
 setting_preview_height = namespace.add_setting(
     global_name='DOCUMENTS_PREVIEW_HEIGHT', default=''
 )
@@ -125,6 +172,17 @@ setting_recent_added_count = namespace.add_setting(
         'Maximum number of recently created documents to show.'
     )
 )
+setting_rendition_widths = namespace.add_setting(
+    global_name='DOCUMENTS_RENDITION_WIDTHS',
+    default=DEFAULT_RENDITION_WIDTHS, help_text=_(
+        'List of page image widths in pixels to render in the background '
+        'after a new document version is uploaded, for example: '
+        '[150, 480, 1200]. Page image requests for a smaller width with no '
+        'other interactive transformation are served from the closest '
+        'rendition. Can be overridden per document type. An empty list '
+        'disables the renditions.'
+    )
+)
 setting_rotation_step = namespace.add_setting(
     global_name='DOCUMENTS_ROTATION_STEP', default=90,
     help_text=_(
@@ -167,6 +225,13 @@ setting_list_thumbnail_width = namespace.add_setting(
         'view mode.'
     )
 )
+setting_tile_size = namespace.add_setting(
+    global_name='DOCUMENTS_TILE_SIZE', default=DEFAULT_TILE_SIZE,
+    help_text=_(
+        'Width and height in pixels of the tiles of the document page '
+        'image pyramid used for deep zoom viewing.'
+    )
+)
 setting_zoom_max_level = namespace.add_setting(
     global_name='DOCUMENTS_ZOOM_MAX_LEVEL', default=300,
     help_text=_(
@@ -9,6 +9,8 @@ from mayan.celery import app
 from .literals import (
     UPDATE_PAGE_COUNT_RETRY_DELAY, UPLOAD_NEW_VERSION_RETRY_DELAY
 )
+from .settings import setting_cache_warmer_days, setting_cache_warmer_rate
+from .utils import DocumentCacheWarmer
 
 logger = logging.getLogger(name=__name__)
 
@@ -62,6 +64,53 @@ def task_delete_stubs():
     logger.info(msg='Finshed')
 
 
+@app.task(ignore_result=True)
+def task_fix_document_version_orientation(document_version_id):
+    DocumentVersion = apps.get_model(
+        app_label='documents', model_name='DocumentVersion'
+    )
+
+    document_version = DocumentVersion.objects.get(pk=document_version_id)
+    document_version.fix_orientation()
+
+    # Renditions are generated after the rotation transformations are
+    # added, otherwise they would be cached for the wrong orientation.
+    if document_version.document.document_type.get_rendition_widths():
+        task_generate_document_version_renditions.apply_async(
+            kwargs={'document_version_id': document_version_id}
+        )
+
+
+@app.task(ignore_result=True)
+def task_generate_document_version_base_images(
+    document_version_id, page_number_first=None, page_number_last=None
+):
+    DocumentVersion = apps.get_model(
+        app_label='documents', model_name='DocumentVersion'
+    )
+
+    document_version = DocumentVersion.objects.get(pk=document_version_id)
+    try:
+        document_version.generate_base_images(
+            page_number_first=page_number_first,
+            page_number_last=page_number_last
+        )
+    except Exception:
+        # Already logged, the page images are rasterized again when
+        # requested.
+        pass
+
+
+@app.task(ignore_result=True)
+def task_generate_document_version_renditions(document_version_id):
+    DocumentVersion = apps.get_model(
+        app_label='documents', model_name='DocumentVersion'
+    )
+
+    document_version = DocumentVersion.objects.get(pk=document_version_id)
+    document_version.generate_renditions()
+
+
 @app.task()
 def task_generate_document_page_image(document_page_id, user_id=None, **kwargs):
     DocumentPage = apps.get_model(
@@ -78,6 +127,26 @@ def task_generate_document_page_image(document_page_id, user_id=None, **kwargs):
     return document_page.generate_image(user=user, **kwargs)
 
 
+@app.task()
+def task_generate_document_page_tiles(
+    document_page_id, level=None, user_id=None, maximum_layer_order=None
+):
+    DocumentPage = apps.get_model(
+        app_label='documents', model_name='DocumentPage'
+    )
+    User = get_user_model()
+
+    if user_id:
+        user = User.objects.get(pk=user_id)
+    else:
+        user = None
+
+    document_page = DocumentPage.passthrough.get(pk=document_page_id)
+    return document_page.generate_tiles(
+        level=level, maximum_layer_order=maximum_layer_order, user=user
+    )
+
+
 @app.task(ignore_result=True)
 def task_scan_duplicates_all():
     DuplicatedDocument = apps.get_model(
@@ -190,3 +259,28 @@ def task_upload_new_version(self, document_id, shared_uploaded_file_id, user_id,
                     'Operational error during attempt to delete shared '
                     'file: %s; %s.', shared_file, exception
                 )
+
+
+@app.task(ignore_result=True)
+def task_warm_cache():
+    if setting_cache_warmer_days.value:
+        cache_warmer = DocumentCacheWarmer(
+            days=setting_cache_warmer_days.value
+        )
+        count = cache_warmer.execute()
+        logger.info('Cache warmer queued %d documents', count)
+
+
+@app.task(
+    ignore_result=True, rate_limit='{}/m'.format(
+        setting_cache_warmer_rate.value
+    ) if setting_cache_warmer_rate.value else None
+)
+def task_warm_document_version_cache(document_version_id, widths=None):
+    DocumentVersion = apps.get_model(
+        app_label='documents', model_name='DocumentVersion'
+    )
+
+    document_version = DocumentVersion.objects.get(pk=document_version_id)
+    document_version.generate_base_images()
+    document_version.generate_renditions(widths=widths)
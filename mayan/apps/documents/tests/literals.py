@@ -29,11 +29,13 @@ TEST_OFFICE_DOCUMENT = 'simple_2_page_document.doc'
 TEST_PDF_DOCUMENT_FILENAME = 'mayan_11_1.pdf'
 TEST_PDF_INDIRECT_ROTATE_LABEL = 'indirect_rotate.pdf'
 TEST_PDF_ROTATE_ALTERNATE_LABEL = 'rotate_alternate.pdf'
+TEST_RENDITION_WIDTHS = '150,480'
 TEST_SMALL_DOCUMENT_FILENAME = 'title_page.png'
 TEST_SMALL_DOCUMENT_CHECKSUM = 'efa10e6cc21f83078aaa94d5cbe51de67b51af706143b\
 afc7fd6d4c02124879a'
 TEST_SMALL_DOCUMENT_MIMETYPE = 'image/png'
 TEST_SMALL_DOCUMENT_SIZE = 17436
+TEST_TASK_ID = '7fd8a3b6-0c1e-4f2b-9a65-2d3c4e5f6a7b'
 TEST_TRANSFORMATION_CLASS = TransformationRotate
 TEST_TRANSFORMATION_NAME = 'rotate'
 TEST_TRANSFORMATION_ARGUMENT = 'degrees: 180'
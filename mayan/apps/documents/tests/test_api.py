@@ -1,9 +1,15 @@
 import time
 
+import mock
+
 from django.utils.encoding import force_text
 
 from rest_framework import status
 
+from mayan.apps.converter.utils import (
+    get_default_image_format, get_image_mimetype
+)
+from mayan.apps.file_caching.classes import cache_statistics_buffer
 from mayan.apps.rest_api.tests.base import BaseAPITestCase
 
 from ..models import Document, DocumentType
@@ -21,8 +27,12 @@ from .literals import (
     TEST_DOCUMENT_DESCRIPTION_EDITED, TEST_PDF_DOCUMENT_FILENAME,
     TEST_DOCUMENT_PATH, TEST_DOCUMENT_TYPE_LABEL, TEST_DOCUMENT_TYPE_2_LABEL,
     TEST_DOCUMENT_TYPE_LABEL_EDITED, TEST_DOCUMENT_VERSION_COMMENT_EDITED,
-    TEST_SMALL_DOCUMENT_FILENAME
+    TEST_RENDITION_WIDTHS, TEST_SMALL_DOCUMENT_FILENAME, TEST_TASK_ID
+)
+from ..tasks import (
+    task_generate_document_page_image, task_generate_document_page_tiles
 )
+
 from .mixins import DocumentTestMixin, DocumentVersionTestMixin
 
 
@@ -419,6 +429,86 @@ class DocumentVersionAPIViewTestCase(
                 mime_type=self.test_document.file_mimetype
             )
 
+    def test_document_version_api_download_view_range(self):
+        self._upload_test_document()
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_download
+        )
+
+        response = self.get(
+            viewname='rest_api:documentversion-download', kwargs={
+                'pk': self.test_document.pk,
+                'version_pk': self.test_document.latest_version.pk,
+            }, headers={'HTTP_RANGE': 'bytes=10-19'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+        with self.test_document.latest_version.open() as file_object:
+            content = file_object.read()
+
+        self.assertEqual(b''.join(response.streaming_content), content[10:20])
+        self.assertEqual(
+            response['Content-Range'], 'bytes 10-19/{}'.format(len(content))
+        )
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_document_version_api_download_view_range_if_range_mismatch(self):
+        self._upload_test_document()
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_download
+        )
+
+        response = self.get(
+            viewname='rest_api:documentversion-download', kwargs={
+                'pk': self.test_document.pk,
+                'version_pk': self.test_document.latest_version.pk,
+            }, headers={'HTTP_IF_RANGE': '"stale"', 'HTTP_RANGE': 'bytes=0-9'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_document_version_api_download_view_range_multiple(self):
+        self._upload_test_document()
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_download
+        )
+
+        response = self.get(
+            viewname='rest_api:documentversion-download', kwargs={
+                'pk': self.test_document.pk,
+                'version_pk': self.test_document.latest_version.pk,
+            }, headers={'HTTP_RANGE': 'bytes=0-4,-5'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertTrue(
+            response['Content-Type'].startswith('multipart/byteranges')
+        )
+
+        with self.test_document.latest_version.open() as file_object:
+            content = file_object.read()
+
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body), int(response['Content-Length']))
+        self.assertTrue(content[:5] in body)
+        self.assertTrue(content[-5:] in body)
+
+    def test_document_version_api_download_view_range_not_satisfiable(self):
+        self._upload_test_document()
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_download
+        )
+
+        response = self.get(
+            viewname='rest_api:documentversion-download', kwargs={
+                'pk': self.test_document.pk,
+                'version_pk': self.test_document.latest_version.pk,
+            }, headers={'HTTP_RANGE': 'bytes=100000000-'}
+        )
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
     def test_document_version_api_download_preserve_extension_view(self):
         self._upload_test_document()
         self.grant_access(
@@ -557,10 +647,47 @@ class DocumentVersionAPIViewTestCase(
 
 
 class DocumentPageAPIViewTestMixin(object):
-    def _request_document_page_image(self):
+    def _request_document_page_image(self, headers=None):
         page = self.test_document.pages.first()
         return self.get(
-            viewname='rest_api:documentpage-image', kwargs={
+            headers=headers, viewname='rest_api:documentpage-image', kwargs={
+                'pk': page.document.pk, 'version_pk': page.document_version.pk,
+                'page_pk': page.pk
+            }
+        )
+
+    def _request_document_page_image_task(self):
+        page = self.test_document.pages.first()
+        return self.get(
+            viewname='rest_api:documentpage-image-task', kwargs={
+                'pk': page.document.pk, 'version_pk': page.document_version.pk,
+                'page_pk': page.pk, 'task_id': TEST_TASK_ID
+            }
+        )
+
+    def _request_document_page_rendition(self, width, headers=None):
+        page = self.test_document.pages.first()
+        return self.get(
+            headers=headers, viewname='rest_api:documentpage-rendition',
+            kwargs={
+                'pk': page.document.pk, 'version_pk': page.document_version.pk,
+                'page_pk': page.pk, 'width': width
+            }
+        )
+
+    def _request_document_page_tile(self, level=0):
+        page = self.test_document.pages.first()
+        return self.get(
+            viewname='rest_api:documentpage-tile', kwargs={
+                'pk': page.document.pk, 'version_pk': page.document_version.pk,
+                'page_pk': page.pk, 'level': level, 'column': 0, 'row': 0
+            }
+        )
+
+    def _request_document_page_tile_descriptor(self):
+        page = self.test_document.pages.first()
+        return self.get(
+            viewname='rest_api:documentpage-tile-descriptor', kwargs={
                 'pk': page.document.pk, 'version_pk': page.document_version.pk,
                 'page_pk': page.pk
             }
@@ -582,6 +709,197 @@ class DocumentPageAPIViewTestCase(
         response = self._request_document_page_image()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_document_page_api_image_view_format_negotiation(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_image(
+            headers={'HTTP_ACCEPT': 'image/png,image/*;q=0.8'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue('Accept' in response['Vary'])
+
+        response = self._request_document_page_image(
+            headers={'HTTP_ACCEPT': 'image/*'}
+        )
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+    def test_document_page_api_image_view_cache_hit(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_image()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with mock.patch.object(
+            task_generate_document_page_image, 'apply_async'
+        ) as mock_apply_async:
+            response = self._request_document_page_image()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        mock_apply_async.assert_not_called()
+
+    def test_document_page_api_image_view_cache_statistics(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        cache = self.test_document.pages.first().cache_partition.cache
+        cache_statistics_buffer.flush()
+        cache.refresh_from_db()
+        hits = cache.hits
+        misses = cache.misses
+
+        self._request_document_page_image()
+        self._request_document_page_image()
+
+        cache_statistics_buffer.flush()
+        cache.refresh_from_db()
+        self.assertEqual(cache.hits - hits, 1)
+        self.assertEqual(cache.misses - misses, 1)
+
+    def test_document_page_api_image_view_not_modified(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_image()
+        self.assertTrue(response.has_header('ETag'))
+
+        response = self._request_document_page_image(
+            headers={'HTTP_IF_NONE_MATCH': response['ETag']}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_document_page_api_image_view_respond_async(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        mock_task = mock.Mock(id=TEST_TASK_ID, status='PENDING')
+        mock_task.ready.return_value = False
+
+        with mock.patch.object(
+            task_generate_document_page_image, 'apply_async',
+            return_value=mock_task
+        ):
+            response = self._request_document_page_image(
+                headers={'HTTP_PREFER': 'respond-async'}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.has_header('Retry-After'))
+        self.assertTrue(
+            '/image/tasks/{}/'.format(TEST_TASK_ID) in response['Location']
+        )
+
+    def test_document_page_api_image_task_view(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        mock_task = mock.Mock(id=TEST_TASK_ID, status='SUCCESS')
+        mock_task.ready.return_value = True
+
+        with mock.patch.object(
+            task_generate_document_page_image, 'AsyncResult',
+            return_value=mock_task
+        ):
+            response = self._request_document_page_image_task()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'SUCCESS')
+
+    def test_document_page_api_rendition_view_no_access(self):
+        response = self._request_document_page_rendition(width=150)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_document_page_api_rendition_view_with_access(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_rendition(width=150)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_document_page_api_rendition_view_format_negotiation(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_rendition(
+            headers={'HTTP_ACCEPT': 'image/png'}, width=150
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue('Accept' in response['Vary'])
+
+    def test_document_page_api_image_url_rendition(self):
+        self.test_document_type.rendition_widths = TEST_RENDITION_WIDTHS
+        self.test_document_type.save()
+
+        page = self.test_document.pages.first()
+
+        self.assertTrue(
+            '/renditions/480/' in page.get_api_image_url(width=200)
+        )
+        self.assertTrue(
+            '/renditions/' not in page.get_api_image_url(
+                rotation=90, width=200
+            )
+        )
+
+    def test_document_page_api_tile_view_no_access(self):
+        response = self._request_document_page_tile()
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_document_page_api_tile_view_with_access(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_tile_descriptor()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self._request_document_page_tile(
+            level=response.data['levels'] - 1
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response['Content-Type'], get_image_mimetype(
+                output_format=get_default_image_format()
+            )
+        )
+
+    def test_document_page_api_tile_descriptor_view_cache_hit(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_tile_descriptor()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        descriptor = response.data
+
+        with mock.patch.object(
+            task_generate_document_page_tiles, 'apply_async'
+        ) as mock_apply_async:
+            response = self._request_document_page_tile_descriptor()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, descriptor)
+
+        mock_apply_async.assert_not_called()
+
+    def test_document_page_api_tile_view_invalid_level(self):
+        self.grant_access(
+            obj=self.test_document, permission=permission_document_view
+        )
+
+        response = self._request_document_page_tile(level=100)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class TrashedDocumentAPIViewTestMixin(object):
     def _request_test_document_api_trash_view(self):
@@ -0,0 +1,14 @@
+from django.core import management
+from django.utils.six import StringIO
+
+from .base import GenericDocumentTestCase
+
+
+class CacheWarmManagementCommandTestCase(GenericDocumentTestCase):
+    def test_cache_warm_days(self):
+        output = StringIO()
+        management.call_command(
+            'cache_warm', '--days', '1', '--widths', '150', stdout=output
+        )
+
+        self.assertTrue('Queued 1 documents.' in output.getvalue())
@@ -1,22 +1,28 @@
 from datetime import timedelta
 import time
 
+import mock
+
 from django.test import override_settings
 
 from mayan.apps.common.tests.base import BaseTestCase
 from mayan.apps.converter.layers import layer_saved_transformations
+from mayan.apps.lock_manager.exceptions import LockError
 
+from ..literals import BASE_IMAGE_CACHE_FILENAME
 from ..models import (
-    DeletedDocument, Document, DocumentType, DuplicatedDocument
+    DeletedDocument, Document, DocumentPage, DocumentType,
+    DocumentVersion, DuplicatedDocument
 )
 from ..settings import setting_stub_expiration_interval
+from ..tasks import task_generate_document_version_base_images
 
 from .base import GenericDocumentTestCase
 from .literals import (
     TEST_DOCUMENT_TYPE_LABEL, TEST_MULTI_PAGE_TIFF,
     TEST_OFFICE_DOCUMENT, TEST_PDF_INDIRECT_ROTATE_LABEL,
-    TEST_PDF_ROTATE_ALTERNATE_LABEL, TEST_SMALL_DOCUMENT_CHECKSUM,
-    TEST_SMALL_DOCUMENT_FILENAME, TEST_SMALL_DOCUMENT_MIMETYPE,
+    TEST_PDF_ROTATE_ALTERNATE_LABEL, TEST_RENDITION_WIDTHS,
+    TEST_SMALL_DOCUMENT_CHECKSUM, TEST_SMALL_DOCUMENT_FILENAME, TEST_SMALL_DOCUMENT_MIMETYPE,
     TEST_SMALL_DOCUMENT_PATH, TEST_SMALL_DOCUMENT_SIZE
 )
 
@@ -138,6 +144,16 @@ class DocumentTestCase(GenericDocumentTestCase):
 class PDFAlternateRotationTestCase(GenericDocumentTestCase):
     test_document_filename = TEST_PDF_ROTATE_ALTERNATE_LABEL
 
+    def test_fix_orientation(self):
+        self.test_document.latest_version.fix_orientation()
+
+        for page in self.test_document.latest_version.pages.all():
+            self.assertTrue(
+                layer_saved_transformations.get_transformations_for(
+                    obj=page
+                ).exists()
+            )
+
     def test_rotate(self):
         self.assertQuerysetEqual(
             qs=Document.objects.all(), values=(repr(self.test_document),)
@@ -188,6 +204,128 @@ class MultiPageTiffTestCase(GenericDocumentTestCase):
         )
         self.assertEqual(self.test_document.page_count, 2)
 
+    def test_version_content_cache_delete(self):
+        test_document = self.test_document
+        test_document.latest_version.generate_base_images()
+        self._upload_test_document()
+
+        test_document.delete(to_trash=False)
+
+        # Still referenced by the version of the other document.
+        self.assertTrue(
+            self.test_document.latest_version.pages.first().content_cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME
+            )
+        )
+
+        document_version = self.test_document.latest_version
+        content_cache_partition_name = document_version.get_content_cache_partition_name()
+        self.test_document.delete(to_trash=False)
+
+        self.assertFalse(
+            document_version.cache.partitions.filter(
+                name__startswith=content_cache_partition_name
+            ).exists()
+        )
+
+    def test_version_content_cache_sharing(self):
+        self.test_document.latest_version.generate_base_images()
+
+        self._upload_test_document()
+
+        # The base images of the identical file are reused.
+        self.assertEqual(
+            self.test_document.latest_version.generate_base_images(), 0
+        )
+
+    def test_version_frame_offsets(self):
+        self.assertEqual(
+            len(self.test_document.latest_version.get_frame_offsets()), 2
+        )
+
+    def test_version_generate_base_images(self):
+        document_version = self.test_document.latest_version
+
+        # Generated when the version was uploaded.
+        for document_page in document_version.pages.all():
+            cache_file = document_page.content_cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME
+            )
+            self.assertTrue(cache_file)
+            cache_file.delete()
+
+        self.assertEqual(document_version.generate_base_images(), 2)
+
+        for document_page in document_version.pages.all():
+            self.assertTrue(
+                document_page.content_cache_partition.get_file(
+                    filename=BASE_IMAGE_CACHE_FILENAME
+                )
+            )
+
+        # Cached base images are not rasterized again.
+        self.assertEqual(document_version.generate_base_images(), 0)
+
+    def test_version_generate_renditions(self):
+        self.test_document_type.rendition_widths = TEST_RENDITION_WIDTHS
+        self.test_document_type.save()
+
+        document_version = self.test_document.latest_version
+
+        self.assertEqual(document_version.generate_renditions(), 4)
+
+        # Existing renditions are not rendered again.
+        self.assertEqual(document_version.generate_renditions(), 0)
+
+
+class DocumentPageTestCase(GenericDocumentTestCase):
+    def test_generate_image_coalescing(self):
+        document_page = self.test_document.pages.first()
+        cache_filename = document_page.generate_image()
+        document_page.cache_partition.get_file(filename=cache_filename).delete()
+
+        def create_cache_file(interval):
+            # Simulate the process holding the lock finishing the image.
+            with document_page.cache_partition.create_file(filename=cache_filename) as file_object:
+                file_object.write(b'image')
+
+        # Only the page lock is held by another process, the cache file
+        # creation uses the real locking backend.
+        mock_locking_backend = mock.Mock()
+        mock_locking_backend.acquire_lock.side_effect = LockError
+
+        with mock.patch(
+            'mayan.apps.documents.models.document_page_models.locking_backend',
+            mock_locking_backend
+        ), mock.patch(
+            'mayan.apps.documents.models.document_page_models.time.sleep',
+            side_effect=create_cache_file
+        ), mock.patch.object(DocumentPage, 'get_image') as mock_get_image:
+            self.assertEqual(document_page.generate_image(), cache_filename)
+
+        mock_get_image.assert_not_called()
+
+    def test_get_image_base_image_fallback(self):
+        document_page = self.test_document.pages.first()
+        document_page.content_cache_partition.get_file(
+            filename=BASE_IMAGE_CACHE_FILENAME
+        ).delete()
+
+        # Base image not generated in batch, rasterized by the page itself.
+        with mock.patch.object(DocumentVersion, 'generate_base_images'):
+            document_page.get_image(transformations=[])
+
+        self.assertTrue(
+            document_page.content_cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME
+            )
+        )
+        self.assertFalse(
+            document_page.cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME
+            )
+        )
+
 
 class DocumentVersionTestCase(GenericDocumentTestCase):
     def test_add_new_version(self):
@@ -205,6 +343,44 @@ class DocumentVersionTestCase(GenericDocumentTestCase):
             TEST_SMALL_DOCUMENT_CHECKSUM
         )
 
+    def test_new_version_base_images_task(self):
+        with mock.patch.object(
+            task_generate_document_version_base_images, 'apply_async'
+        ) as mock_apply_async:
+            with open(TEST_SMALL_DOCUMENT_PATH, mode='rb') as file_object:
+                self.test_document.new_version(file_object=file_object)
+
+        mock_apply_async.assert_called_once_with(
+            kwargs={
+                'document_version_id': self.test_document.latest_version.pk
+            }
+        )
+
+    def test_new_version_base_images_error(self):
+        with mock.patch.object(
+            DocumentVersion, 'generate_base_images', side_effect=Exception
+        ) as mock_generate_base_images:
+            with open(TEST_SMALL_DOCUMENT_PATH, mode='rb') as file_object:
+                self.test_document.new_version(file_object=file_object)
+
+        mock_generate_base_images.assert_called_once_with(
+            page_number_first=None, page_number_last=None
+        )
+        self.assertEqual(self.test_document.versions.count(), 2)
+
+    def test_new_version_base_images_task_with_renditions(self):
+        self.test_document_type.rendition_widths = TEST_RENDITION_WIDTHS
+        self.test_document_type.save()
+
+        with mock.patch.object(
+            task_generate_document_version_base_images, 'apply_async'
+        ) as mock_apply_async:
+            with open(TEST_SMALL_DOCUMENT_PATH, mode='rb') as file_object:
+                self.test_document.new_version(file_object=file_object)
+
+        # The renditions task generates the base images.
+        mock_apply_async.assert_not_called()
+
     def test_revert_version(self):
         self.assertEqual(self.test_document.versions.count(), 1)
 
@@ -296,3 +472,11 @@ class DuplicatedDocumentsTestCase(GenericDocumentTestCase):
                 document=self.test_documents[0]
             ).documents.all()
         )
+
+    def test_duplicate_page_count_reuse(self):
+        self._upload_test_document()
+
+        self.assertEqual(
+            self.test_documents[1].latest_version.get_duplicate_page_count(),
+            self.test_documents[0].pages.count()
+        )
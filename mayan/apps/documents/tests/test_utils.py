@@ -1,6 +1,67 @@
+from datetime import timedelta
+
+import mock
+
+from django.utils import timezone
+
 from mayan.apps.common.tests.base import BaseTestCase
 
-from ..utils import parse_range
+from ..literals import BASE_IMAGE_CACHE_FILENAME
+from ..models import Document
+from ..tasks import task_warm_document_version_cache
+from ..utils import DocumentCacheWarmer, parse_range
+
+from .base import GenericDocumentTestCase
+from .literals import TEST_RENDITION_WIDTHS
+
+
+class DocumentCacheWarmerTestCase(GenericDocumentTestCase):
+    def test_cache_warmer_days(self):
+        document_page = self.test_document.pages.first()
+        document_page.content_cache_partition.purge()
+
+        cache_warmer = DocumentCacheWarmer(days=1)
+
+        self.assertEqual(cache_warmer.execute(), 1)
+        self.assertTrue(
+            document_page.content_cache_partition.get_file(
+                filename=BASE_IMAGE_CACHE_FILENAME
+            )
+        )
+
+    def test_cache_warmer_days_cached_document(self):
+        # The base images are generated when the document is uploaded.
+        cache_warmer = DocumentCacheWarmer(days=1)
+
+        self.assertEqual(cache_warmer.execute(), 0)
+
+    def test_cache_warmer_days_missing_rendition(self):
+        self.test_document_type.rendition_widths = TEST_RENDITION_WIDTHS
+        self.test_document_type.save()
+
+        cache_warmer = DocumentCacheWarmer(days=1)
+
+        with mock.patch.object(
+            task_warm_document_version_cache, 'apply_async'
+        ) as mock_apply_async:
+            self.assertEqual(cache_warmer.execute(), 1)
+
+        # Rate limited by the task instead of delayed.
+        mock_apply_async.assert_called_once_with(
+            kwargs={
+                'document_version_id': self.test_document.latest_version.pk,
+                'widths': None
+            }
+        )
+
+    def test_cache_warmer_days_old_document(self):
+        Document.objects.filter(pk=self.test_document.pk).update(
+            date_added=timezone.now() - timedelta(days=2)
+        )
+
+        cache_warmer = DocumentCacheWarmer(days=1)
+
+        self.assertEqual(cache_warmer.execute(), 0)
 
 
 class DocumentUtilsTestCase(BaseTestCase):
@@ -4,8 +4,11 @@ from .api_views import (
     APITrashedDocumentListView, APIDeletedDocumentRestoreView,
     APIDeletedDocumentView, APIDocumentDocumentTypeChangeView,
     APIDocumentDownloadView, APIDocumentView, APIDocumentListView,
-    APIDocumentVersionDownloadView, APIDocumentPageImageView,
-    APIDocumentPageView, APIDocumentTypeDocumentListView,
+    APIDocumentVersionDownloadView, APIDocumentPageImageTaskView,
+    APIDocumentPageImageView,
+    APIDocumentPageRenditionView, APIDocumentPageTileDescriptorView,
+    APIDocumentPageTileView, APIDocumentPageView,
+    APIDocumentTypeDocumentListView,
     APIDocumentTypeListView, APIDocumentTypeView,
     APIDocumentVersionsListView, APIDocumentVersionPageListView,
     APIDocumentVersionView, APIRecentDocumentListView
@@ -440,6 +443,25 @@ api_urls = [
         regex=r'^documents/(?P<pk>[0-9]+)/versions/(?P<version_pk>[0-9]+)/pages/(?P<page_pk>[0-9]+)/image/$',
         view=APIDocumentPageImageView.as_view(), name='documentpage-image'
     ),
+    url(
+        regex=r'^documents/(?P<pk>[0-9]+)/versions/(?P<version_pk>[0-9]+)/pages/(?P<page_pk>[0-9]+)/image/tasks/(?P<task_id>[0-9a-f-]+)/$',
+        view=APIDocumentPageImageTaskView.as_view(),
+        name='documentpage-image-task'
+    ),
+    url(
+        regex=r'^documents/(?P<pk>[0-9]+)/versions/(?P<version_pk>[0-9]+)/pages/(?P<page_pk>[0-9]+)/renditions/(?P<width>[0-9]+)/$',
+        view=APIDocumentPageRenditionView.as_view(),
+        name='documentpage-rendition'
+    ),
+    url(
+        regex=r'^documents/(?P<pk>[0-9]+)/versions/(?P<version_pk>[0-9]+)/pages/(?P<page_pk>[0-9]+)/tiles/$',
+        view=APIDocumentPageTileDescriptorView.as_view(),
+        name='documentpage-tile-descriptor'
+    ),
+    url(
+        regex=r'^documents/(?P<pk>[0-9]+)/versions/(?P<version_pk>[0-9]+)/pages/(?P<page_pk>[0-9]+)/tiles/(?P<level>[0-9]+)/(?P<column>[0-9]+)_(?P<row>[0-9]+)/$',
+        view=APIDocumentPageTileView.as_view(), name='documentpage-tile'
+    ),
     url(
         regex=r'^trashed_documents/$',
         view=APITrashedDocumentListView.as_view(), name='trasheddocument-list'
@@ -1,7 +1,10 @@
+from datetime import timedelta
 import logging
 
 import pycountry
 
+from django.apps import apps
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from .settings import setting_language_codes
@@ -9,6 +12,101 @@ from .settings import setting_language_codes
 logger = logging.getLogger(name=__name__)
 
 
+class DocumentCacheWarmer(object):
+    """
+    Queue the rendering of the page images not in the cache for the latest
+    version of a set of documents. The documents are selected by the
+    filters provided, all of which must match. Versions with all their
+    page images cached are not queued, the rendering task is rate limited
+    by the cache warmer rate setting.
+    """
+    def __init__(
+        self, cabinet_id=None, days=None, index_instance_node_id=None,
+        recent=None, widths=None
+    ):
+        self.cabinet_id = cabinet_id
+        self.days = days
+        self.index_instance_node_id = index_instance_node_id
+        self.recent = recent
+        self.widths = widths
+
+    def execute(self, callback=None):
+        """
+        Queue the documents and return their number. The callback is
+        called after each document with the number of documents queued,
+        the number of documents checked and the total.
+        """
+        from .tasks import task_warm_document_version_cache
+
+        queryset = self.get_queryset()
+        total = queryset.count()
+        count = 0
+
+        for index, document in enumerate(queryset.iterator(), 1):
+            document_version = document.latest_version
+            if document_version and not document_version.is_cache_complete(widths=self.widths):
+                task_warm_document_version_cache.apply_async(
+                    kwargs={
+                        'document_version_id': document_version.pk,
+                        'widths': self.widths
+                    }
+                )
+                count += 1
+
+            if callback:
+                callback(count=count, index=index, total=total)
+
+        return count
+
+    def get_queryset(self):
+        Document = apps.get_model(app_label='documents', model_name='Document')
+
+        queryset = Document.objects.all()
+
+        if self.cabinet_id:
+            Cabinet = apps.get_model(app_label='cabinets', model_name='Cabinet')
+            cabinet = Cabinet.objects.get(pk=self.cabinet_id)
+            queryset = queryset.filter(
+                cabinets__in=cabinet.get_descendants(include_self=True)
+            )
+
+        if self.days:
+            queryset = queryset.filter(
+                date_added__gte=timezone.now() - timedelta(days=self.days)
+            )
+
+        if self.index_instance_node_id:
+            IndexInstanceNode = apps.get_model(
+                app_label='document_indexing', model_name='IndexInstanceNode'
+            )
+            index_instance_node = IndexInstanceNode.objects.get(
+                pk=self.index_instance_node_id
+            )
+            queryset = queryset.filter(
+                index_instance_nodes__in=index_instance_node.get_descendants(
+                    include_self=True
+                )
+            )
+
+        if self.recent:
+            RecentDocument = apps.get_model(
+                app_label='documents', model_name='RecentDocument'
+            )
+            document_ids = []
+            for document_id in RecentDocument.objects.order_by(
+                '-datetime_accessed'
+            ).values_list('document_id', flat=True).iterator():
+                if document_id not in document_ids:
+                    document_ids.append(document_id)
+
+                if len(document_ids) >= self.recent:
+                    break
+
+            queryset = queryset.filter(pk__in=document_ids)
+
+        return queryset.distinct().order_by('-date_added')
+
+
 def get_language(language_code):
     language = getattr(
         pycountry.languages.get(alpha_3=language_code), 'name', None
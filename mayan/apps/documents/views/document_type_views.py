@@ -133,7 +133,7 @@ class DocumentTypeDeletionPoliciesEditView(SingleObjectEditView):
 
 
 class DocumentTypeEditView(SingleObjectEditView):
-    fields = ('label',)
+    fields = ('label', 'rendition_widths')
     model = DocumentType
     object_permission = permission_document_type_edit
     pk_url_kwarg = 'document_type_id'
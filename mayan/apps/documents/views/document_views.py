@@ -9,6 +9,7 @@ from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.encoding import force_text
+from django.utils.http import quote_etag
 from django.utils.translation import ugettext_lazy as _, ungettext
 
 from mayan.apps.acls.models import AccessControlList
@@ -239,6 +240,19 @@ class DocumentDownloadView(MultipleObjectDownloadView):
             'zip_filename', DEFAULT_ZIP_FILENAME
         )
 
+    def get_download_content_type(self):
+        item = self.get_download_item()
+        if item:
+            if isinstance(item, Document):
+                return item.file_mimetype
+            else:
+                return item.mimetype
+
+    def get_download_etag(self):
+        item = self.get_download_item()
+        if item and item.checksum:
+            return quote_etag(item.checksum)
+
     def get_download_file_object(self):
         queryset = self.get_object_list()
         zip_filename = self.get_archive_filename()
@@ -266,6 +280,23 @@ class DocumentDownloadView(MultipleObjectDownloadView):
             )
             return item.open()
 
+    def get_download_file_path(self):
+        item = self.get_download_item()
+        if item:
+            return item.get_file_path()
+
+    def get_download_offload_response(self):
+        response = super(
+            DocumentDownloadView, self
+        ).get_download_offload_response()
+
+        if response:
+            DocumentDownloadView.commit_event(
+                item=self.get_object_list().first(), request=self.request
+            )
+
+        return response
+
     def get_download_filename(self):
         queryset = self.get_object_list()
         if self.request.GET.get('compressed') == 'True' or queryset.count() > 1:
@@ -273,6 +304,16 @@ class DocumentDownloadView(MultipleObjectDownloadView):
         else:
             return self.get_item_filename(item=queryset.first())
 
+    def get_download_item(self):
+        """
+        Return the object being downloaded when the download is a single
+        file that is not compressed.
+        """
+        queryset = self.get_object_list()
+
+        if self.request.GET.get('compressed') != 'True' and queryset.count() == 1:
+            return queryset.first()
+
     def get_item_filename(self, item):
         return item.label
 
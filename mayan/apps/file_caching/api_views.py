@@ -0,0 +1,23 @@
+from mayan.apps.rest_api import generics
+
+from .models import Cache
+from .permissions import permission_cache_view
+from .serializers import CacheSerializer
+
+
+class APICacheListView(generics.ListAPIView):
+    """
+    get: Returns a list of all the caches and their usage statistics.
+    """
+    mayan_object_permissions = {'GET': (permission_cache_view,)}
+    queryset = Cache.objects.all()
+    serializer_class = CacheSerializer
+
+
+class APICacheView(generics.RetrieveAPIView):
+    """
+    get: Return the details and the usage statistics of the selected cache.
+    """
+    mayan_object_permissions = {'GET': (permission_cache_view,)}
+    queryset = Cache.objects.all()
+    serializer_class = CacheSerializer
@@ -23,6 +23,7 @@ from .permissions import permission_cache_purge, permission_cache_view
 class FileCachingConfig(MayanAppConfig):
     app_namespace = 'file_caching'
     app_url = 'file_caching'
+    has_rest_api = True
     has_tests = True
     name = 'mayan.apps.file_caching'
     verbose_name = _('File caching')
@@ -57,6 +58,31 @@ class FileCachingConfig(MayanAppConfig):
             attribute='get_total_size_display', include_label=True,
             source=Cache
         )
+        SourceColumn(
+            attribute='get_eviction_policy_display', include_label=True,
+            is_sortable=True, label=_('Eviction policy'),
+            sort_field='eviction_policy', source=Cache
+        )
+        SourceColumn(
+            attribute='get_hit_ratio_display', include_label=True,
+            source=Cache
+        )
+        SourceColumn(
+            attribute='get_bytes_read_display', include_label=True,
+            is_sortable=True, sort_field='bytes_read', source=Cache
+        )
+        SourceColumn(
+            attribute='get_bytes_written_display', include_label=True,
+            is_sortable=True, sort_field='bytes_written', source=Cache
+        )
+        SourceColumn(
+            attribute='evictions', include_label=True, is_sortable=True,
+            source=Cache
+        )
+        SourceColumn(
+            attribute='get_mean_eviction_age_display', include_label=True,
+            source=Cache
+        )
 
         menu_list_facet.bind_links(
             links=(
@@ -0,0 +1,373 @@
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.apps import apps
+from django.core.files.base import File
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.encoding import force_text
+
+from .literals import (
+    CACHE_ACCESS_BUFFER_MAXIMUM_AGE, CACHE_ACCESS_BUFFER_MAXIMUM_SIZE,
+    CACHE_LOOKUP_MEMO_MAXIMUM_AGE, CACHE_LOOKUP_MEMO_MAXIMUM_SIZE,
+    CACHE_STATISTICS_BUFFER_MAXIMUM_AGE, CACHE_STATISTICS_BUFFER_MAXIMUM_SIZE
+)
+from .settings import (
+    setting_local_cache_maximum_size, setting_local_cache_path,
+    setting_low_watermark
+)
+
+logger = logging.getLogger(name=__name__)
+
+
+class CacheFileAccessBuffer(object):
+    """
+    Keeps the access time and the hit count of the cache files read by the
+    process in memory and writes them to the database in batches. This
+    avoids turning every cache read into a database write.
+    """
+    def __init__(self, maximum_age, maximum_size):
+        self.entries = {}
+        self.flush_time = time.time()
+        self.lock = threading.Lock()
+        self.maximum_age = maximum_age
+        self.maximum_size = maximum_size
+
+        atexit.register(self.flush)
+
+    def flush(self):
+        with self.lock:
+            entries = self.entries
+            self.entries = {}
+            self.flush_time = time.time()
+
+        if not entries:
+            return
+
+        CachePartitionFile = apps.get_model(
+            app_label='file_caching', model_name='CachePartitionFile'
+        )
+
+        # Group the files by hit count to update them with one query per
+        # distinct count.
+        groups = {}
+        for pk, (accessed, hits) in entries.items():
+            group = groups.setdefault(hits, {'accessed': accessed, 'pks': []})
+            group['accessed'] = max(group['accessed'], accessed)
+            group['pks'].append(pk)
+
+        try:
+            for hits, group in groups.items():
+                CachePartitionFile.objects.filter(pk__in=group['pks']).update(
+                    accessed=group['accessed'], hits=F('hits') + hits
+                )
+        except DatabaseError as exception:
+            logger.warning(
+                'Unable to update the cache file access times; %s', exception
+            )
+
+    def record(self, cache_partition_file):
+        with self.lock:
+            hits = self.entries.get(cache_partition_file.pk, (None, 0))[1]
+            self.entries[cache_partition_file.pk] = (timezone.now(), hits + 1)
+
+            flush = len(self.entries) >= self.maximum_size or (
+                time.time() - self.flush_time >= self.maximum_age
+            )
+
+        if flush:
+            self.flush()
+
+
+class CacheLookupMemo(object):
+    """
+    Bounded in process memory of the cache and cache partition rows looked
+    up by name. Rows are only remembered after the transaction that read
+    them commits and are forgotten when the process deletes them. Entries expire after a
+    maximum age to limit how long a change made by another process goes
+    unnoticed. A new instance is returned on each lookup so callers never
+    share state.
+    """
+    def __init__(self, maximum_age, maximum_size):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.maximum_age = maximum_age
+        self.maximum_size = maximum_size
+
+    def _store(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maximum_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get(self, key):
+        """
+        Return a new instance of the row remembered for the key or None.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            if time.time() - entry['time'] >= self.maximum_age:
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+
+        return entry['model'].from_db(
+            db=entry['db'], field_names=entry['field_names'],
+            values=entry['values']
+        )
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def set(self, key, instance):
+        field_names = [
+            field.attname for field in instance._meta.concrete_fields
+        ]
+        entry = {
+            'db': instance._state.db, 'field_names': field_names,
+            'model': type(instance), 'time': time.time(),
+            'values': [getattr(instance, name) for name in field_names]
+        }
+
+        # Don't remember rows of a transaction that could still be rolled
+        # back.
+        transaction.on_commit(
+            lambda: self._store(key=key, entry=entry)
+        )
+
+
+class CacheStatisticsBuffer(object):
+    """
+    Adds up the usage counters of the caches in memory and writes them to
+    the database with one query per cache, after a number of records or
+    after a maximum age.
+    """
+    def __init__(self, maximum_age, maximum_size):
+        self.count = 0
+        self.entries = {}
+        self.flush_time = time.time()
+        self.lock = threading.Lock()
+        self.maximum_age = maximum_age
+        self.maximum_size = maximum_size
+
+        atexit.register(self.flush)
+
+    def flush(self):
+        with self.lock:
+            entries = self.entries
+            self.count = 0
+            self.entries = {}
+            self.flush_time = time.time()
+
+        if not entries:
+            return
+
+        Cache = apps.get_model(app_label='file_caching', model_name='Cache')
+
+        try:
+            for cache_id, counters in entries.items():
+                Cache.objects.filter(pk=cache_id).update(
+                    **{
+                        name: F(name) + value for name, value in counters.items()
+                    }
+                )
+        except DatabaseError as exception:
+            logger.warning(
+                'Unable to update the cache statistics; %s', exception
+            )
+
+    def record(self, cache_id, **counters):
+        with self.lock:
+            entry = self.entries.setdefault(cache_id, {})
+            for name, value in counters.items():
+                entry[name] = entry.get(name, 0) + value
+
+            self.count += 1
+            flush = self.count >= self.maximum_size or (
+                time.time() - self.flush_time >= self.maximum_age
+            )
+
+        if flush:
+            self.flush()
+
+
+class LocalCache(object):
+    """
+    Node local copy of the cache files in front of the cache storage.
+    Files are stored by partition and cache partition file id. A file
+    deleted or purged in another node is never served because a new
+    cache partition file with the same name has a different id. Stale
+    copies are removed by the size limit, oldest modified first. Reading
+    a copy updates its modification time.
+    """
+    def __init__(self, path, maximum_size):
+        self.lock = threading.Lock()
+        self.maximum_size = maximum_size
+        self.path = path
+        self.size = None
+
+    def _add_size(self, size):
+        with self.lock:
+            if self.size is not None:
+                self.size += size
+                prune = self.size > self.maximum_size
+            else:
+                prune = True
+
+        if prune:
+            self.prune()
+
+    def add(self, cache_partition_file, file_object):
+        """
+        Store a copy of the content of the file object.
+        """
+        with self.create_file(
+            cache_partition_file=cache_partition_file
+        ) as local_file_object:
+            shutil.copyfileobj(fsrc=file_object, fdst=local_file_object)
+
+    @contextmanager
+    def create_file(self, cache_partition_file):
+        """
+        Return a temporary file that is moved to its final name only if
+        the caller completes writing to it.
+        """
+        path = self.get_file_path(cache_partition_file=cache_partition_file)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        file_object = tempfile.NamedTemporaryFile(
+            delete=False, dir=directory, prefix='.'
+        )
+        try:
+            yield file_object
+            file_object.close()
+            os.replace(file_object.name, path)
+        except Exception:
+            file_object.close()
+            os.unlink(file_object.name)
+            raise
+
+        self._add_size(size=os.path.getsize(path))
+
+    def delete(self, cache_partition_file):
+        try:
+            os.unlink(
+                self.get_file_path(cache_partition_file=cache_partition_file)
+            )
+        except FileNotFoundError:
+            # Not cached in this node.
+            pass
+
+    def get_file_path(self, cache_partition_file):
+        return os.path.join(
+            self.get_partition_path(
+                cache_partition=cache_partition_file.partition
+            ), force_text(cache_partition_file.pk)
+        )
+
+    def get_partition_path(self, cache_partition):
+        return os.path.join(self.path, force_text(cache_partition.pk))
+
+    def open(self, cache_partition_file):
+        """
+        Return the local copy of the file or None if it is not cached in
+        this node.
+        """
+        path = self.get_file_path(cache_partition_file=cache_partition_file)
+        try:
+            file_object = open(path, mode='rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError as exception:
+            logger.debug('Unable to update local cache file time; %s', exception)
+
+        return File(file=file_object, name=path)
+
+    def prune(self):
+        """
+        Delete the least recently used local copies until the size is
+        below the low watermark of the maximum size.
+        """
+        entries = []
+        for directory, directories, filenames in os.walk(self.path):
+            for filename in filenames:
+                # Skip the temporary files being written.
+                if filename.startswith('.'):
+                    continue
+
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum([entry[1] for entry in entries])
+
+        if size > self.maximum_size:
+            low_watermark_size = self.maximum_size * setting_low_watermark.value
+            for mtime, file_size, path in sorted(entries):
+                if size <= low_watermark_size:
+                    break
+
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    # Deleted by another process.
+                    pass
+
+                size -= file_size
+
+        with self.lock:
+            self.size = size
+
+    def purge(self, cache_partition):
+        shutil.rmtree(
+            self.get_partition_path(cache_partition=cache_partition),
+            ignore_errors=True
+        )
+
+
+cache_file_access_buffer = CacheFileAccessBuffer(
+    maximum_age=CACHE_ACCESS_BUFFER_MAXIMUM_AGE,
+    maximum_size=CACHE_ACCESS_BUFFER_MAXIMUM_SIZE
+)
+cache_lookup_memo = CacheLookupMemo(
+    maximum_age=CACHE_LOOKUP_MEMO_MAXIMUM_AGE,
+    maximum_size=CACHE_LOOKUP_MEMO_MAXIMUM_SIZE
+)
+cache_statistics_buffer = CacheStatisticsBuffer(
+    maximum_age=CACHE_STATISTICS_BUFFER_MAXIMUM_AGE,
+    maximum_size=CACHE_STATISTICS_BUFFER_MAXIMUM_SIZE
+)
+
+if setting_local_cache_path.value:
+    local_cache = LocalCache(
+        maximum_size=setting_local_cache_maximum_size.value,
+        path=setting_local_cache_path.value
+    )
+else:
+    local_cache = None
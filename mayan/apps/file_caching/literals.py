@@ -0,0 +1,35 @@
+from django.utils.translation import ugettext_lazy as _
+
+CACHE_ACCESS_BUFFER_MAXIMUM_AGE = 60  # 1 minute
+CACHE_ACCESS_BUFFER_MAXIMUM_SIZE = 500
+
+CACHE_LOOKUP_MEMO_MAXIMUM_AGE = 60  # 1 minute
+CACHE_LOOKUP_MEMO_MAXIMUM_SIZE = 10000
+
+CACHE_EVICTION_POLICY_FIFO = 'fifo'
+CACHE_EVICTION_POLICY_LFU = 'lfu'
+CACHE_EVICTION_POLICY_LRU = 'lru'
+
+CACHE_EVICTION_POLICY_CHOICES = (
+    (CACHE_EVICTION_POLICY_FIFO, _('First in, first out')),
+    (CACHE_EVICTION_POLICY_LFU, _('Least frequently used')),
+    (CACHE_EVICTION_POLICY_LRU, _('Least recently used')),
+)
+# Order in which the files are selected for deletion for each policy.
+CACHE_EVICTION_POLICY_ORDERING = {
+    CACHE_EVICTION_POLICY_FIFO: ('datetime', 'pk'),
+    CACHE_EVICTION_POLICY_LFU: ('hits', 'accessed', 'pk'),
+    CACHE_EVICTION_POLICY_LRU: ('accessed', 'pk'),
+}
+
+CACHE_JANITOR_INTERVAL = 60 * 5  # 5 minutes
+CACHE_PRUNE_BATCH_SIZE = 100
+
+CACHE_STATISTICS_BUFFER_MAXIMUM_AGE = 60  # 1 minute
+CACHE_STATISTICS_BUFFER_MAXIMUM_SIZE = 500
+
+DEFAULT_CACHE_EVICTION_POLICY = CACHE_EVICTION_POLICY_LRU
+DEFAULT_CACHE_HIGH_WATERMARK = 0.95
+DEFAULT_CACHE_LOW_WATERMARK = 0.85
+DEFAULT_LOCAL_CACHE_MAXIMUM_SIZE = 512 * 2 ** 20  # 512 Megabytes
+DEFAULT_LOCAL_CACHE_PATH = None
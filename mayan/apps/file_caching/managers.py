@@ -0,0 +1,18 @@
+from django.db import models
+
+from .classes import cache_lookup_memo
+
+
+class CacheManager(models.Manager):
+    def get_by_defined_storage_name(self, defined_storage_name):
+        """
+        Return the cache of a defined storage, remembering it in the
+        process to avoid a query on each lookup.
+        """
+        key = ('cache', defined_storage_name)
+        cache = cache_lookup_memo.get(key=key)
+        if not cache:
+            cache = self.get(defined_storage_name=defined_storage_name)
+            cache_lookup_memo.set(key=key, instance=cache)
+
+        return cache
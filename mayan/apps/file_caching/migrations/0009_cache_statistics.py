@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('file_caching', '0008_cache_eviction_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cache',
+            name='bytes_read',
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text='Total size in bytes '
+                'of the files read from the cache.',
+                verbose_name='Bytes read'
+            ),
+        ),
+        migrations.AddField(
+            model_name='cache',
+            name='bytes_written',
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text='Total size in bytes '
+                'of the files written to the cache.',
+                verbose_name='Bytes written'
+            ),
+        ),
+        migrations.AddField(
+            model_name='cache',
+            name='eviction_age',
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text='Sum of the ages in '
+                'seconds of the files deleted to keep the cache below its '
+                'maximum size.', verbose_name='Eviction age'
+            ),
+        ),
+        migrations.AddField(
+            model_name='cache',
+            name='evictions',
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text='Number of files '
+                'deleted to keep the cache below its maximum size.',
+                verbose_name='Evictions'
+            ),
+        ),
+        migrations.AddField(
+            model_name='cache',
+            name='hits',
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text='Number of times a '
+                'file was found in the cache.', verbose_name='Hits'
+            ),
+        ),
+        migrations.AddField(
+            model_name='cache',
+            name='misses',
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text='Number of times a '
+                'file was not found in the cache.', verbose_name='Misses'
+            ),
+        ),
+    ]
@@ -1,39 +1,105 @@
 from contextlib import contextmanager
+from datetime import timedelta
 import logging
+import shutil
 
 from django.core import validators
 from django.core.files.base import ContentFile
 from django.db import models, transaction
-from django.db.models import Sum
+from django.db.models import F, Sum
 from django.template.defaultfilters import filesizeformat
 from django.utils.encoding import force_text, python_2_unicode_compatible
 from django.utils.functional import cached_property
+from django.utils import timezone
 from django.utils.text import format_lazy
+from django.utils.timesince import timesince
 from django.utils.translation import ugettext_lazy as _
 
 from mayan.apps.lock_manager.exceptions import LockError
 from mayan.apps.lock_manager.runtime import locking_backend
 from mayan.apps.storage.classes import DefinedStorage
 
+from .classes import (
+    cache_file_access_buffer, cache_lookup_memo, cache_statistics_buffer,
+    local_cache
+)
 from .events import (
     event_cache_created, event_cache_edited, event_cache_purged
 )
+from .literals import (
+    CACHE_EVICTION_POLICY_CHOICES, CACHE_EVICTION_POLICY_ORDERING,
+    CACHE_PRUNE_BATCH_SIZE, DEFAULT_CACHE_EVICTION_POLICY
+)
+from .managers import CacheManager
+from .settings import setting_high_watermark, setting_low_watermark
+from .tasks import task_cache_prune
 
 logger = logging.getLogger(name=__name__)
 
 
 @python_2_unicode_compatible
 class Cache(models.Model):
+    bytes_read = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Total size in bytes of the files read from the cache.'
+        ), verbose_name=_('Bytes read')
+    )
+    bytes_written = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Total size in bytes of the files written to the cache.'
+        ), verbose_name=_('Bytes written')
+    )
     defined_storage_name = models.CharField(
         db_index=True, help_text=_(
             'Internal name of the defined storage for this cache.'
         ), max_length=96, unique=True, verbose_name=_('Defined storage name')
     )
+    eviction_age = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Sum of the ages in seconds of the files deleted to keep the '
+            'cache below its maximum size.'
+        ), verbose_name=_('Eviction age')
+    )
+    eviction_policy = models.CharField(
+        choices=CACHE_EVICTION_POLICY_CHOICES,
+        default=DEFAULT_CACHE_EVICTION_POLICY, help_text=_(
+            'Order in which files are deleted when the cache is full.'
+        ), max_length=8, verbose_name=_('Eviction policy')
+    )
+    evictions = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Number of files deleted to keep the cache below its maximum '
+            'size.'
+        ), verbose_name=_('Evictions')
+    )
+    hits = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Number of times a file was found in the cache.'
+        ), verbose_name=_('Hits')
+    )
     maximum_size = models.BigIntegerField(
         help_text=_('Maximum size of the cache in bytes.'), validators=[
             validators.MinValueValidator(limit_value=1)
         ], verbose_name=_('Maximum size')
     )
+    misses = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Number of times a file was not found in the cache.'
+        ), verbose_name=_('Misses')
+    )
+    total_size = models.BigIntegerField(
+        default=0, editable=False, help_text=_(
+            'Running total of the size of the files in the cache in bytes.'
+        ), verbose_name=_('Total size')
+    )
+
+    # Fields only changed by atomic updates.
+    counter_field_names = (
+        'bytes_read', 'bytes_written', 'eviction_age', 'evictions', 'hits',
+        'misses', 'total_size'
+    )
+
+    objects = CacheManager()
 
     class Meta:
         verbose_name = _('Cache')
@@ -42,9 +108,88 @@ class Cache(models.Model):
     def __str__(self):
         return force_text(self.label)
 
+    def delete_files(self, cache_partition_files):
+        """
+        Delete several files with a single query and update the running
+        total of the cache once. Returns the files that were deleted, files
+        already deleted by another process are not included.
+        """
+        for cache_partition_file in cache_partition_files:
+            if local_cache:
+                local_cache.delete(cache_partition_file=cache_partition_file)
+
+            self.storage.delete(name=cache_partition_file.full_filename)
+
+        with transaction.atomic():
+            # Lock the rows and only subtract the size of the files that
+            # still exist.
+            file_sizes = dict(
+                CachePartitionFile.objects.select_for_update().filter(
+                    pk__in=[
+                        cache_partition_file.pk for
+                        cache_partition_file in cache_partition_files
+                    ]
+                ).values_list('pk', 'file_size')
+            )
+            if file_sizes:
+                CachePartitionFile.objects.filter(
+                    pk__in=file_sizes.keys()
+                ).delete()
+                self.update_total_size(delta=-sum(file_sizes.values()))
+
+        return [
+            cache_partition_file for cache_partition_file in
+            cache_partition_files if cache_partition_file.pk in file_sizes
+        ]
+
+    def get_bytes_read_display(self):
+        return filesizeformat(bytes_=self.bytes_read)
+
+    get_bytes_read_display.help_text = _(
+        'Total size of the files read from the cache.'
+    )
+    get_bytes_read_display.short_description = _('Read')
+
+    def get_bytes_written_display(self):
+        return filesizeformat(bytes_=self.bytes_written)
+
+    get_bytes_written_display.help_text = _(
+        'Total size of the files written to the cache.'
+    )
+    get_bytes_written_display.short_description = _('Written')
+
     def get_files(self):
         return CachePartitionFile.objects.filter(partition__cache__id=self.pk)
 
+    def get_high_watermark_size(self):
+        return int(self.maximum_size * setting_high_watermark.value)
+
+    def get_hit_ratio(self):
+        """
+        Return the fraction of the lookups that found the file in the
+        cache or None if the cache was never used.
+        """
+        if self.hits + self.misses:
+            return self.hits / (self.hits + self.misses)
+
+    def get_hit_ratio_display(self):
+        hit_ratio = self.get_hit_ratio()
+        if hit_ratio is None:
+            return _('None')
+
+        return format_lazy(
+            '{:0.1f}% ({} / {})', hit_ratio * 100, self.hits, self.misses
+        )
+
+    get_hit_ratio_display.help_text = _(
+        'Percentage of the lookups that found the file in the cache, '
+        'followed by the number of hits and misses.'
+    )
+    get_hit_ratio_display.short_description = _('Hit ratio')
+
+    def get_low_watermark_size(self):
+        return int(self.maximum_size * setting_low_watermark.value)
+
     def get_maximum_size_display(self):
         return filesizeformat(bytes_=self.maximum_size)
 
@@ -56,13 +201,52 @@ class Cache(models.Model):
     def get_defined_storage(self):
         return DefinedStorage.get(name=self.defined_storage_name)
 
+    def get_mean_eviction_age(self):
+        """
+        Return the mean age in seconds of the files deleted to keep the
+        cache below its maximum size or None if no file was deleted.
+        """
+        if self.evictions:
+            return self.eviction_age / self.evictions
+
+    def get_mean_eviction_age_display(self):
+        mean_eviction_age = self.get_mean_eviction_age()
+        if mean_eviction_age is None:
+            return _('None')
+
+        now = timezone.now()
+        return timesince(
+            d=now - timedelta(seconds=mean_eviction_age), now=now
+        )
+
+    get_mean_eviction_age_display.help_text = _(
+        'Mean time the deleted files stayed in the cache. A short time '
+        'means the cache is too small.'
+    )
+    get_mean_eviction_age_display.short_description = _('Mean eviction age')
+
+    def get_partition(self, name):
+        """
+        Return the partition with the name, creating it if it doesn't
+        exist. The partition is remembered in the process to avoid a query
+        on each lookup.
+        """
+        key = ('cache_partition', self.pk, name)
+        partition = cache_lookup_memo.get(key=key)
+        if not partition:
+            partition, created = self.partitions.get_or_create(name=name)
+            cache_lookup_memo.set(key=key, instance=partition)
+
+        partition.cache = self
+        return partition
+
     def get_total_size(self):
         """
-        Return the actual usage of the cache.
+        Return the actual usage of the cache from the running total.
         """
-        return self.get_files().aggregate(
-            file_size__sum=Sum('file_size')
-        )['file_size__sum'] or 0
+        return Cache.objects.filter(pk=self.pk).values_list(
+            'total_size', flat=True
+        ).first() or 0
 
     def get_total_size_display(self):
         return format_lazy(
@@ -80,11 +264,72 @@ class Cache(models.Model):
 
     def prune(self):
         """
-        Deletes files until the total size of the cache is below the allowed
-        maximum size of the cache.
+        Deletes files in the order of the eviction policy until the total
+        size of the cache is below the low watermark, if the cache is above
+        the high watermark. The files are selected in a single ordered
+        query and deleted in batches. Returns the number of files deleted
+        and their total size.
         """
-        while self.get_total_size() > self.maximum_size:
-            self.get_files().earliest().delete()
+        if self.get_total_size() <= self.get_high_watermark_size():
+            return 0, 0
+
+        lock_id = 'cache-prune-{}'.format(self.pk)
+        try:
+            lock = locking_backend.acquire_lock(name=lock_id)
+        except LockError:
+            # Another process is already pruning this cache.
+            logger.debug('unable to obtain lock: %s', lock_id)
+            return 0, 0
+
+        try:
+            # Write the pending access times of this process to select the
+            # files with the latest information available.
+            cache_file_access_buffer.flush()
+
+            excess_size = self.get_total_size() - self.get_low_watermark_size()
+
+            cache_partition_files = []
+            deleted_cache_partition_files = []
+            queryset = self.get_files().order_by(
+                *CACHE_EVICTION_POLICY_ORDERING[self.eviction_policy]
+            ).select_related('partition')
+
+            for cache_partition_file in queryset.iterator():
+                if excess_size <= 0:
+                    break
+
+                cache_partition_files.append(cache_partition_file)
+                excess_size -= cache_partition_file.file_size
+
+            for index in range(
+                0, len(cache_partition_files), CACHE_PRUNE_BATCH_SIZE
+            ):
+                batch = cache_partition_files[
+                    index:index + CACHE_PRUNE_BATCH_SIZE
+                ]
+                batch = self.delete_files(cache_partition_files=batch)
+                deleted_cache_partition_files.extend(batch)
+
+                now = timezone.now()
+                eviction_age = sum(
+                    [
+                        (now - cache_partition_file.datetime).total_seconds()
+                        for cache_partition_file in batch
+                    ]
+                )
+                Cache.objects.filter(pk=self.pk).update(
+                    eviction_age=F('eviction_age') + int(eviction_age),
+                    evictions=F('evictions') + len(batch)
+                )
+        finally:
+            lock.release()
+
+        return len(deleted_cache_partition_files), sum(
+            [
+                cache_partition_file.file_size for
+                cache_partition_file in deleted_cache_partition_files
+            ]
+        )
 
     def purge(self, _user=None):
         """
@@ -99,7 +344,19 @@ class Cache(models.Model):
         _user = kwargs.pop('_user', None)
         with transaction.atomic():
             is_new = not self.pk
+            if not is_new and 'update_fields' not in kwargs:
+                # Don't overwrite the counters updated by other processes.
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields if (
+                        not field.primary_key and field.name not in self.counter_field_names
+                    )
+                ]
+
             result = super(Cache, self).save(*args, **kwargs)
+            # Forget the lookups of the process. Caches are only saved
+            # when edited or when they are created again after a database
+            # flush.
+            cache_lookup_memo.clear()
             if is_new:
                 event_cache_created.commit(
                     actor=_user, target=self
@@ -109,13 +366,42 @@ class Cache(models.Model):
                     actor=_user, target=self
                 )
 
-        self.prune()
+        if self.get_total_size() > self.get_high_watermark_size():
+            task_cache_prune.apply_async(kwargs={'cache_id': self.pk})
+
         return result
 
     @cached_property
     def storage(self):
         return self.get_defined_storage().get_storage_instance()
 
+    def trigger_prune(self, size_increase):
+        """
+        Queue the pruning of the cache when an increase of its size makes
+        it cross the high watermark. Caches that stay above it because the
+        task didn't run are pruned by the periodic janitor.
+        """
+        total_size = self.get_total_size()
+        high_watermark_size = self.get_high_watermark_size()
+
+        if total_size - size_increase <= high_watermark_size < total_size:
+            task_cache_prune.apply_async(kwargs={'cache_id': self.pk})
+
+    def update_total_size(self, delta=None):
+        """
+        Add the delta to the running total of the cache or recalculate it
+        from the size of the files when no delta is provided.
+        """
+        if delta is None:
+            total_size = self.get_files().aggregate(
+                file_size__sum=Sum('file_size')
+            )['file_size__sum'] or 0
+            Cache.objects.filter(pk=self.pk).update(total_size=total_size)
+        elif delta:
+            Cache.objects.filter(pk=self.pk).update(
+                total_size=F('total_size') + delta
+            )
+
 
 class CachePartition(models.Model):
     cache = models.ForeignKey(
@@ -143,8 +429,6 @@ class CachePartition(models.Model):
             lock = locking_backend.acquire_lock(lock_id)
             logger.debug('acquired lock: %s', lock_id)
             try:
-                self.cache.prune()
-
                 # Since open "wb+" doesn't create files force the creation of an
                 # empty file.
                 self.cache.storage.delete(
@@ -158,7 +442,20 @@ class CachePartition(models.Model):
                 try:
                     with transaction.atomic():
                         partition_file = self.files.create(filename=filename)
-                        yield partition_file.open(mode='wb')
+                        if local_cache:
+                            # Write the file locally first and then copy it
+                            # to the cache storage.
+                            with local_cache.create_file(
+                                cache_partition_file=partition_file
+                            ) as file_object:
+                                yield file_object
+                                file_object.seek(0)
+                                shutil.copyfileobj(
+                                    fsrc=file_object,
+                                    fdst=partition_file.open(mode='wb')
+                                )
+                        else:
+                            yield partition_file.open(mode='wb')
 
                 except Exception as exception:
                     logger.error(
@@ -180,14 +477,37 @@ class CachePartition(models.Model):
 
     def delete(self, *args, **kwargs):
         self.purge()
+        cache_lookup_memo.invalidate(
+            key=('cache_partition', self.cache_id, self.name)
+        )
         return super(CachePartition, self).delete(*args, **kwargs)
 
-    def get_file(self, filename):
+    def get_file(self, filename, record_statistics=True):
+        """
+        Return the file with the filename or None if it doesn't exist.
+        Lookups that only check for the existence of a file or that are
+        part of a request already counted must pass record_statistics=False
+        to not skew the hit ratio.
+
+        File rows are not remembered in the process like the cache and
+        partition rows, files are evicted by other processes all the time
+        and a remembered row would point to a deleted file.
+        """
         try:
-            return self.files.get(filename=filename)
+            partition_file = self.files.get(filename=filename)
         except self.files.model.DoesNotExist:
+            if record_statistics:
+                cache_statistics_buffer.record(
+                    cache_id=self.cache_id, misses=1
+                )
             return None
 
+        if record_statistics:
+            cache_statistics_buffer.record(cache_id=self.cache_id, hits=1)
+
+        partition_file.partition = self
+        return partition_file
+
     def get_full_filename(self, filename):
         return CachePartition.get_combined_filename(
             parent=self.name, filename=filename
@@ -197,12 +517,18 @@ class CachePartition(models.Model):
         for parition_file in self.files.all():
             parition_file.delete()
 
+        if local_cache:
+            local_cache.purge(cache_partition=self)
+
 
 class CachePartitionFile(models.Model):
     partition = models.ForeignKey(
         on_delete=models.CASCADE, related_name='files',
         to=CachePartition, verbose_name=_('Cache partition')
     )
+    accessed = models.DateTimeField(
+        db_index=True, default=timezone.now, verbose_name=_('Accessed')
+    )
     datetime = models.DateTimeField(
         auto_now_add=True, db_index=True, verbose_name=_('Date time')
     )
@@ -210,6 +536,10 @@ class CachePartitionFile(models.Model):
     file_size = models.PositiveIntegerField(
         default=0, verbose_name=_('File size')
     )
+    hits = models.PositiveIntegerField(
+        default=0, help_text=_('Number of times the file has been read.'),
+        verbose_name=_('Hits')
+    )
 
     _storage_object = None
 
@@ -220,8 +550,17 @@ class CachePartitionFile(models.Model):
         verbose_name_plural = _('Cache partition files')
 
     def delete(self, *args, **kwargs):
+        if local_cache:
+            local_cache.delete(cache_partition_file=self)
+
         self.partition.cache.storage.delete(name=self.full_filename)
-        return super(CachePartitionFile, self).delete(*args, **kwargs)
+        with transaction.atomic():
+            result = super(CachePartitionFile, self).delete(*args, **kwargs)
+            # Don't subtract the size of a file deleted by another process.
+            if result[0]:
+                self.partition.cache.update_total_size(delta=-self.file_size)
+
+        return result
 
     def exists(self):
         return self.partition.cache.storage.exists(name=self.full_filename)
@@ -232,13 +571,52 @@ class CachePartitionFile(models.Model):
             parent=self.partition.name, filename=self.filename
         )
 
+    def _open_local(self):
+        """
+        Return the node local copy of the file, copying it from the cache
+        storage first if this node doesn't have it.
+        """
+        try:
+            file_object = local_cache.open(cache_partition_file=self)
+            if not file_object:
+                with self.partition.cache.storage.open(
+                    name=self.full_filename, mode='rb'
+                ) as storage_file_object:
+                    local_cache.add(
+                        cache_partition_file=self,
+                        file_object=storage_file_object
+                    )
+
+                file_object = local_cache.open(cache_partition_file=self)
+        except OSError as exception:
+            logger.warning(
+                'Unable to use the local copy of the cache file; %s',
+                exception
+            )
+        else:
+            return file_object
+
     def open(self, mode='rb'):
         # Open the file for reading. If the file is written to, the
         # .update_size() must be called.
         try:
-            self._storage_object = self.partition.cache.storage.open(
-                name=self.full_filename, mode=mode
-            )
+            if local_cache and mode == 'rb':
+                self._storage_object = self._open_local()
+            else:
+                self._storage_object = None
+
+            if not self._storage_object:
+                self._storage_object = self.partition.cache.storage.open(
+                    name=self.full_filename, mode=mode
+                )
+
+            if mode.startswith('r'):
+                cache_file_access_buffer.record(cache_partition_file=self)
+                cache_statistics_buffer.record(
+                    bytes_read=self.file_size,
+                    cache_id=self.partition.cache_id
+                )
+
             return self._storage_object
         except Exception as exception:
             logger.error(
@@ -252,7 +630,22 @@ class CachePartitionFile(models.Model):
         self._storage_object = None
 
     def update_size(self):
+        previous_file_size = self.file_size
         self.file_size = self.partition.cache.storage.size(
             name=self.full_filename
         )
-        self.save()
+        if self.file_size > previous_file_size:
+            cache_statistics_buffer.record(
+                bytes_written=self.file_size - previous_file_size,
+                cache_id=self.partition.cache_id
+            )
+
+        with transaction.atomic():
+            self.save()
+            self.partition.cache.update_total_size(
+                delta=self.file_size - previous_file_size
+            )
+
+        self.partition.cache.trigger_prune(
+            size_increase=self.file_size - previous_file_size
+        )
@@ -0,0 +1,38 @@
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers
+
+from .models import Cache
+
+
+class CacheSerializer(serializers.HyperlinkedModelSerializer):
+    hit_ratio = serializers.SerializerMethodField(
+        help_text=_(
+            'Fraction of the lookups that found the file in the cache.'
+        )
+    )
+    label = serializers.CharField(read_only=True)
+    mean_eviction_age = serializers.SerializerMethodField(
+        help_text=_(
+            'Mean time in seconds the deleted files stayed in the cache.'
+        )
+    )
+
+    class Meta:
+        extra_kwargs = {
+            'url': {'view_name': 'rest_api:cache-detail'},
+        }
+        fields = (
+            'bytes_read', 'bytes_written', 'defined_storage_name',
+            'eviction_policy', 'evictions', 'hit_ratio', 'hits', 'id',
+            'label', 'maximum_size', 'mean_eviction_age', 'misses',
+            'total_size', 'url'
+        )
+        model = Cache
+        read_only_fields = fields
+
+    def get_hit_ratio(self, instance):
+        return instance.get_hit_ratio()
+
+    def get_mean_eviction_age(self, instance):
+        return instance.get_mean_eviction_age()
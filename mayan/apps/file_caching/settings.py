@@ -0,0 +1,41 @@
+from django.utils.translation import ugettext_lazy as _
+
+from mayan.apps.smart_settings.classes import Namespace
+
+from .literals import (
+    DEFAULT_CACHE_HIGH_WATERMARK, DEFAULT_CACHE_LOW_WATERMARK,
+    DEFAULT_LOCAL_CACHE_MAXIMUM_SIZE, DEFAULT_LOCAL_CACHE_PATH
+)
+
+namespace = Namespace(label=_('File caching'), name='file_caching')
+
+setting_high_watermark = namespace.add_setting(
+    default=DEFAULT_CACHE_HIGH_WATERMARK,
+    global_name='FILE_CACHING_HIGH_WATERMARK', help_text=_(
+        'Fraction of the maximum size of a cache at which old files start '
+        'being deleted in the background.'
+    )
+)
+setting_low_watermark = namespace.add_setting(
+    default=DEFAULT_CACHE_LOW_WATERMARK,
+    global_name='FILE_CACHING_LOW_WATERMARK', help_text=_(
+        'Fraction of the maximum size of a cache to which the cache is '
+        'reduced when old files are deleted.'
+    )
+)
+setting_local_cache_maximum_size = namespace.add_setting(
+    default=DEFAULT_LOCAL_CACHE_MAXIMUM_SIZE,
+    global_name='FILE_CACHING_LOCAL_CACHE_MAXIMUM_SIZE', help_text=_(
+        'Maximum size in bytes of the local copy of the cache files kept '
+        'by each node.'
+    )
+)
+setting_local_cache_path = namespace.add_setting(
+    default=DEFAULT_LOCAL_CACHE_PATH,
+    global_name='FILE_CACHING_LOCAL_CACHE_PATH', help_text=_(
+        'Path of a local directory in which each node keeps a copy of the '
+        'cache files it reads and writes, to avoid fetching them from the '
+        'cache storage again. Use it when the cache storage is remote. '
+        'Disabled when empty.'
+    )
+)
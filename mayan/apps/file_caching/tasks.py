@@ -8,6 +8,32 @@ from mayan.celery import app
 logger = logging.getLogger(name=__name__)
 
 
+@app.task(ignore_result=True)
+def task_cache_janitor():
+    Cache = apps.get_model(
+        app_label='file_caching', model_name='Cache'
+    )
+
+    for cache in Cache.objects.all():
+        task_cache_prune(cache_id=cache.pk)
+
+
+@app.task(ignore_result=True)
+def task_cache_prune(cache_id):
+    Cache = apps.get_model(
+        app_label='file_caching', model_name='Cache'
+    )
+
+    cache = Cache.objects.get(pk=cache_id)
+
+    file_count, file_size = cache.prune()
+    if file_count:
+        logger.info(
+            'Cache "%s" pruned, reclaimed %d bytes from %d files', cache,
+            file_size, file_count
+        )
+
+
 @app.task(ignore_result=True)
 def task_cache_purge(cache_id, user_id=None):
     Cache = apps.get_model(
@@ -0,0 +1,65 @@
+from rest_framework import status
+
+from mayan.apps.rest_api.tests.base import BaseAPITestCase
+
+from ..permissions import permission_cache_view
+
+from .literals import TEST_CACHE_PARTITION_FILE_SIZE
+from .mixins import CacheTestMixin
+
+
+class CacheAPITestCase(CacheTestMixin, BaseAPITestCase):
+    def setUp(self):
+        super(CacheAPITestCase, self).setUp()
+        self._create_test_cache()
+
+    def _request_test_cache_detail_api_view(self):
+        return self.get(
+            viewname='rest_api:cache-detail', kwargs={
+                'pk': self.test_cache.pk
+            }
+        )
+
+    def _request_test_cache_list_api_view(self):
+        return self.get(viewname='rest_api:cache-list')
+
+    def test_cache_detail_api_view_no_permission(self):
+        response = self._request_test_cache_detail_api_view()
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cache_detail_api_view_with_access(self):
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        self.grant_access(
+            obj=self.test_cache, permission=permission_cache_view
+        )
+
+        response = self._request_test_cache_detail_api_view()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['id'], self.test_cache.pk)
+        self.assertEqual(
+            response.data['total_size'], TEST_CACHE_PARTITION_FILE_SIZE
+        )
+        self.assertTrue('hit_ratio' in response.data)
+        self.assertTrue('mean_eviction_age' in response.data)
+
+    def test_cache_list_api_view_no_permission(self):
+        response = self._request_test_cache_list_api_view()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['count'], 0)
+
+    def test_cache_list_api_view_with_access(self):
+        self.grant_access(
+            obj=self.test_cache, permission=permission_cache_view
+        )
+
+        response = self._request_test_cache_list_api_view()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(
+            response.data['results'][0]['id'], self.test_cache.pk
+        )
@@ -1,11 +1,117 @@
+import os
+
 import mock
 
+from django.utils.encoding import force_bytes
+
 from mayan.apps.common.tests.base import BaseTestCase
+from mayan.apps.storage.utils import fs_cleanup, mkdtemp
 
+from ..classes import (
+    LocalCache, cache_file_access_buffer, cache_lookup_memo,
+    cache_statistics_buffer
+)
+from ..literals import CACHE_EVICTION_POLICY_LRU
+from ..models import Cache
+from ..tasks import task_cache_janitor
+
+from .literals import (
+    TEST_CACHE_PARTITION_FILE_FILENAME, TEST_CACHE_PARTITION_FILE_SIZE
+)
 from .mixins import CacheTestMixin
 
 
 class CacheModelTestCase(CacheTestMixin, BaseTestCase):
+    def test_cache_access_buffer(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        # Start with an empty buffer to not trigger a flush by age.
+        cache_file_access_buffer.flush()
+
+        self.test_cache_partition_file.open().close()
+        self.test_cache_partition_file.open().close()
+
+        self.test_cache_partition_file.refresh_from_db()
+        self.assertEqual(self.test_cache_partition_file.hits, 0)
+
+        cache_file_access_buffer.flush()
+
+        self.test_cache_partition_file.refresh_from_db()
+        self.assertEqual(self.test_cache_partition_file.hits, 2)
+
+    def test_cache_prune_janitor(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+
+        for index in range(3):
+            with self.test_cache_partition.create_file(
+                filename='{}_{}'.format(
+                    TEST_CACHE_PARTITION_FILE_FILENAME, index
+                )
+            ) as file_object:
+                file_object.write(force_bytes(' ' * 100))
+
+        # Update the maximum size without saving the model to not trigger
+        # the pruning.
+        Cache.objects.filter(pk=self.test_cache.pk).update(maximum_size=250)
+
+        self.assertEqual(self.test_cache.get_files().count(), 3)
+
+        task_cache_janitor()
+
+        self.assertEqual(self.test_cache.get_files().count(), 2)
+
+    def test_cache_prune_trigger_on_write(self):
+        self._create_test_cache()
+        self.test_cache.maximum_size = 250
+        self.test_cache.save()
+        self._create_test_cache_partition()
+
+        for index in range(3):
+            with self.test_cache_partition.create_file(
+                filename='{}_{}'.format(
+                    TEST_CACHE_PARTITION_FILE_FILENAME, index
+                )
+            ) as file_object:
+                file_object.write(force_bytes(' ' * 100))
+
+        self.assertEqual(self.test_cache.get_files().count(), 2)
+        self.assertTrue(
+            self.test_cache.get_total_size() <= self.test_cache.get_low_watermark_size()
+        )
+
+    def test_cache_prune_lru(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+
+        for index in range(3):
+            with self.test_cache_partition.create_file(
+                filename='{}_{}'.format(
+                    TEST_CACHE_PARTITION_FILE_FILENAME, index
+                )
+            ) as file_object:
+                file_object.write(force_bytes(' ' * 100))
+
+        # Read the oldest file to make it the most recently used.
+        self.test_cache_partition.get_file(
+            filename='{}_0'.format(TEST_CACHE_PARTITION_FILE_FILENAME)
+        ).open().close()
+
+        self.test_cache.eviction_policy = CACHE_EVICTION_POLICY_LRU
+        self.test_cache.maximum_size = 250
+        self.test_cache.save()
+
+        self.assertEqual(
+            sorted(
+                self.test_cache.get_files().values_list('filename', flat=True)
+            ), [
+                '{}_0'.format(TEST_CACHE_PARTITION_FILE_FILENAME),
+                '{}_2'.format(TEST_CACHE_PARTITION_FILE_FILENAME)
+            ]
+        )
+
     def test_cache_purge(self):
         self._create_test_cache()
         self._create_test_cache_partition()
@@ -17,6 +123,137 @@ class CacheModelTestCase(CacheTestMixin, BaseTestCase):
 
         self.assertNotEqual(cache_total_size, self.test_cache.get_total_size())
 
+    def test_cache_prune_batch(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+
+        for index in range(10):
+            with self.test_cache_partition.create_file(
+                filename='{}_{}'.format(
+                    TEST_CACHE_PARTITION_FILE_FILENAME, index
+                )
+            ) as file_object:
+                file_object.write(force_bytes(' ' * 100))
+
+        self.test_cache.maximum_size = 500
+        self.test_cache.save()
+
+        # Pruned below the low watermark, not just below the maximum size.
+        self.assertEqual(self.test_cache.get_files().count(), 4)
+        self.assertEqual(self.test_cache.get_total_size(), 400)
+        self.assertTrue(
+            self.test_cache.get_files().filter(
+                filename='{}_9'.format(TEST_CACHE_PARTITION_FILE_FILENAME)
+            ).exists()
+        )
+
+    def test_cache_delete_files_already_deleted(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        # Another process deletes the file first.
+        self.test_cache_partition.files.get(
+            pk=self.test_cache_partition_file.pk
+        ).delete()
+
+        self.assertEqual(
+            self.test_cache.delete_files(
+                cache_partition_files=(self.test_cache_partition_file,)
+            ), []
+        )
+        self.assertEqual(self.test_cache.get_total_size(), 0)
+
+    def test_cache_total_size(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        self.assertEqual(
+            self.test_cache.get_total_size(), TEST_CACHE_PARTITION_FILE_SIZE
+        )
+
+        self.test_cache_partition_file.delete()
+
+        self.assertEqual(self.test_cache.get_total_size(), 0)
+
+    def test_cache_statistics(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        cache_statistics_buffer.flush()
+
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME
+        )
+        self._create_test_cache_partition_file()
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME
+        ).open().close()
+
+        cache_statistics_buffer.flush()
+
+        self.test_cache.refresh_from_db()
+        self.assertEqual(
+            self.test_cache.bytes_read, TEST_CACHE_PARTITION_FILE_SIZE
+        )
+        self.assertEqual(
+            self.test_cache.bytes_written, TEST_CACHE_PARTITION_FILE_SIZE
+        )
+        self.assertEqual(self.test_cache.hits, 1)
+        self.assertEqual(self.test_cache.misses, 1)
+        self.assertEqual(self.test_cache.get_hit_ratio(), 0.5)
+
+    def test_cache_statistics_disabled(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        cache_statistics_buffer.flush()
+
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME,
+            record_statistics=False
+        )
+        self._create_test_cache_partition_file()
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME,
+            record_statistics=False
+        )
+
+        cache_statistics_buffer.flush()
+
+        self.test_cache.refresh_from_db()
+        self.assertEqual(self.test_cache.hits, 0)
+        self.assertEqual(self.test_cache.misses, 0)
+
+    def test_cache_statistics_evictions(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+
+        for index in range(3):
+            with self.test_cache_partition.create_file(
+                filename='{}_{}'.format(
+                    TEST_CACHE_PARTITION_FILE_FILENAME, index
+                )
+            ) as file_object:
+                file_object.write(force_bytes(' ' * 100))
+
+        self.test_cache.maximum_size = 200
+        self.test_cache.save()
+
+        self.test_cache.refresh_from_db()
+        self.assertEqual(self.test_cache.evictions, 2)
+        self.assertEqual(self.test_cache.get_mean_eviction_age(), 0)
+
+    def test_cache_save_counters(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        self.test_cache.save()
+
+        self.assertEqual(
+            self.test_cache.get_total_size(), TEST_CACHE_PARTITION_FILE_SIZE
+        )
+
     @mock.patch('django.core.files.File.close')
     def test_storage_file_close(self, mock_storage_file_close_method):
         self._create_test_cache()
@@ -24,3 +261,147 @@ class CacheModelTestCase(CacheTestMixin, BaseTestCase):
         self._create_test_cache_partition_file()
 
         self.assertTrue(mock_storage_file_close_method.called)
+
+
+@mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+class CacheLookupMemoTestCase(CacheTestMixin, BaseTestCase):
+    def setUp(self):
+        super(CacheLookupMemoTestCase, self).setUp()
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+        cache_lookup_memo.clear()
+
+    def tearDown(self):
+        cache_lookup_memo.clear()
+        super(CacheLookupMemoTestCase, self).tearDown()
+
+    def test_cache_lookup(self, mock_on_commit):
+        Cache.objects.get_by_defined_storage_name(
+            defined_storage_name=self.test_cache.defined_storage_name
+        )
+
+        with self.assertNumQueries(0):
+            cache = Cache.objects.get_by_defined_storage_name(
+                defined_storage_name=self.test_cache.defined_storage_name
+            )
+
+        self.assertEqual(cache.pk, self.test_cache.pk)
+
+    def test_cache_partition_file_lookup_after_external_delete(
+        self, mock_on_commit
+    ):
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME
+        )
+
+        # Simulate another process evicting the file.
+        self.test_cache_partition.files.filter(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME
+        ).delete()
+
+        self.assertEqual(
+            self.test_cache_partition.get_file(
+                filename=TEST_CACHE_PARTITION_FILE_FILENAME
+            ), None
+        )
+
+    def test_cache_partition_file_lookup_after_delete(self, mock_on_commit):
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME
+        ).delete()
+
+        self.assertEqual(
+            self.test_cache_partition.get_file(
+                filename=TEST_CACHE_PARTITION_FILE_FILENAME
+            ), None
+        )
+
+    def test_cache_partition_file_lookup_after_purge(self, mock_on_commit):
+        self.test_cache_partition.get_file(
+            filename=TEST_CACHE_PARTITION_FILE_FILENAME
+        )
+
+        self.test_cache.purge()
+
+        self.assertEqual(
+            self.test_cache_partition.get_file(
+                filename=TEST_CACHE_PARTITION_FILE_FILENAME
+            ), None
+        )
+
+    def test_cache_partition_lookup(self, mock_on_commit):
+        self.test_cache.get_partition(name=self.test_cache_partition.name)
+
+        with self.assertNumQueries(0):
+            cache_partition = self.test_cache.get_partition(
+                name=self.test_cache_partition.name
+            )
+
+        self.assertEqual(cache_partition.pk, self.test_cache_partition.pk)
+
+
+class LocalCacheModelTestCase(CacheTestMixin, BaseTestCase):
+    def setUp(self):
+        super(LocalCacheModelTestCase, self).setUp()
+        self.local_cache_directory = mkdtemp()
+        self.local_cache = LocalCache(
+            maximum_size=TEST_CACHE_PARTITION_FILE_SIZE * 2,
+            path=self.local_cache_directory
+        )
+        patcher = mock.patch(
+            'mayan.apps.file_caching.models.local_cache', self.local_cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        fs_cleanup(filename=self.local_cache_directory)
+        super(LocalCacheModelTestCase, self).tearDown()
+
+    def _get_test_local_cache_file_path(self):
+        return self.local_cache.get_file_path(
+            cache_partition_file=self.test_cache_partition_file
+        )
+
+    def test_local_cache_purge(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        local_file_path = self._get_test_local_cache_file_path()
+
+        self.test_cache_partition.purge()
+
+        self.assertFalse(os.path.exists(local_file_path))
+
+    def test_local_cache_read_through(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        os.unlink(self._get_test_local_cache_file_path())
+
+        with self.test_cache_partition_file.open() as file_object:
+            self.assertEqual(
+                len(file_object.read()), TEST_CACHE_PARTITION_FILE_SIZE
+            )
+
+        self.assertTrue(
+            os.path.exists(self._get_test_local_cache_file_path())
+        )
+
+    def test_local_cache_write_through(self):
+        self._create_test_cache()
+        self._create_test_cache_partition()
+        self._create_test_cache_partition_file()
+
+        self.assertEqual(
+            os.path.getsize(self._get_test_local_cache_file_path()),
+            TEST_CACHE_PARTITION_FILE_SIZE
+        )
+        self.assertEqual(
+            self.test_cache.storage.size(
+                name=self.test_cache_partition_file.full_filename
+            ), TEST_CACHE_PARTITION_FILE_SIZE
+        )
@@ -1,5 +1,6 @@
 from django.conf.urls import url
 
+from .api_views import APICacheListView, APICacheView
 from .views import CacheListView, CachePurgeView
 
 urlpatterns = [
@@ -15,3 +16,14 @@ urlpatterns = [
         view=CachePurgeView.as_view()
     ),
 ]
+
+api_urls = [
+    url(
+        regex=r'^caches/$', name='cache-list',
+        view=APICacheListView.as_view()
+    ),
+    url(
+        regex=r'^caches/(?P<pk>[0-9]+)/$', name='cache-detail',
+        view=APICacheView.as_view()
+    ),
+]
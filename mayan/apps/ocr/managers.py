@@ -48,7 +48,7 @@ class DocumentPageOCRContentManager(models.Manager):
             timeout=DOCUMENT_IMAGE_TASK_TIMEOUT, disable_sync_subtasks=False
         )
 
-        with document_page.cache_partition.get_file(filename=cache_filename).open() as file_object:
+        with document_page.cache_partition.get_file(filename=cache_filename, record_statistics=False).open() as file_object:
             ocr_content = ocr_backend.execute(
                 file_object=file_object,
                 language=document_page.document.language
@@ -69,6 +69,10 @@ class DocumentPageOCRContentManager(models.Manager):
         logger.debug('document version: %d', document_version.pk)
 
         try:
+            # Rasterize all the pages in a single pass before processing
+            # them individually.
+            document_version.generate_base_images()
+
             for document_page in document_version.pages.all():
                 self.process_document_page(document_page=document_page)
 
@@ -0,0 +1,11 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class IgnoreClientContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation for views that choose the media type of their
+    response themselves, like the image views. The Accept header is left
+    for the view to interpret instead of being rejected with a 406.
+    """
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
@@ -40,6 +40,20 @@ class BufferedZipFile(BufferedFile):
             else:
                 return force_text(chunk)
 
+    def _get_size(self):
+        if self.binary_mode:
+            return self.zip_container_file_object.getinfo(
+                name=self.member_name
+            ).file_size
+        else:
+            return super(BufferedZipFile, self)._get_size()
+
+    def _rewind(self):
+        self.zip_file_object.close()
+        self.zip_file_object = self.zip_container_file_object.open(
+            name=self.member_name
+        )
+
 
 class ZipCompressedPassthroughStorage(PassthroughStorage):
     def open(self, name, mode='rb', _direct=False):
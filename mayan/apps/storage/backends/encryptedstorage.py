@@ -1,34 +1,187 @@
+"""
+Files are stored in a chunked format:
+
+- A header with the magic string b'MAYANENC', the format version (1 byte),
+  the plain text chunk size (4 bytes) and a random salt (16 bytes).
+- The chunks, each encrypted with AES GCM and followed by its 16 byte
+  authentication tag. All chunks except the last have the chunk size.
+
+Each file is encrypted with its own key, derived with HKDF SHA256 from the
+storage key and the salt of the file. Nonces only need to be unique per
+file key, the nonce of a chunk is its index and a flag marking the last
+chunk. The header is authenticated as associated data of every chunk.
+Chunks can't be modified, reordered, removed or appended without failing
+the authentication and each one can be decrypted without the previous
+ones.
+
+Files saved before this format are a single AES CBC stream with an initial
+vector and padding added to each chunk. They are detected by the missing
+magic string and can still be read.
+"""
+import os
+import struct
+
 from Crypto.Cipher import AES
 from Crypto.Hash import SHA256
-from Crypto.Protocol.KDF import PBKDF2
-from Crypto.Util.Padding import pad, unpad
+from Crypto.Protocol.KDF import HKDF, PBKDF2
+from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import unpad
 
 from django.conf import settings
 from django.core.files.base import ContentFile
-from django.utils.encoding import force_text
+from django.utils.encoding import force_bytes, force_text
 
 from ..classes import BufferedFile, PassthroughStorage
 
 from .literals import (
-    ENCRYPTION_FILE_CHUNK_SIZE, ENCRYPTION_KEY_DERIVATION_ITERATIONS,
-    ENCRYPTION_KEY_SIZE
+    ENCRYPTION_FILE_CHUNK_SIZE, ENCRYPTION_FORMAT_CHUNK_NONCE,
+    ENCRYPTION_FORMAT_HEADER, ENCRYPTION_FORMAT_KEY_CONTEXT,
+    ENCRYPTION_FORMAT_MAGIC, ENCRYPTION_FORMAT_SALT_SIZE,
+    ENCRYPTION_FORMAT_TAG_SIZE, ENCRYPTION_FORMAT_VERSION,
+    ENCRYPTION_KEY_DERIVATION_ITERATIONS, ENCRYPTION_KEY_SIZE,
+    ENCRYPTION_LEGACY_CHUNK_ENCRYPTED_SIZE
 )
 
 
 class BufferedEncryptedFile(BufferedFile):
+    """
+    Reads files of the chunked format described in the module docstring.
+    """
+    @staticmethod
+    def get_chunk_cipher(file_key, header, chunk_index, last):
+        cipher = AES.new(
+            key=file_key, mode=AES.MODE_GCM, nonce=struct.pack(
+                ENCRYPTION_FORMAT_CHUNK_NONCE, chunk_index, last
+            ), mac_len=ENCRYPTION_FORMAT_TAG_SIZE
+        )
+        cipher.update(header)
+        return cipher
+
+    @staticmethod
+    def get_file_key(key, salt):
+        return HKDF(
+            context=ENCRYPTION_FORMAT_KEY_CONTEXT, hashmod=SHA256,
+            key_len=ENCRYPTION_KEY_SIZE, master=key, salt=salt
+        )
+
+    @staticmethod
+    def is_format(file_object):
+        """
+        Return True if the file object is in this format. The position of
+        the file object is restored.
+        """
+        position = file_object.tell()
+        magic = file_object.read(len(ENCRYPTION_FORMAT_MAGIC))
+        file_object.seek(position)
+        return magic == ENCRYPTION_FORMAT_MAGIC
+
     def __init__(self, *args, **kwargs):
         self.key = kwargs.pop('key')
 
         super(BufferedEncryptedFile, self).__init__(*args, **kwargs)
 
-        self.initial_vector = self.file_object.read(16)
-        self.cipher = AES.new(
-            key=self.key, mode=AES.MODE_CBC, iv=self.initial_vector
+        self.binary_mode = 'b' in self.mode
+
+        self.header_size = struct.calcsize(ENCRYPTION_FORMAT_HEADER)
+        self.file_object.seek(0)
+        self.header = self.file_object.read(self.header_size)
+        magic, version, self.chunk_size, salt = struct.unpack(
+            ENCRYPTION_FORMAT_HEADER, self.header
+        )
+        if version != ENCRYPTION_FORMAT_VERSION:
+            raise ValueError(
+                'Unsupported encrypted file format version: {}'.format(version)
+            )
+
+        self.file_key = BufferedEncryptedFile.get_file_key(
+            key=self.key, salt=salt
         )
+
+        self.chunk_encrypted_size = self.chunk_size + ENCRYPTION_FORMAT_TAG_SIZE
+
+        self.file_object.seek(0, os.SEEK_END)
+        self.encrypted_size = self.file_object.tell() - self.header_size
+        self.chunk_count = max(
+            1, -(-self.encrypted_size // self.chunk_encrypted_size)
+        )
+
+        self._seek_chunk(chunk_index=0)
+
+    def _get_file_object_chunk(self):
+        if self.chunk_index >= self.chunk_count:
+            return None
+
+        chunk = self.file_object.read(self.chunk_encrypted_size)
+        cipher = BufferedEncryptedFile.get_chunk_cipher(
+            chunk_index=self.chunk_index, file_key=self.file_key,
+            header=self.header, last=self.chunk_index == self.chunk_count - 1
+        )
+        try:
+            data = cipher.decrypt_and_verify(
+                ciphertext=chunk[:-ENCRYPTION_FORMAT_TAG_SIZE],
+                received_mac_tag=chunk[-ENCRYPTION_FORMAT_TAG_SIZE:]
+            )
+        except ValueError:
+            raise ValueError(
+                'Chunk {} of encrypted file failed authentication.'.format(
+                    self.chunk_index
+                )
+            )
+
+        self.chunk_index += 1
+
+        if self.binary_mode:
+            return data
+        else:
+            return force_text(data)
+
+    def _get_size(self):
+        if not self.binary_mode:
+            return super(BufferedEncryptedFile, self)._get_size()
+
+        last_chunk_size = self.encrypted_size - (
+            self.chunk_count - 1
+        ) * self.chunk_encrypted_size - ENCRYPTION_FORMAT_TAG_SIZE
+
+        return (self.chunk_count - 1) * self.chunk_size + max(
+            0, last_chunk_size
+        )
+
+    def _rewind(self):
+        self._seek_chunk(chunk_index=0)
+
+    def _seek_chunk(self, chunk_index):
+        self.chunk_index = chunk_index
+        self.file_object.seek(
+            self.header_size + chunk_index * self.chunk_encrypted_size
+        )
+
+    def _seek_file_object(self, position, current_position):
+        if not self.binary_mode:
+            return super(BufferedEncryptedFile, self)._seek_file_object(
+                current_position=current_position, position=position
+            )
+
+        chunk_index = min(position // self.chunk_size, self.chunk_count - 1)
+        self._seek_chunk(chunk_index=chunk_index)
+        return chunk_index * self.chunk_size
+
+
+class BufferedLegacyEncryptedFile(BufferedFile):
+    """
+    Reads files of the format used before the chunked format. The file is
+    a single AES CBC stream with padding added to each chunk.
+    """
+    def __init__(self, *args, **kwargs):
+        self.key = kwargs.pop('key')
+
+        super(BufferedLegacyEncryptedFile, self).__init__(*args, **kwargs)
+
         self.binary_mode = 'b' in self.mode
+        self._rewind()
 
     def _get_file_object_chunk(self):
-        chunk = self.file_object.read(ENCRYPTION_FILE_CHUNK_SIZE)
+        chunk = self.file_object.read(ENCRYPTION_LEGACY_CHUNK_ENCRYPTED_SIZE)
 
         if chunk:
             data = unpad(
@@ -40,6 +193,65 @@ class BufferedEncryptedFile(BufferedFile):
             else:
                 return force_text(data)
 
+    def _get_size(self):
+        if not self.binary_mode:
+            return super(BufferedLegacyEncryptedFile, self)._get_size()
+
+        file_position = self.file_object.tell()
+        self.file_object.seek(0, os.SEEK_END)
+        encrypted_size = self.file_object.tell() - AES.block_size
+
+        if encrypted_size <= 0:
+            size = 0
+        else:
+            chunk_count = -(
+                -encrypted_size // ENCRYPTION_LEGACY_CHUNK_ENCRYPTED_SIZE
+            )
+
+            # Decrypt the last block to obtain the padding size of the last
+            # chunk, the previous block is its initial vector.
+            self.file_object.seek(-2 * AES.block_size, os.SEEK_END)
+            data = self.file_object.read(2 * AES.block_size)
+            cipher = AES.new(
+                key=self.key, mode=AES.MODE_CBC, iv=data[:AES.block_size]
+            )
+            padding_size = cipher.decrypt(data[AES.block_size:])[-1]
+
+            size = encrypted_size - (
+                (chunk_count - 1) * AES.block_size
+            ) - padding_size
+
+        self.file_object.seek(file_position)
+        return size
+
+    def _rewind(self):
+        self.file_object.seek(0)
+        self.initial_vector = self.file_object.read(AES.block_size)
+        self.cipher = AES.new(
+            key=self.key, mode=AES.MODE_CBC, iv=self.initial_vector
+        )
+
+    def _seek_file_object(self, position, current_position):
+        """
+        Full chunks have a fixed encrypted size. Decryption of a chunk can
+        start using the last block of the previous chunk as the initial
+        vector without decrypting the chunks before it.
+        """
+        if not self.binary_mode:
+            return super(BufferedLegacyEncryptedFile, self)._seek_file_object(
+                current_position=current_position, position=position
+            )
+
+        chunk_index = position // ENCRYPTION_FILE_CHUNK_SIZE
+        self.file_object.seek(
+            chunk_index * ENCRYPTION_LEGACY_CHUNK_ENCRYPTED_SIZE
+        )
+        self.cipher = AES.new(
+            key=self.key, mode=AES.MODE_CBC,
+            iv=self.file_object.read(AES.block_size)
+        )
+        return chunk_index * ENCRYPTION_FILE_CHUNK_SIZE
+
 
 class EncryptedPassthroughStorage(PassthroughStorage):
     def __init__(self, *args, **kwargs):
@@ -53,6 +265,29 @@ class EncryptedPassthroughStorage(PassthroughStorage):
             salt=settings.SECRET_KEY
         )
 
+    def _read_chunk(self, content):
+        """
+        Read a full chunk from the content even if it returns less data
+        per read, so that only the last chunk is smaller.
+        """
+        data = []
+        size = 0
+        while size < ENCRYPTION_FILE_CHUNK_SIZE:
+            chunk = force_bytes(
+                content.read(ENCRYPTION_FILE_CHUNK_SIZE - size)
+            )
+            if not chunk:
+                break
+
+            data.append(chunk)
+            size += len(chunk)
+
+        return b''.join(data)
+
+    def needs_upgrade(self, name):
+        with self.open(name=name, mode='rb', _direct=True) as file_object:
+            return not BufferedEncryptedFile.is_format(file_object=file_object)
+
     def open(self, name, mode='rb', _direct=False):
         next_kwargs = {'name': name}
         if _direct:
@@ -70,7 +305,13 @@ class EncryptedPassthroughStorage(PassthroughStorage):
             storage_file = self._call_backend_method(
                 method_name='open', kwargs=next_kwargs
             )
-            return BufferedEncryptedFile(
+
+            if BufferedEncryptedFile.is_format(file_object=storage_file):
+                buffered_file_class = BufferedEncryptedFile
+            else:
+                buffered_file_class = BufferedLegacyEncryptedFile
+
+            return buffered_file_class(
                 file_object=storage_file, key=self.key, mode=mode
             )
 
@@ -86,7 +327,15 @@ class EncryptedPassthroughStorage(PassthroughStorage):
                 method_name='save', kwargs=next_kwargs
             )
         else:
-            cipher = AES.new(key=self.key, mode=AES.MODE_CBC)
+            salt = get_random_bytes(ENCRYPTION_FORMAT_SALT_SIZE)
+            header = struct.pack(
+                ENCRYPTION_FORMAT_HEADER, ENCRYPTION_FORMAT_MAGIC,
+                ENCRYPTION_FORMAT_VERSION, ENCRYPTION_FILE_CHUNK_SIZE, salt
+            )
+            file_key = BufferedEncryptedFile.get_file_key(
+                key=self.key, salt=salt
+            )
+
             name = self._call_backend_method(
                 method_name='save', kwargs={
                     'content': ContentFile(content=''), 'name': name
@@ -97,16 +346,26 @@ class EncryptedPassthroughStorage(PassthroughStorage):
                     'name': name, 'mode': 'wb'
                 }
             ) as file_object:
-                file_object.write(cipher.iv)
+                file_object.write(header)
+
+                # Read one chunk ahead to know which chunk is the last.
+                # Empty content is stored as a single empty last chunk.
+                chunk_index = 0
+                chunk = self._read_chunk(content=content)
                 while True:
-                    chunk = content.read(ENCRYPTION_FILE_CHUNK_SIZE)
-                    if chunk:
-                        chunk = pad(
-                            data_to_pad=chunk, block_size=AES.block_size
-                        )
-                    else:
+                    next_chunk = self._read_chunk(content=content)
+                    cipher = BufferedEncryptedFile.get_chunk_cipher(
+                        chunk_index=chunk_index, file_key=file_key,
+                        header=header, last=not next_chunk
+                    )
+                    file_object.write(
+                        b''.join(cipher.encrypt_and_digest(plaintext=chunk))
+                    )
+
+                    if not next_chunk:
                         break
 
-                    file_object.write(cipher.encrypt(chunk))
+                    chunk = next_chunk
+                    chunk_index += 1
 
             return name
@@ -1,6 +1,19 @@
 ENCRYPTION_FILE_CHUNK_SIZE = 64 * 1024  # 64K
+# Chunk index and last chunk flag, zero padded to the 12 bytes of the
+# GCM nonce.
+ENCRYPTION_FORMAT_CHUNK_NONCE = '>7xIB'
+# Magic string, format version, chunk size and file key salt.
+ENCRYPTION_FORMAT_HEADER = '>8sBI16s'
+ENCRYPTION_FORMAT_KEY_CONTEXT = b'mayan-encrypted-file'
+ENCRYPTION_FORMAT_MAGIC = b'MAYANENC'
+ENCRYPTION_FORMAT_SALT_SIZE = 16
+ENCRYPTION_FORMAT_TAG_SIZE = 16
+ENCRYPTION_FORMAT_VERSION = 1
 ENCRYPTION_KEY_DERIVATION_ITERATIONS = 100000
 ENCRYPTION_KEY_SIZE = 32
+# Full chunks of the legacy format are padded with a whole block of 16
+# bytes.
+ENCRYPTION_LEGACY_CHUNK_ENCRYPTED_SIZE = ENCRYPTION_FILE_CHUNK_SIZE + 16
 
 ZIP_CHUNK_SIZE = 64 * 1024  # 64K
 ZIP_MEMBER_FILENAME = 'mayan_file'
@@ -1,57 +1,137 @@
+import io
 import logging
+import os
 
 from django.core.files.base import File
 from django.core.files.storage import Storage
 from django.utils.module_loading import import_string
-from django.utils.six import BytesIO, StringIO, raise_from
+from django.utils.six import raise_from
 from django.utils.translation import ugettext_lazy as _
 
 from mayan.apps.common.class_mixins import ModuleLoaderMixin
 
-from .literals import DEFAULT_STORAGE_BACKEND
+from .literals import BUFFERED_FILE_DISCARD_SIZE, DEFAULT_STORAGE_BACKEND
 
 logger = logging.getLogger(name=__name__)
 
 
 class BufferedFile(File):
+    """
+    File like object that decodes the content of a passthrough storage file
+    in chunks. Seeking forward decodes and discards the content up to the
+    new position. Seeking backwards requires the subclass to support
+    rewinding the decoder.
+    """
     def __init__(self, file_object, mode, name=None):
         self.file_object = file_object
         self.mode = mode
         if 'b' in mode:
-            self.stream = BytesIO()
+            self.buffer = b''
         else:
-            self.stream = StringIO()
+            self.buffer = ''
+
+        self.position = 0
+        self._size = None
+
+    def _discard(self, size):
+        while size > 0:
+            data = self.read(min(size, BUFFERED_FILE_DISCARD_SIZE))
+            if not data:
+                break
+            size -= len(data)
+
+    def _get_file_object_chunk(self):
+        raise NotImplementedError
+
+    def _get_size(self):
+        """
+        Return the size of the decoded content. Subclasses that can
+        calculate it without decoding the content should override this.
+        """
+        position = self.position
+        self.seek(0)
+        self._discard(size=float('inf'))
+        size = self.position
+        self.seek(position)
+        return size
+
+    def _rewind(self):
+        """
+        Restart decoding from the start of the content.
+        """
+        raise io.UnsupportedOperation('File does not support rewinding.')
 
-        self.stream_size = 0
+    def _seek_file_object(self, position, current_position):
+        """
+        Move the decoder to a position at or before the requested position
+        and return it. Subclasses that can decode from an arbitrary
+        position can override this to avoid decoding the previous content.
+        """
+        if position >= current_position:
+            return current_position
+        else:
+            self._rewind()
+            return 0
 
     def close(self):
         self.file_object.close()
-        self.stream.close()
 
     def read(self, size=None):
-        if size is None:
-            size = -1
-
-        if size == -1 or size > self.stream_size:
-            while True:
-                position = self.stream.tell()
-                chunk = self._get_file_object_chunk()
-                if chunk:
-                    self.stream_size += len(chunk)
-                    self.stream.write(chunk)
-                    self.stream.seek(position)
-                    if self.stream_size >= size and size != -1:
-                        break
-                else:
-                    break
-
-        if size:
-            read_size = min(size, self.stream_size)
-            self.stream_size -= read_size
+        chunks = [self.buffer]
+        length = len(self.buffer)
+
+        while size is None or size < 0 or length < size:
+            chunk = self._get_file_object_chunk()
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+            length += len(chunk)
+
+        data = self.buffer[:0].join(chunks)
+
+        if size is None or size < 0:
+            self.buffer = data[:0]
+        else:
+            data, self.buffer = data[:size], data[size:]
+
+        self.position += len(data)
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+
+        if offset < 0:
+            raise ValueError('Negative seek position {}.'.format(offset))
+
+        if self.position <= offset <= self.position + len(self.buffer):
+            self.buffer = self.buffer[offset - self.position:]
+            self.position = offset
         else:
-            read_size = None
+            current_position = self.position + len(self.buffer)
+            self.buffer = self.buffer[:0]
+            self.position = self._seek_file_object(
+                current_position=current_position, position=offset
+            )
+            self._discard(size=offset - self.position)
 
-        return self.stream.read(read_size)
+        return self.position
+
+    def seekable(self):
+        return True
+
+    @property
+    def size(self):
+        if self._size is None:
+            self._size = self._get_size()
+
+        return self._size
+
+    def tell(self):
+        return self.position
 
 
 class DefinedStorage(ModuleLoaderMixin, object):
@@ -189,6 +269,13 @@ class PassthroughStorage(Storage):
     def exists(self, *args, **kwargs):
         return self.next_storage_backend.exists(*args, **kwargs)
 
+    def needs_upgrade(self, name):
+        """
+        Return True if the file was stored in a previous format of the
+        backend and should be stored again in the current one.
+        """
+        return False
+
     def path(self, *args, **kwargs):
         return self.next_storage_backend.path(*args, **kwargs)
 
@@ -1 +1,8 @@
+BUFFERED_FILE_DISCARD_SIZE = 64 * 1024  # 64K
+
 DEFAULT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+DEFAULT_STORAGE_OFFLOAD_HEADER = None
+DEFAULT_STORAGE_OFFLOAD_LOCATIONS = {}
+
+STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT = 'X-Accel-Redirect'
+STORAGE_OFFLOAD_HEADER_SENDFILE = 'X-Sendfile'
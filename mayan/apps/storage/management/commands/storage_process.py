@@ -33,6 +33,16 @@ class Command(management.BaseCommand):
                 'pipeline transformations.'
             )
         )
+        parser.add_argument(
+            '--upgrade', action='store_true', dest='upgrade',
+            help=_(
+                'Store again the files in the log of a previous forward '
+                'execution that use an old format of the storage backends, '
+                'for example the files of the encrypted storage saved '
+                'before the chunked format. Use the same log file as the '
+                'forward execution, it is not modified.'
+            )
+        )
         parser.add_argument(
             '--storage_name', action='store', dest='defined_storage_name',
             help=_('Name of the storage to process.'),
@@ -40,9 +50,16 @@ class Command(management.BaseCommand):
         )
 
     def handle(self, *args, **options):
+        if options['reverse'] and options['upgrade']:
+            raise management.CommandError(
+                'The reverse and upgrade options are mutually exclusive.'
+            )
+
         processor = PassthroughStorageProcessor(
             app_label=options['app_label'],
             defined_storage_name=options['defined_storage_name'],
             log_file=options['log_file'], model_name=options['model_name'],
         )
-        processor.execute(reverse=options['reverse'])
+        processor.execute(
+            reverse=options['reverse'], upgrade=options['upgrade']
+        )
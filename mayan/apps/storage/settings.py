@@ -4,8 +4,31 @@ from django.utils.translation import ugettext_lazy as _
 
 from mayan.apps.smart_settings.classes import Namespace
 
+from .literals import (
+    DEFAULT_STORAGE_OFFLOAD_HEADER, DEFAULT_STORAGE_OFFLOAD_LOCATIONS
+)
+
 namespace = Namespace(label=_('Storage'), name='storage')
 
+setting_offload_header = namespace.add_setting(
+    global_name='STORAGE_OFFLOAD_HEADER',
+    default=DEFAULT_STORAGE_OFFLOAD_HEADER, help_text=_(
+        'Header used to let the front web server send files stored in '
+        'filesystem storages instead of streaming them through the '
+        'application. Use "X-Sendfile" for Apache (mod_xsendfile) or '
+        'lighttpd and "X-Accel-Redirect" for NGINX. Leave empty to disable.'
+    )
+)
+setting_offload_locations = namespace.add_setting(
+    global_name='STORAGE_OFFLOAD_LOCATIONS',
+    default=DEFAULT_STORAGE_OFFLOAD_LOCATIONS, help_text=_(
+        'Dictionary mapping filesystem paths to the URL prefixes of the '
+        'front web server internal locations that serve them. Used with '
+        'X-Accel-Redirect, files outside these paths are streamed by the '
+        'application.'
+    )
+)
+
 setting_temporary_directory = namespace.add_setting(
     global_name='STORAGE_TEMPORARY_DIRECTORY', default=tempfile.gettempdir(),
     help_text=_(
@@ -1,2 +1,5 @@
 TEST_CONTENT = 'testcontent'
+TEST_ENCRYPTION_PASSWORD = 'testpassword'
 TEST_FILE_NAME = 'test_file'
+TEST_OFFLOAD_LOCATION_PATH = '/var/lib/mayan/media'
+TEST_OFFLOAD_LOCATION_URL = '/protected/'
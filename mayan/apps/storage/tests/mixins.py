@@ -14,6 +14,7 @@ class StorageProcessorTestMixin(object):
         cls.defined_storage = DefinedStorage.get(
             name=STORAGE_NAME_DOCUMENT_VERSION
         )
+        cls.document_storage_dotted_path = cls.defined_storage.dotted_path
         cls.document_storage_kwargs = cls.defined_storage.kwargs
 
     def setUp(self):
@@ -25,4 +26,5 @@ class StorageProcessorTestMixin(object):
     def tearDown(self):
         super(StorageProcessorTestMixin, self).tearDown()
         shutil.rmtree(self.temporary_directory, ignore_errors=True)
+        self.defined_storage.dotted_path = self.document_storage_dotted_path
         self.defined_storage.kwargs = self.document_storage_kwargs
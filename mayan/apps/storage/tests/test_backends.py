@@ -1,4 +1,9 @@
 from pathlib import Path
+import struct
+
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import pad
 
 from django.core.files.base import ContentFile
 from django.utils.encoding import force_bytes
@@ -9,6 +14,10 @@ from mayan.apps.mimetype.api import get_mimetype
 
 from ..backends.compressedstorage import ZipCompressedPassthroughStorage
 from ..backends.encryptedstorage import EncryptedPassthroughStorage
+from ..backends.literals import (
+    ENCRYPTION_FILE_CHUNK_SIZE, ENCRYPTION_FORMAT_HEADER,
+    ENCRYPTION_FORMAT_MAGIC
+)
 
 from .literals import TEST_CONTENT, TEST_FILE_NAME
 
@@ -22,6 +31,35 @@ class EncryptedPassthroughStorageTestCase(BaseTestCase):
         fs_cleanup(filename=self.temporary_directory)
         super(EncryptedPassthroughStorageTestCase, self).tearDown()
 
+    def test_file_salt(self):
+        storage = EncryptedPassthroughStorage(
+            password='testpassword',
+            next_storage_backend_arguments={
+                'location': self.temporary_directory,
+            }
+        )
+
+        data = []
+        for index in range(2):
+            test_file_name = storage.save(
+                name=TEST_FILE_NAME, content=ContentFile(
+                    content=force_bytes(TEST_CONTENT)
+                )
+            )
+            data.append(
+                (Path(self.temporary_directory) / test_file_name).read_bytes()
+            )
+
+        header_size = struct.calcsize(ENCRYPTION_FORMAT_HEADER)
+        salts = [
+            struct.unpack(ENCRYPTION_FORMAT_HEADER, item[:header_size])[3]
+            for item in data
+        ]
+
+        # Each file is encrypted with its own key.
+        self.assertNotEqual(salts[0], salts[1])
+        self.assertNotEqual(data[0][header_size:], data[1][header_size:])
+
     def test_file_save_and_load(self):
         storage = EncryptedPassthroughStorage(
             password='testpassword',
@@ -53,6 +91,88 @@ class EncryptedPassthroughStorageTestCase(BaseTestCase):
         with storage.open(name=TEST_FILE_NAME, mode='r') as file_object:
             self.assertEqual(file_object.read(999), TEST_CONTENT)
 
+    def test_file_seek(self):
+        storage = EncryptedPassthroughStorage(
+            password='testpassword',
+            next_storage_backend_arguments={
+                'location': self.temporary_directory,
+            }
+        )
+
+        # Larger than a chunk to test seeking across chunks.
+        content = force_bytes(TEST_CONTENT) * 20000
+        storage.save(name=TEST_FILE_NAME, content=ContentFile(content=content))
+
+        with storage.open(name=TEST_FILE_NAME, mode='rb') as file_object:
+            self.assertEqual(file_object.size, len(content))
+            self.assertEqual(file_object.read(), content)
+
+            file_object.seek(150000)
+            self.assertEqual(file_object.read(100), content[150000:150100])
+
+            file_object.seek(10)
+            self.assertEqual(file_object.read(100), content[10:110])
+
+    def test_file_tampered(self):
+        storage = EncryptedPassthroughStorage(
+            password='testpassword',
+            next_storage_backend_arguments={
+                'location': self.temporary_directory,
+            }
+        )
+
+        test_file_name = storage.save(
+            name=TEST_FILE_NAME, content=ContentFile(
+                content=force_bytes(TEST_CONTENT)
+            )
+        )
+
+        path_file = Path(self.temporary_directory) / test_file_name
+        data = bytearray(path_file.read_bytes())
+
+        self.assertTrue(data.startswith(ENCRYPTION_FORMAT_MAGIC))
+
+        data[-1] ^= 1
+        path_file.write_bytes(bytes(data))
+
+        with storage.open(name=TEST_FILE_NAME, mode='rb') as file_object:
+            with self.assertRaises(ValueError):
+                file_object.read()
+
+    def test_legacy_file_load(self):
+        storage = EncryptedPassthroughStorage(
+            password='testpassword',
+            next_storage_backend_arguments={
+                'location': self.temporary_directory,
+            }
+        )
+
+        content = force_bytes(TEST_CONTENT) * 20000
+
+        initial_vector = get_random_bytes(AES.block_size)
+        cipher = AES.new(key=storage.key, mode=AES.MODE_CBC, iv=initial_vector)
+        data = [initial_vector]
+        for index in range(0, len(content), ENCRYPTION_FILE_CHUNK_SIZE):
+            data.append(
+                cipher.encrypt(
+                    pad(
+                        data_to_pad=content[
+                            index:index + ENCRYPTION_FILE_CHUNK_SIZE
+                        ], block_size=AES.block_size
+                    )
+                )
+            )
+
+        path_file = Path(self.temporary_directory) / TEST_FILE_NAME
+        path_file.write_bytes(b''.join(data))
+
+        with storage.open(name=TEST_FILE_NAME, mode='rb') as file_object:
+            self.assertEqual(file_object.size, len(content))
+            self.assertEqual(file_object.read(), content)
+
+            file_object.seek(150000)
+            self.assertEqual(file_object.read(100), content[150000:150100])
+
 
 class ZipCompressedPassthroughStorageTestCase(BaseTestCase):
     def setUp(self):
@@ -89,3 +209,22 @@ class ZipCompressedPassthroughStorageTestCase(BaseTestCase):
 
         with storage.open(name=TEST_FILE_NAME, mode='r') as file_object:
             self.assertEqual(file_object.read(), TEST_CONTENT)
+
+    def test_file_seek(self):
+        storage = ZipCompressedPassthroughStorage(
+            next_storage_backend_arguments={
+                'location': self.temporary_directory
+            }
+        )
+
+        content = force_bytes(TEST_CONTENT) * 20000
+        storage.save(name=TEST_FILE_NAME, content=ContentFile(content=content))
+
+        with storage.open(name=TEST_FILE_NAME, mode='rb') as file_object:
+            self.assertEqual(file_object.size, len(content))
+
+            file_object.seek(150000)
+            self.assertEqual(file_object.read(100), content[150000:150100])
+
+            file_object.seek(10)
+            self.assertEqual(file_object.read(100), content[10:110])
@@ -1,22 +1,32 @@
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import pad
+
 from django.core import management
 from django.utils.encoding import force_text
 
 from mayan.apps.documents.tests.base import GenericDocumentTestCase
 from mayan.apps.mimetype.api import get_mimetype
 
+from ..backends.encryptedstorage import EncryptedPassthroughStorage
+from ..backends.literals import (
+    ENCRYPTION_FILE_CHUNK_SIZE, ENCRYPTION_FORMAT_MAGIC
+)
+
+from .literals import TEST_ENCRYPTION_PASSWORD
 from .mixins import StorageProcessorTestMixin
 
 
 class StorageProcessManagementCommandTestCase(
     StorageProcessorTestMixin, GenericDocumentTestCase
 ):
-    def _call_command(self, reverse=None):
+    def _call_command(self, reverse=None, upgrade=None):
         options = {
             'app_label': 'documents',
             'defined_storage_name': 'documents__documentversion',
             'log_file': force_text(self.path_test_file),
             'model_name': 'DocumentVersion',
-            'reverse': reverse
+            'reverse': reverse, 'upgrade': upgrade
         }
         management.call_command(command_name='storage_process', **options)
 
@@ -72,3 +82,101 @@ class StorageProcessManagementCommandTestCase(
             self.test_document.latest_version.checksum,
             self.test_document.latest_version.update_checksum(save=False)
         )
+
+    def test_processor_forwards_and_upgrade(self):
+        self._upload_and_call()
+
+        self._call_command(upgrade=True)
+
+        with open(self.test_document.latest_version.file.path, mode='rb') as file_object:
+            self.assertEqual(
+                get_mimetype(file_object=file_object),
+                ('application/zip', 'binary')
+            )
+
+        self.assertEqual(
+            self.test_document.latest_version.checksum,
+            self.test_document.latest_version.update_checksum(save=False)
+        )
+
+    def test_processor_upgrade_encrypted_legacy(self):
+        self.defined_storage.dotted_path = 'django.core.files.storage.FileSystemStorage'
+        self.defined_storage.kwargs = {
+            'location': self.document_storage_kwargs['location']
+        }
+
+        self._upload_test_document()
+
+        self.defined_storage.dotted_path = 'mayan.apps.storage.backends.encryptedstorage.EncryptedPassthroughStorage'
+        self.defined_storage.kwargs = {
+            'next_storage_backend': 'django.core.files.storage.FileSystemStorage',
+            'next_storage_backend_arguments': {
+                'location': self.document_storage_kwargs['location']
+            }, 'password': TEST_ENCRYPTION_PASSWORD
+        }
+
+        self._call_command()
+
+        # Replace the file with a copy in the legacy CBC format.
+        key = EncryptedPassthroughStorage(
+            next_storage_backend_arguments={
+                'location': self.document_storage_kwargs['location']
+            }, password=TEST_ENCRYPTION_PASSWORD
+        ).key
+
+        with self.test_document.latest_version.open() as file_object:
+            content = file_object.read()
+
+        initial_vector = get_random_bytes(AES.block_size)
+        cipher = AES.new(key=key, mode=AES.MODE_CBC, iv=initial_vector)
+        data = [initial_vector]
+        for index in range(0, len(content), ENCRYPTION_FILE_CHUNK_SIZE):
+            data.append(
+                cipher.encrypt(
+                    pad(
+                        data_to_pad=content[
+                            index:index + ENCRYPTION_FILE_CHUNK_SIZE
+                        ], block_size=AES.block_size
+                    )
+                )
+            )
+
+        with open(self.test_document.latest_version.file.path, mode='wb') as file_object:
+            file_object.write(b''.join(data))
+
+        self._call_command(upgrade=True)
+
+        with open(self.test_document.latest_version.file.path, mode='rb') as file_object:
+            self.assertTrue(
+                file_object.read().startswith(ENCRYPTION_FORMAT_MAGIC)
+            )
+
+        self.assertEqual(
+            self.test_document.latest_version.checksum,
+            self.test_document.latest_version.update_checksum(save=False)
+        )
+
+    def test_processor_upgrade_skips_unprocessed(self):
+        self.defined_storage.dotted_path = 'django.core.files.storage.FileSystemStorage'
+        self.defined_storage.kwargs = {
+            'location': self.document_storage_kwargs['location']
+        }
+
+        self._upload_test_document()
+
+        with open(self.test_document.latest_version.file.path, mode='rb') as file_object:
+            content = file_object.read()
+
+        self.defined_storage.dotted_path = 'mayan.apps.storage.backends.encryptedstorage.EncryptedPassthroughStorage'
+        self.defined_storage.kwargs = {
+            'next_storage_backend': 'django.core.files.storage.FileSystemStorage',
+            'next_storage_backend_arguments': {
+                'location': self.document_storage_kwargs['location']
+            }, 'password': TEST_ENCRYPTION_PASSWORD
+        }
+
+        # Files not in the log of a forward execution are not touched.
+        self._call_command(upgrade=True)
+
+        with open(self.test_document.latest_version.file.path, mode='rb') as file_object:
+            self.assertEqual(file_object.read(), content)
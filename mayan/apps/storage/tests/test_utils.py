@@ -1,14 +1,27 @@
 from pathlib import Path
 import shutil
 
+import mock
+
+from django.core.files.storage import FileSystemStorage
 from django.utils.encoding import force_text
 
 from mayan.apps.common.tests.base import BaseTestCase
 from mayan.apps.documents.tests.base import GenericDocumentTestCase
 from mayan.apps.mimetype.api import get_mimetype
 
-from ..utils import PassthroughStorageProcessor, mkdtemp, patch_files
-
+from ..backends.compressedstorage import ZipCompressedPassthroughStorage
+from ..literals import (
+    STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT, STORAGE_OFFLOAD_HEADER_SENDFILE
+)
+from ..utils import (
+    PassthroughStorageProcessor, get_offload_response,
+    get_storage_file_path, mkdtemp, patch_files
+)
+
+from .literals import (
+    TEST_FILE_NAME, TEST_OFFLOAD_LOCATION_PATH, TEST_OFFLOAD_LOCATION_URL
+)
 from .mixins import StorageProcessorTestMixin
 
 
@@ -148,3 +161,74 @@ class StorageProcessorTestCase(
             self.test_document.latest_version.checksum,
             self.test_document.latest_version.update_checksum(save=False)
         )
+
+
+class OffloadResponseTestCase(BaseTestCase):
+    def setUp(self):
+        super(OffloadResponseTestCase, self).setUp()
+        self.test_path = '{}/{}'.format(
+            TEST_OFFLOAD_LOCATION_PATH, TEST_FILE_NAME
+        )
+
+    def _get_offload_response(self, header):
+        with mock.patch(
+            'mayan.apps.storage.utils.setting_offload_header'
+        ) as mock_header, mock.patch(
+            'mayan.apps.storage.utils.setting_offload_locations'
+        ) as mock_locations:
+            mock_header.value = header
+            mock_locations.value = {
+                TEST_OFFLOAD_LOCATION_PATH: TEST_OFFLOAD_LOCATION_URL
+            }
+            return get_offload_response(
+                filename=TEST_FILE_NAME, path=self.test_path
+            )
+
+    def test_offload_disabled(self):
+        self.assertEqual(self._get_offload_response(header=None), None)
+
+    def test_offload_accel_redirect(self):
+        response = self._get_offload_response(
+            header=STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT
+        )
+        self.assertEqual(
+            response[STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT],
+            '{}{}'.format(TEST_OFFLOAD_LOCATION_URL, TEST_FILE_NAME)
+        )
+        self.assertTrue(TEST_FILE_NAME in response['Content-Disposition'])
+
+    def test_offload_accel_redirect_outside_location(self):
+        self.test_path = '/{}'.format(TEST_FILE_NAME)
+        self.assertEqual(
+            self._get_offload_response(
+                header=STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT
+            ), None
+        )
+
+    def test_offload_sendfile(self):
+        response = self._get_offload_response(
+            header=STORAGE_OFFLOAD_HEADER_SENDFILE
+        )
+        self.assertEqual(
+            response[STORAGE_OFFLOAD_HEADER_SENDFILE], self.test_path
+        )
+
+    def test_storage_file_path(self):
+        self.assertEqual(
+            get_storage_file_path(
+                name=TEST_FILE_NAME, storage=FileSystemStorage(
+                    location=TEST_OFFLOAD_LOCATION_PATH
+                )
+            ), self.test_path
+        )
+
+    def test_passthrough_storage_file_path(self):
+        self.assertEqual(
+            get_storage_file_path(
+                name=TEST_FILE_NAME, storage=ZipCompressedPassthroughStorage(
+                    next_storage_backend_arguments={
+                        'location': TEST_OFFLOAD_LOCATION_PATH
+                    }
+                )
+            ), None
+        )
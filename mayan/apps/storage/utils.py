@@ -1,15 +1,23 @@
 import dbm
 import logging
+import mimetypes
 import os
 from pathlib import Path
 import shutil
 import tempfile
 
 from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.http import HttpResponse
 from django.utils.module_loading import import_string
+from django.utils.six.moves.urllib.parse import quote
 
-from .classes import DefinedStorage, PassthroughStorage
-from .settings import setting_temporary_directory
+from .classes import DefinedStorage, DefinedStorageLazy, PassthroughStorage
+from .literals import STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT
+from .settings import (
+    setting_offload_header, setting_offload_locations,
+    setting_temporary_directory
+)
 
 logger = logging.getLogger(name=__name__)
 
@@ -31,6 +39,9 @@ class PassthroughStorageProcessor(object):
         self.model_name = model_name
 
     def _update_entry(self, key):
+        if self.upgrade:
+            return
+
         if not self.reverse:
             self.database[key] = '1'
         else:
@@ -40,13 +51,49 @@ class PassthroughStorageProcessor(object):
                 pass
 
     def _inclusion_condition(self, key):
-        if self.reverse:
+        if self.reverse or self.upgrade:
             return key in self.database
         else:
             return key not in self.database
 
-    def execute(self, reverse=False):
+    def _upgrade_file(self, file_name, storage_instance):
+        """
+        Store the file again in the current format of the storage backends.
+        The file is decoded completely and the new copy is written under
+        a temporary name before the original is deleted, so an error at
+        any step doesn't lose the content.
+        """
+        if not storage_instance.needs_upgrade(name=file_name):
+            return
+
+        with TemporaryFile() as temporary_file_object:
+            with storage_instance.open(name=file_name, mode='rb') as file_object:
+                shutil.copyfileobj(fsrc=file_object, fdst=temporary_file_object)
+
+            temporary_file_object.seek(0)
+            upgraded_file_name = storage_instance.save(
+                name='{}.upgrade'.format(file_name),
+                content=temporary_file_object
+            )
+
+        with storage_instance.open(name=upgraded_file_name, mode='rb', _direct=True) as file_object:
+            storage_instance.delete(name=file_name)
+            storage_instance.save(
+                name=file_name, content=file_object, _direct=True
+            )
+
+        storage_instance.delete(name=upgraded_file_name)
+
+    def execute(self, reverse=False, upgrade=False):
+        """
+        Pass the model files through the storage pipeline, or undo it if
+        reverse is True. If upgrade is True the files in the log of a
+        previous forward execution that are stored in an old format of the
+        storage backends are stored again in the current format. The log
+        is not modified by an upgrade.
+        """
         self.reverse = reverse
+        self.upgrade = upgrade
         model = apps.get_model(
             app_label=self.app_label, model_name=self.model_name
         )
@@ -68,18 +115,24 @@ class PassthroughStorageProcessor(object):
                 if self._inclusion_condition(key=key):
                     file_name = getattr(instance, self.file_attribute).name
 
-                    content = storage_instance.open(
-                        name=file_name, mode='rb',
-                        _direct=not self.reverse
-                    )
-                    storage_instance.delete(name=file_name)
-                    storage_instance.save(
-                        name=file_name, content=content,
-                        _direct=self.reverse
-                    )
+                    if upgrade:
+                        self._upgrade_file(
+                            file_name=file_name,
+                            storage_instance=storage_instance
+                        )
+                    else:
+                        content = storage_instance.open(
+                            name=file_name, mode='rb',
+                            _direct=not self.reverse
+                        )
+                        storage_instance.delete(name=file_name)
+                        storage_instance.save(
+                            name=file_name, content=content,
+                            _direct=self.reverse
+                        )
                     self._update_entry(key=key)
 
-            self.database.close
+            self.database.close()
 
 
 def TemporaryFile(*args, **kwargs):
@@ -103,6 +156,67 @@ def fs_cleanup(filename, suppress_exceptions=True):
                 raise
 
 
+def get_offload_response(path, content_type=None, filename=None):
+    """
+    Return a response that lets the front web server send the file at the
+    filesystem path, or None if offloading is disabled or, for
+    X-Accel-Redirect, the path is not inside an offload location. When a
+    filename is provided the file is sent as an attachment.
+    """
+    header = setting_offload_header.value
+    if not header or not path:
+        return None
+
+    path = os.path.abspath(path)
+
+    if header == STORAGE_OFFLOAD_HEADER_ACCEL_REDIRECT:
+        # NGINX only serves files from internal locations, translate the
+        # path to the URL of the location.
+        for location_path, location_url in setting_offload_locations.value.items():
+            location_path = os.path.join(os.path.abspath(location_path), '')
+            if path.startswith(location_path):
+                header_value = '{}/{}'.format(
+                    location_url.rstrip('/'),
+                    quote(path[len(location_path):])
+                )
+                break
+        else:
+            return None
+    else:
+        header_value = path
+
+    response = HttpResponse(
+        content_type=content_type or mimetypes.guess_type(
+            filename or path
+        )[0] or 'application/octet-stream'
+    )
+    response[header] = header_value
+
+    if filename:
+        try:
+            filename.encode('ascii')
+            file_expr = 'filename="{}"'.format(filename)
+        except UnicodeEncodeError:
+            file_expr = "filename*=utf-8''{}".format(quote(filename))
+        response['Content-Disposition'] = 'attachment; {}'.format(file_expr)
+
+    return response
+
+
+def get_storage_file_path(storage, name):
+    """
+    Return the filesystem path of a stored file if the storage keeps the
+    file content unaltered in the local filesystem, or None otherwise.
+    Passthrough storages change the content and remote storages don't
+    have a path.
+    """
+    if isinstance(storage, DefinedStorageLazy):
+        storage = DefinedStorage.get(name=storage.name).get_storage_instance()
+
+    if isinstance(storage, FileSystemStorage):
+        return storage.path(name=name)
+
+
 def get_storage_subclass(dotted_path):
     """
     Import a storage class and return a subclass that will always return eq